@@ -6,6 +6,8 @@ from datetime import datetime, timedelta
 import os
 import base64
 
+from utils.kalender import day_key, day_keys, lookup, day_range, month_range, year_range, week_range
+
 # Page config
 st.set_page_config(
     page_title="Monitoring STS - BAPENDA Jawa Timur",
@@ -347,12 +349,8 @@ def process_data(kasdasts, bpp, opd_ref, rek):
     # Exclude Badan Pendapatan Daerah (BAPENDA) from the data
     df = df[~df['NAMA_OPD'].str.contains('Badan Pendapatan Daerah', case=False, na=False)]
 
-    df['TANGGAL'] = df['TGTERIMA'].dt.date
-    df['TAHUN'] = df['TGTERIMA'].dt.year
-    df['BULAN'] = df['TGTERIMA'].dt.month
-    df['NAMA_BULAN'] = df['TGTERIMA'].dt.month_name()
-    df['MINGGU_TAHUN'] = df['TGTERIMA'].dt.isocalendar().week
-    df['HARI'] = df['TGTERIMA'].dt.day_name()
+    # Calendar attributes are looked up by day key in utils.kalender
+    df['HARI_KEY'] = day_keys(df['TGTERIMA'])
 
     payment_map = {1: 'Tunai', 2: 'E-Samsat/Giro/Transfer', 3: 'EDC', 4: 'Virtual Account', 5: 'QRIS'}
     df['JENIS_PEMBAYARAN'] = df['KDTUNAI'].map(payment_map).fillna('Lainnya')
@@ -516,36 +514,41 @@ def main():
 
         min_date = df['TGTERIMA'].min().date()
         max_date = df['TGTERIMA'].max().date()
+        days = lookup(pd.Series(df['HARI_KEY'].dropna().unique()))
+
+        def in_range(keys):
+            return df[df['HARI_KEY'].between(*keys)] if keys else df.iloc[0:0]
 
         if period_type == "Harian":
             selected_date = st.date_input("Pilih Tanggal", value=max_date, min_value=min_date, max_value=max_date)
-            df_filtered = df[df['TANGGAL'] == selected_date]
+            df_filtered = df[df['HARI_KEY'] == day_key(selected_date)]
             period_label = f"{selected_date.strftime('%d %B %Y')}"
         elif period_type == "Mingguan":
-            available_weeks = sorted(df['MINGGU_TAHUN'].unique())
+            # ISO weeks belong to their ISO year, which can differ from the calendar year
+            available_weeks = sorted(days['minggu_iso'].unique())
             col1, col2 = st.columns(2)
             selected_week = col1.selectbox("Minggu", available_weeks, index=len(available_weeks)-1)
-            selected_year = col2.selectbox("Tahun", sorted(df['TAHUN'].unique()), index=0)
-            df_filtered = df[(df['MINGGU_TAHUN'] == selected_week) & (df['TAHUN'] == selected_year)]
+            selected_year = col2.selectbox("Tahun", sorted(days['tahun_iso'].unique()), index=0)
+            df_filtered = in_range(week_range(int(selected_year), int(selected_week)))
             period_label = f"Minggu ke-{selected_week}, {selected_year}"
         elif period_type == "Bulanan":
             months = {1:'Jan', 2:'Feb', 3:'Mar', 4:'Apr', 5:'Mei', 6:'Jun', 7:'Jul', 8:'Agu', 9:'Sep', 10:'Okt', 11:'Nov', 12:'Des'}
             months_full = {1:'Januari', 2:'Februari', 3:'Maret', 4:'April', 5:'Mei', 6:'Juni', 7:'Juli', 8:'Agustus', 9:'September', 10:'Oktober', 11:'November', 12:'Desember'}
-            available_months = sorted(df['BULAN'].unique())
+            available_months = sorted(days['bulan'].unique())
             col1, col2 = st.columns(2)
             selected_month = col1.selectbox("Bulan", available_months, format_func=lambda x: months[x])
-            selected_year = col2.selectbox("Tahun ", sorted(df['TAHUN'].unique()), index=0)
-            df_filtered = df[(df['BULAN'] == selected_month) & (df['TAHUN'] == selected_year)]
+            selected_year = col2.selectbox("Tahun ", sorted(days['tahun'].unique()), index=0)
+            df_filtered = in_range(month_range(int(selected_year), int(selected_month)))
             period_label = f"{months_full[selected_month]} {selected_year}"
         elif period_type == "Tahunan":
-            selected_year = st.selectbox("Pilih Tahun", sorted(df['TAHUN'].unique()), index=0)
-            df_filtered = df[df['TAHUN'] == selected_year]
+            selected_year = st.selectbox("Pilih Tahun", sorted(days['tahun'].unique()), index=0)
+            df_filtered = in_range(year_range(int(selected_year)))
             period_label = f"Tahun {selected_year}"
         elif period_type == "Rentang Tanggal":
             col1, col2 = st.columns(2)
             start_date = col1.date_input("Dari", value=min_date, min_value=min_date, max_value=max_date)
             end_date = col2.date_input("Sampai", value=max_date, min_value=min_date, max_value=max_date)
-            df_filtered = df[(df['TANGGAL'] >= start_date) & (df['TANGGAL'] <= end_date)]
+            df_filtered = in_range(day_range(start_date, end_date))
             period_label = f"{start_date.strftime('%d/%m/%Y')} - {end_date.strftime('%d/%m/%Y')}"
         else:
             df_filtered = df.copy()
@@ -744,10 +747,11 @@ def main():
     with col2:
         st.markdown('<div class="section-header">📈 Tren Penerimaan Harian</div>', unsafe_allow_html=True)
 
-        daily_trend = df_filtered.groupby('TANGGAL').agg({
+        daily_trend = df_filtered.groupby('HARI_KEY').agg({
             'RPPOKOK': 'sum',
             'KDBILL': 'count'
         }).reset_index()
+        daily_trend['HARI_KEY'] = lookup(daily_trend['HARI_KEY'], ['tanggal'])['tanggal']
         daily_trend.columns = ['Tanggal', 'Total Penerimaan', 'Jumlah STS']
 
         # Determine scale based on max value
@@ -805,7 +809,8 @@ def main():
     # Section 3: Rekap Bulanan
     st.markdown('<div class="section-header">📆 Rekap Penerimaan Bulanan</div>', unsafe_allow_html=True)
 
-    monthly_summary = df_filtered.groupby(['TAHUN', 'BULAN']).agg({
+    calendar = lookup(df_filtered['HARI_KEY'], ['tahun', 'bulan'])
+    monthly_summary = df_filtered.groupby([calendar['tahun'].rename('TAHUN'), calendar['bulan'].rename('BULAN')]).agg({
         'RPPOKOK': 'sum',
         'KDBILL': 'count'
     }).reset_index()
@@ -0,0 +1,306 @@
+"""
+Benchmark the public DataService methods and track regressions
+
+Times every public method (the partition load cold and warm, filter_data
+for each period type, every summary, the rollup and list methods) on a
+given or synthetic database, with the tracemalloc peak of each method and
+the peak RSS of the process. Results can be saved as JSON and compared
+against an earlier run; the exit status is 1 when a method got slower or
+allocates more than the threshold allows.
+
+Usage:
+    python benchmarks/bench_data_service.py --rows 1M --output base.json
+    python benchmarks/bench_data_service.py --rows 1M --compare base.json
+    python benchmarks/bench_data_service.py --db data/monitoring_sts.db --runs 10
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from importlib import metadata
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Packages whose versions are recorded with the results
+PACKAGES = ['pandas', 'numpy', 'SQLAlchemy', 'pyarrow', 'duckdb', 'dash']
+
+SUMMARY_METHODS = [
+    'get_summary_metrics', 'get_opd_summary', 'get_payment_summary',
+    'get_daily_trend', 'get_monthly_summary', 'get_bendahara_summary',
+    'get_transaction_detail',
+]
+
+# Differences below this many milliseconds are treated as noise
+NOISE_FLOOR_MS = 2.0
+
+
+def filter_cases(df) -> dict:
+    """Named filter_data arguments covering every period type and both list filters"""
+    if df.empty:
+        return {'Semua Data': {'period_type': 'Semua Data'}}
+
+    from utils.kalender import lookup
+
+    calendar = lookup(df['hari_key'])
+    year = int(calendar['tahun'].max())
+    df_year = df[calendar['tahun'] == year]
+    sample = calendar.loc[df_year.sort_values('tanggal_terima').index[len(df_year) // 2]]
+    opds = df['nama_opd'].value_counts().index[:5].tolist()
+    payment = df['jenis_pembayaran_nama'].value_counts().index[0]
+
+    return {
+        'Semua Data': {'period_type': 'Semua Data'},
+        'Harian': {'period_type': 'Harian', 'selected_date': sample['tanggal']},
+        'Mingguan': {'period_type': 'Mingguan', 'selected_week': int(sample['minggu_iso']),
+                     'selected_year': int(sample['tahun_iso'])},
+        'Bulanan': {'period_type': 'Bulanan', 'selected_month': int(sample['bulan']),
+                    'selected_year': year},
+        'Tahunan': {'period_type': 'Tahunan', 'selected_year': year},
+        'Rentang Tanggal': {'period_type': 'Rentang Tanggal', 'start_date': calendar['tanggal'].min(),
+                            'end_date': sample['tanggal']},
+        'Tahunan + OPD': {'period_type': 'Tahunan', 'selected_year': year, 'selected_opd': opds},
+        'Semua Data + Pembayaran': {'period_type': 'Semua Data', 'selected_payment': payment},
+    }
+
+
+def measure(function, runs: int, warmup: bool = True) -> dict:
+    """
+    Time a call runs times, then repeat it once under tracemalloc
+
+    Allocation tracing slows the call down, so the peak is taken from a
+    separate run that is not part of the timings.
+
+    Args:
+        function: Call to measure
+        runs: Number of timed calls
+        warmup: Make one untimed call first
+
+    Returns:
+        Dictionary with the timings in milliseconds, the traced peak and
+        the number of rows of the result
+    """
+    if warmup:
+        function()
+
+    timings = []
+    result = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = function()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    if isinstance(result, tuple):  # filter_data returns (frame, label)
+        result = result[0]
+
+    return {
+        'median_ms': statistics.median(timings),
+        'min_ms': min(timings),
+        'max_ms': max(timings),
+        'runs': runs,
+        'peak_alloc_mb': peak / 1024 / 1024,
+        'result_rows': len(result) if hasattr(result, '__len__') else None,
+    }
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process (None where unavailable)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+def git_commit():
+    """Commit of the working tree, marked dirty when it has changes"""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=ROOT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ['git', 'status', '--porcelain', '--untracked-files=no'],
+            cwd=ROOT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return f"{commit}-dirty" if dirty else commit
+
+
+def package_versions() -> dict:
+    versions = {'python': platform.python_version()}
+    for name in PACKAGES:
+        try:
+            versions[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            versions[name] = None
+    return versions
+
+
+def run_benchmark(runs: int) -> dict:
+    """Benchmark every public DataService method on the configured database"""
+    from config import DATA_BACKEND
+    from utils.data_service import DataService
+
+    if DATA_BACKEND == 'duckdb':
+        from utils.duckdb_service import DuckDBDataService
+        service = DuckDBDataService()
+    else:
+        service = DataService()
+
+    results = {}
+
+    def bench(name: str, function, warmup: bool = True):
+        results[name] = measure(function, runs, warmup)
+        result = results[name]
+        print(f"  {name:<45} median={result['median_ms']:9.1f} ms  "
+              f"min={result['min_ms']:9.1f} ms  peak alloc={result['peak_alloc_mb']:8.1f} MB")
+
+    bench('get_all_transactions (cold)', lambda: service.get_all_transactions(use_cache=False), warmup=False)
+    bench('get_all_transactions (warm)', service.get_all_transactions)
+
+    df = service.get_all_transactions()
+
+    for label, case in filter_cases(df).items():
+        bench(f'filter_data [{label}]', lambda case=case: service.filter_data(df, **case))
+
+    for method in SUMMARY_METHODS:
+        bench(method, lambda method=method: getattr(service, method)(df))
+
+    bench('get_rollup_data', service.get_rollup_data)
+    bench('get_opd_summary_from_rollup', service.get_opd_summary_from_rollup)
+    bench('get_opd_list', service.get_opd_list)
+    bench('get_payment_types', service.get_payment_types)
+    bench('get_date_range', service.get_date_range)
+    bench('get_available_years', service.get_available_years)
+
+    return {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'rows': len(df),
+            'years': service.get_available_years(),
+            'backend': DATA_BACKEND,
+            'commit': git_commit(),
+            'platform': platform.platform(),
+            'versions': package_versions(),
+        },
+        'peak_rss_mb': peak_rss_mb(),
+        'results': results,
+    }
+
+
+def compare(report: dict, baseline: dict, threshold: float) -> list:
+    """
+    Print the change of every method against a baseline report
+
+    The fastest run is compared, as it is the least affected by other
+    load on the machine.
+
+    Returns:
+        Names of the methods whose fastest time or allocation peak grew
+        by more than threshold
+    """
+    regressions = []
+    meta = baseline['meta']
+    print(f"\nCompared with {meta.get('commit')} ({meta.get('rows'):,} rows, {meta.get('backend')})")
+    if meta.get('rows') != report['meta']['rows']:
+        print("  Warning: baseline was measured on a different number of rows")
+
+    for name, result in report['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            print(f"  {name:<45} (new)")
+            continue
+
+        time_ratio = result['min_ms'] / base['min_ms'] if base['min_ms'] else 1.0
+        alloc_ratio = result['peak_alloc_mb'] / base['peak_alloc_mb'] if base['peak_alloc_mb'] else 1.0
+        slower = (time_ratio > 1 + threshold
+                  and result['min_ms'] - base['min_ms'] > NOISE_FLOOR_MS)
+        larger = alloc_ratio > 1 + threshold and result['peak_alloc_mb'] - base['peak_alloc_mb'] > 1.0
+
+        flag = 'REGRESSION' if slower or larger else ''
+        if flag:
+            regressions.append(name)
+        print(f"  {name:<45} time {time_ratio:6.2f}x  alloc {alloc_ratio:6.2f}x  {flag}")
+
+    if report['peak_rss_mb'] and baseline.get('peak_rss_mb'):
+        print(f"  {'peak RSS':<45} {baseline['peak_rss_mb']:.0f} MB -> {report['peak_rss_mb']:.0f} MB")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='DataService benchmark suite')
+    parser.add_argument('--db', help='SQLite database file')
+    parser.add_argument('--rows', help='Use a synthetic database of this size instead, e.g. 100k, 1M')
+    parser.add_argument('--seed', type=int, default=42, help='Seed of the synthetic database (default: 42)')
+    parser.add_argument('--runs', type=int, default=5, help='Timed calls per method (default: 5)')
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    parser.add_argument('--compare', help='Baseline JSON file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Allowed slowdown or allocation growth before flagging (default: 0.2)')
+
+    args = parser.parse_args()
+
+    if args.rows:
+        from generate_data import ensure_synthetic_db, parse_rows
+        db_path = ensure_synthetic_db(parse_rows(args.rows), args.seed)
+    else:
+        db_path = args.db or os.path.join('data', 'monitoring_sts.db')
+        if not os.path.exists(db_path):
+            print(f"Database not found: {db_path}")
+            sys.exit(1)
+
+    # Set before the service modules import config; DATA_BACKEND and
+    # SHARED_SNAPSHOT from the environment select the setup under test
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.abspath(db_path)}"
+    os.environ.setdefault('METRICS_ENABLED', 'false')
+
+    print("=" * 60)
+    print("BENCHMARK DataService")
+    print("=" * 60)
+
+    report = run_benchmark(args.runs)
+    report['meta']['database'] = os.path.abspath(db_path)
+
+    meta = report['meta']
+    print(f"\n{meta['rows']:,} rows, backend {meta['backend']}, peak RSS "
+          + (f"{report['peak_rss_mb']:.0f} MB" if report['peak_rss_mb'] else 'n/a'))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+        print("\nNo regressions")
+
+
+if __name__ == '__main__':
+    main()
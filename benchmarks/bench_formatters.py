@@ -0,0 +1,112 @@
+"""
+Benchmark the column formatters against their scalar versions
+
+Formats synthetic amounts of several column sizes both ways: the scalar
+formatter through Series.apply, as the tables and charts used to, and the
+column formatter on the whole array. Every size is first checked for
+identical output, including missing, negative, half-way and huge values;
+the exit status is 1 when any string differs.
+
+Usage:
+    python benchmarks/bench_formatters.py
+    python benchmarks/bench_formatters.py --sizes 15,1000,100000 --runs 10
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.formatters import (
+    format_rupiah, format_rupiah_short, format_number, format_percentage,
+    format_rupiah_column, format_rupiah_short_column, format_number_column, format_percentage_column,
+)
+
+# Values where rounding, sign and fallbacks are easy to get wrong
+EDGE_VALUES = [
+    0.0, -0.0, -0.3, 0.5, 1.5, 2.5, -2.5, 999.5, 999.4999, 999999.5,
+    1e3, 1e6, 1e9, 1e12, -1e12, 2.0 ** 53 + 1, 9.2e18, 1e19, -1e19,
+    np.inf, -np.inf, np.nan,
+]
+
+# name: (scalar formatter, column formatter)
+FORMATTERS = {
+    'rupiah': (format_rupiah, format_rupiah_column),
+    'rupiah_short': (format_rupiah_short, format_rupiah_short_column),
+    'number': (format_number, format_number_column),
+    'percentage': (format_percentage, format_percentage_column),
+}
+
+
+def amounts(size: int, seed: int = 0) -> pd.Series:
+    """Transaction-like amounts: mostly millions, a long tail and some edge values"""
+    rng = np.random.default_rng(seed)
+    values = rng.lognormal(14, 2.5, size)
+    values[rng.random(size) < 0.05] *= -1
+    edges = min(size, len(EDGE_VALUES))
+    values[:edges] = EDGE_VALUES[:edges]
+    return pd.Series(values)
+
+
+def check(series: pd.Series) -> int:
+    """Number of strings differing between the scalar and column formatters"""
+    mismatches = 0
+    for name, (scalar, column) in FORMATTERS.items():
+        expected = series.apply(scalar)
+        actual = column(series)
+        differing = [(a, b) for a, b in zip(expected, actual) if a != b]
+        if differing or not expected.index.equals(actual.index):
+            print(f"  {name}: {len(differing)} different, e.g. {differing[:3]}")
+            mismatches += max(len(differing), 1)
+    return mismatches
+
+
+def measure(function, runs: int) -> float:
+    """Median seconds of a call"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Column formatter benchmark')
+    parser.add_argument('--sizes', default='15,100,1000,10000,100000',
+                        help='Comma separated column sizes (default: 15,100,1000,10000,100000)')
+    parser.add_argument('--runs', type=int, default=5, help='Executions per size (default: 5)')
+
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(',')]
+
+    print("=" * 72)
+    print("BENCHMARK formatters - Series.apply vs column")
+    print("=" * 72)
+
+    mismatches = 0
+    print(f"\n{'formatter':<14} {'rows':>8} {'apply':>12} {'column':>12} {'speedup':>9}")
+    print("-" * 72)
+    for size in sizes:
+        series = amounts(size)
+        mismatches += check(series)
+        for name, (scalar, column) in FORMATTERS.items():
+            old = measure(lambda: series.apply(scalar), args.runs)
+            new = measure(lambda: column(series), args.runs)
+            speedup = old / new if new else float('inf')
+            print(f"{name:<14} {size:>8} {old * 1000:9.2f} ms {new * 1000:9.2f} ms {speedup:8.2f}x")
+
+    if mismatches:
+        print(f"\n{mismatches} strings differ from the scalar formatters")
+        sys.exit(1)
+    print("\nAll column formatters match the scalar formatters")
+
+
+if __name__ == '__main__':
+    main()
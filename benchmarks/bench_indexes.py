@@ -0,0 +1,126 @@
+"""
+Benchmark the aggregate queries with the legacy indexes and with the
+covering indexes from database/indexes.py
+
+Works on a copy of the database: the copy is first reset to the legacy
+index set, measured, then migrated with apply_indexes() and measured again.
+
+Usage:
+    python benchmarks/bench_indexes.py --db data/monitoring_sts.db
+    python benchmarks/bench_indexes.py --db data/monitoring_sts.db --runs 10
+"""
+
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from sqlalchemy import create_engine, text
+from database.indexes import (
+    ADVISED_TABLES, ADVISOR_QUERIES, LEGACY_INDEXES,
+    apply_indexes, explain, uses_covering_index
+)
+from database.schema import Base
+
+
+def copy_database(source: str, target: str):
+    """Copy a SQLite database including pending WAL pages"""
+    src = sqlite3.connect(source)
+    dst = sqlite3.connect(target)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+
+
+def reset_to_legacy(engine):
+    """Replace the schema indexes with the legacy index set"""
+    with engine.begin() as connection:
+        for table_name in ADVISED_TABLES:
+            for index in Base.metadata.tables[table_name].indexes:
+                if not index.unique:
+                    connection.exec_driver_sql(f"DROP INDEX IF EXISTS {index.name}")
+
+        for name, (table_name, columns) in LEGACY_INDEXES.items():
+            connection.exec_driver_sql(
+                f"CREATE INDEX IF NOT EXISTS {name} ON {table_name} ({', '.join(columns)})"
+            )
+        connection.exec_driver_sql("ANALYZE")
+
+
+def measure(engine, runs: int) -> dict:
+    """Get plan and timings of every advisor query"""
+    results = {}
+    with engine.connect() as connection:
+        for name, (sql, params) in ADVISOR_QUERIES.items():
+            plan = explain(connection, sql, params)
+            timings = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                connection.execute(text(sql), params).fetchall()
+                timings.append(time.perf_counter() - start)
+            results[name] = {'plan': plan, 'timings': timings}
+    return results
+
+
+def print_results(label: str, results: dict):
+    """Print plans and median timings of one measurement"""
+    print(f"\n{label}")
+    print("-" * 60)
+    for name, result in results.items():
+        status = 'covering' if uses_covering_index(result['plan']) else 'table lookup'
+        print(f"{name:<20} median={statistics.median(result['timings']) * 1000:8.2f} ms  [{status}]")
+        for line in result['plan']:
+            print(f"    {line}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Covering index benchmark')
+    parser.add_argument('--db', default=os.path.join('data', 'monitoring_sts.db'), help='SQLite database file')
+    parser.add_argument('--runs', type=int, default=5, help='Executions per query (default: 5)')
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"Database not found: {args.db}")
+        sys.exit(1)
+
+    print("=" * 60)
+    print("BENCHMARK aggregate queries - legacy vs covering indexes")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_copy = os.path.join(tmp_dir, 'bench.db')
+        copy_database(args.db, db_copy)
+        engine = create_engine(f"sqlite:///{db_copy}")
+
+        try:
+            reset_to_legacy(engine)
+            before = measure(engine, args.runs)
+            print_results("Legacy indexes", before)
+
+            print("\nApplying index advisor...")
+            apply_indexes(engine)
+            after = measure(engine, args.runs)
+            print_results("Covering indexes", after)
+        finally:
+            engine.dispose()
+
+    print("\nSummary (median)")
+    print("-" * 60)
+    for name in ADVISOR_QUERIES:
+        old = statistics.median(before[name]['timings'])
+        new = statistics.median(after[name]['timings'])
+        speedup = old / new if new else float('inf')
+        print(f"{name:<20} {old * 1000:8.2f} ms -> {new * 1000:8.2f} ms  ({speedup:5.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
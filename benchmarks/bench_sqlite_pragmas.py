@@ -0,0 +1,87 @@
+"""
+Benchmark get_all_transactions latency with and without SQLITE_PRAGMAS
+
+Each mode runs in a fresh process so the engine picks up its own settings.
+
+Usage:
+    python benchmarks/bench_sqlite_pragmas.py --db data/monitoring_sts.db
+    python benchmarks/bench_sqlite_pragmas.py --db data/monitoring_sts.db --runs 10
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+
+def run_child(runs: int):
+    """Time get_all_transactions in the current process and print JSON"""
+    from utils.data_service import DataService
+
+    service = DataService()
+    timings = []
+    rows = 0
+
+    for _ in range(runs):
+        start = time.perf_counter()
+        df = service.get_all_transactions(use_cache=False)
+        timings.append(time.perf_counter() - start)
+        rows = len(df)
+
+    print(json.dumps({'rows': rows, 'timings': timings}))
+
+
+def run_mode(db_path: str, runs: int, pragmas_enabled: bool) -> dict:
+    """Run the child benchmark in a subprocess with the given settings"""
+    env = dict(os.environ)
+    env['DATABASE_URL'] = f"sqlite:///{os.path.abspath(db_path)}"
+    env['SQLITE_PRAGMAS_ENABLED'] = str(pragmas_enabled)
+
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', '--runs', str(runs)],
+        cwd=ROOT_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SQLite pragma benchmark')
+    parser.add_argument('--db', default=os.path.join('data', 'monitoring_sts.db'), help='SQLite database file')
+    parser.add_argument('--runs', type=int, default=5, help='Loads per mode (default: 5)')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.runs)
+        return
+
+    if not os.path.exists(args.db):
+        print(f"Database not found: {args.db}")
+        sys.exit(1)
+
+    print("=" * 60)
+    print("BENCHMARK get_all_transactions - SQLite pragmas")
+    print("=" * 60)
+
+    for enabled in (False, True):
+        result = run_mode(args.db, args.runs, enabled)
+        timings = result['timings']
+        label = 'SQLITE_PRAGMAS' if enabled else 'SQLite defaults'
+        print(
+            f"{label:<16} rows={result['rows']:<9} "
+            f"first={timings[0] * 1000:8.1f} ms  "
+            f"median={statistics.median(timings) * 1000:8.1f} ms  "
+            f"min={min(timings) * 1000:8.1f} ms"
+        )
+
+
+if __name__ == '__main__':
+    main()
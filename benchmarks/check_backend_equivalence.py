@@ -0,0 +1,169 @@
+"""
+Check that the DuckDB backend returns the same results as the pandas backend
+
+Compares, for a set of filter combinations, the filtered rows and every
+summary of the pandas backend with the DuckDB backend answering from the
+Parquet snapshots (the path the dashboard takes), and with DuckDB
+aggregating the pandas frame. Exits with status 1 on any difference.
+
+Usage:
+    python benchmarks/check_backend_equivalence.py --db data/monitoring_sts.db
+    python benchmarks/check_backend_equivalence.py --db data/monitoring_sts.db --export
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+SUMMARY_METHODS = [
+    'get_opd_summary', 'get_payment_summary', 'get_daily_trend',
+    'get_monthly_summary', 'get_bendahara_summary',
+]
+
+
+def filter_cases(df: pd.DataFrame) -> list:
+    """Filter combinations covering every period type and both list filters"""
+    if df.empty:
+        return [{'period_type': 'Semua Data'}]
+
+    from utils.kalender import lookup
+
+    calendar = lookup(df['hari_key'])
+    year = int(calendar['tahun'].max())
+    sample = calendar[calendar['tahun'] == year].iloc[(calendar['tahun'] == year).sum() // 2]
+    opds = df['nama_opd'].value_counts().index[:3].tolist()
+    payment = df['jenis_pembayaran_nama'].value_counts().index[0]
+
+    return [
+        {'period_type': 'Semua Data'},
+        {'period_type': 'Harian', 'selected_date': sample['tanggal']},
+        {'period_type': 'Mingguan', 'selected_week': int(sample['minggu_iso']),
+         'selected_year': int(sample['tahun_iso'])},
+        {'period_type': 'Bulanan', 'selected_month': int(sample['bulan']), 'selected_year': year},
+        {'period_type': 'Tahunan', 'selected_year': year, 'selected_opd': opds},
+        {'period_type': 'Rentang Tanggal', 'start_date': calendar['tanggal'].min(),
+         'end_date': sample['tanggal'], 'selected_payment': payment},
+    ]
+
+
+def compare_frames(expected: pd.DataFrame, actual: pd.DataFrame, sort_by: list) -> str:
+    """Compare two results ignoring row order and dtype differences"""
+    if expected.empty and actual.empty:
+        return ''
+    if list(expected.columns) != list(actual.columns):
+        return f"columns {list(expected.columns)} != {list(actual.columns)}"
+
+    # Categories of the backends come in different orders; compare values
+    expected, actual = (
+        frame.astype({col: object for col in frame.columns if isinstance(frame[col].dtype, pd.CategoricalDtype)})
+        .sort_values(sort_by).reset_index(drop=True)
+        for frame in (expected, actual)
+    )
+    try:
+        pd.testing.assert_frame_equal(
+            expected, actual, check_dtype=False, check_categorical=False, rtol=1e-9
+        )
+    except AssertionError as e:
+        return str(e).splitlines()[0]
+    return ''
+
+
+def main():
+    parser = argparse.ArgumentParser(description='DuckDB backend equivalence check')
+    parser.add_argument('--db', default=os.path.join('data', 'monitoring_sts.db'), help='SQLite database file')
+    parser.add_argument('--export', action='store_true', help='Export Parquet snapshots first')
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"Database not found: {args.db}")
+        sys.exit(1)
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.abspath(args.db)}"
+
+    from utils.data_service import DataService
+    from utils.duckdb_service import DuckDBDataService
+
+    if args.export:
+        from database.connection import get_db_manager
+        from database.snapshot import export_snapshot
+        with get_db_manager().session_scope() as session:
+            export_snapshot(session)
+
+    pandas_service = DataService()
+    duckdb_service = DuckDBDataService()
+
+    df_pandas = pandas_service.get_all_transactions()
+
+    failures = []
+
+    def check(label: str, error: str):
+        print(f"  {'FAIL' if error else 'ok  '} {label}" + (f": {error}" if error else ''))
+        if error:
+            failures.append(label)
+
+    def check_metrics(label: str, expected: dict, actual: dict):
+        check(label, '' if all(
+            abs(float(expected[key]) - float(actual[key])) <= 1e-9 * max(1.0, abs(float(expected[key])))
+            for key in expected
+        ) else f"{expected} != {actual}")
+
+    print("=" * 60)
+    print("BACKEND EQUIVALENCE - pandas vs DuckDB")
+    print("=" * 60)
+
+    check('get_all_transactions', compare_frames(df_pandas, duckdb_service.get_all_transactions(), ['id']))
+    check('get_opd_list', '' if pandas_service.get_opd_list() == duckdb_service.get_opd_list() else 'differs')
+    check('get_payment_types', '' if pandas_service.get_payment_types() == duckdb_service.get_payment_types()
+          else 'differs')
+
+    timings = {'pandas': 0.0, 'duckdb': 0.0}
+
+    for case in filter_cases(df_pandas):
+        label = ', '.join(f"{key}={value}" for key, value in case.items())
+        print(f"\n{label}")
+
+        start = time.perf_counter()
+        expected, expected_label = pandas_service.filter_data(df_pandas, **case)
+        timings['pandas'] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        selection = duckdb_service.get_filtered_selection(case)
+        timings['duckdb'] += time.perf_counter() - start
+
+        actual, actual_label = duckdb_service.get_filtered_data(case)
+        check('get_filtered_data', compare_frames(expected, actual, ['id']) or
+              ('' if expected_label == actual_label else f"label {expected_label!r} != {actual_label!r}"))
+
+        metrics_pandas = pandas_service.get_summary_metrics(expected)
+        check_metrics('get_summary_metrics', metrics_pandas, duckdb_service.get_summary_metrics(selection))
+        check_metrics('get_summary_metrics (frame)', metrics_pandas, duckdb_service.get_summary_metrics(expected))
+
+        for method in SUMMARY_METHODS:
+            start = time.perf_counter()
+            result_pandas = getattr(pandas_service, method)(expected)
+            timings['pandas'] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            result_duckdb = getattr(duckdb_service, method)(selection)
+            timings['duckdb'] += time.perf_counter() - start
+
+            sort_by = [col for col in result_pandas.columns if col not in ('total', 'rata_rata', 'persentase')]
+            check(method, compare_frames(result_pandas, result_duckdb, sort_by))
+            check(f"{method} (frame)", compare_frames(result_pandas, getattr(duckdb_service, method)(expected), sort_by))
+
+    print(f"\nTotal filter + summary time: pandas {timings['pandas']:.3f} s, duckdb {timings['duckdb']:.3f} s")
+
+    if failures:
+        print(f"\n{len(failures)} check(s) failed")
+        sys.exit(1)
+    print("\nAll checks passed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,418 @@
+"""
+Generate reproducible synthetic STS data at a configurable scale
+
+Produces OPD, Bendahara, Rekening and Transaksi data with the skew seen in
+production: a few OPDs and their bendahara receive most of the payments,
+payment type mixes differ per OPD, volume follows working days and hours
+with a fiscal year-end peak in December, amounts are log-normal per OPD,
+and yearly volume grows. The same --seed always produces the same data.
+
+Output is either the migration input files (--out, loaded with
+run_migration) or a ready SQLite database (--db), which bulk-inserts
+transaksi and rebuilds the derived tables; use --db beyond ~200k rows.
+
+Usage:
+    python benchmarks/generate_data.py --rows 100k --out /tmp/sts_100k
+    python benchmarks/generate_data.py --rows 1M --db /tmp/sts_1m.db
+    python benchmarks/generate_data.py --rows 10M --db /tmp/sts_10m.db --start-year 2021 --years 5
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+# Input file names expected by database/migrate_data.py
+OPD_FILE = "TABEL_REFERENSI_KASDASTS.xlsx"
+REKENING_FILE = "rek_202512100823.csv"
+BENDAHARA_FILE = "bpp_202512100822.csv"
+TRANSAKSI_FILE = "kasdasts_202512100801.csv"
+
+CHUNK_ROWS = 100000
+
+# Share of transactions per jenis_pembayaran (config.PAYMENT_TYPES)
+PAYMENT_WEIGHTS = {1: 0.20, 2: 0.10, 3: 0.10, 4: 0.35, 5: 0.25}
+# Relative volume per month, fiscal year-end peak in December
+MONTH_WEIGHTS = [0.80, 0.85, 1.10, 0.95, 0.95, 1.00, 1.00, 0.95, 1.00, 1.05, 1.10, 1.60]
+# Relative volume per weekday (Monday first)
+WEEKDAY_WEIGHTS = [1.10, 1.00, 1.00, 1.00, 0.90, 0.25, 0.05]
+YEARLY_GROWTH = 0.08
+
+CITIES = [
+    'Surabaya', 'Malang', 'Sidoarjo', 'Gresik', 'Kediri', 'Madiun', 'Jember',
+    'Banyuwangi', 'Blitar', 'Mojokerto', 'Pasuruan', 'Probolinggo', 'Tuban',
+    'Lamongan', 'Bojonegoro', 'Ngawi', 'Ponorogo', 'Pacitan', 'Situbondo',
+    'Bondowoso', 'Lumajang', 'Jombang', 'Nganjuk', 'Magetan', 'Trenggalek',
+    'Tulungagung', 'Bangkalan', 'Sampang', 'Pamekasan', 'Sumenep', 'Batu',
+]
+AGENCIES = [
+    'Dinas Pendidikan', 'Dinas Kesehatan', 'Dinas Pekerjaan Umum Bina Marga',
+    'Dinas Perhubungan', 'Dinas Kelautan dan Perikanan', 'Dinas Pertanian',
+    'Dinas Tenaga Kerja dan Transmigrasi', 'Dinas Energi dan Sumber Daya Mineral',
+    'Dinas Kebudayaan dan Pariwisata', 'Dinas Lingkungan Hidup',
+    'Dinas Perindustrian dan Perdagangan', 'Dinas Peternakan', 'Dinas Sosial',
+    'Dinas Kehutanan', 'Dinas Pemuda dan Olahraga', 'Badan Pendapatan Daerah',
+]
+UNIT_TEMPLATES = [
+    'UPT Pendapatan {city}', 'Rumah Sakit Umum Daerah {city}', 'SMK Negeri {n} {city}',
+    'SMA Negeri {n} {city}', 'UPT Pelabuhan Perikanan {city}', 'UPT Laboratorium {city}',
+    'UPT Balai Latihan Kerja {city}', 'UPT Pengujian Kendaraan {city}',
+]
+FIRST_NAMES = [
+    'Agus', 'Budi', 'Dewi', 'Eko', 'Fitri', 'Hadi', 'Indah', 'Joko', 'Kartika',
+    'Lestari', 'Made', 'Nur', 'Putri', 'Rina', 'Sari', 'Teguh', 'Wahyu', 'Yuni',
+]
+LAST_NAMES = [
+    'Santoso', 'Wibowo', 'Rahayu', 'Susanto', 'Hidayat', 'Pratama', 'Kusuma',
+    'Setiawan', 'Handayani', 'Purnomo', 'Wijaya', 'Saputra', 'Anggraini',
+]
+REKENING_NAMES = [
+    'Retribusi Pelayanan Kesehatan', 'Retribusi Jasa Usaha', 'Retribusi Pemakaian Kekayaan Daerah',
+    'Retribusi Tempat Rekreasi', 'Retribusi Pelayanan Pendidikan', 'Retribusi Izin Trayek',
+    'Pendapatan BLUD', 'Penerimaan Jasa Giro', 'Hasil Penjualan Aset', 'Sewa Tanah dan Bangunan',
+    'Retribusi Pengujian Kendaraan', 'Retribusi Pelayanan Pelabuhan', 'Denda Keterlambatan',
+]
+
+
+def parse_rows(value: str) -> int:
+    """Parse a row count such as 100000, 100k, 1M or 10M"""
+    value = value.strip().lower()
+    multiplier = {'k': 1000, 'm': 1000000}.get(value[-1:], 1)
+    number = value[:-1] if multiplier > 1 else value
+    return int(float(number) * multiplier)
+
+
+def _zipf_weights(n: int, exponent: float) -> np.ndarray:
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return weights / weights.sum()
+
+
+def generate_reference(rng: np.random.Generator, n_opd: int = 150, n_rekening: int = 1200,
+                       n_bendahara: int = 1500) -> dict:
+    """
+    Generate the reference tables in the layout of the migration input files
+
+    Returns:
+        Dictionary with 'opd', 'rekening' and 'bendahara' DataFrames plus
+        the per-OPD weights used to generate transactions
+    """
+    names = list(AGENCIES)
+    while len(names) < n_opd:
+        template = UNIT_TEMPLATES[rng.integers(len(UNIT_TEMPLATES))]
+        name = template.format(city=CITIES[rng.integers(len(CITIES))], n=int(rng.integers(1, 12)))
+        if name not in names:
+            names.append(name)
+    names = names[:n_opd]
+
+    opd = pd.DataFrame({
+        'KODE REK': [f"{100 + i // 10:03d}{i % 10:02d}{i:05d}00000" for i in range(n_opd)],
+        'OPD': names,
+        'TAHUN': 2025,
+        'KODE QRCODE': [str(100 * (i + 1)) for i in range(n_opd)],
+    })
+
+    rekening = pd.DataFrame({
+        'KODE': [f"4102{i // 100:02d}{i % 100:02d}{int(rng.integers(1, 99)):02d}01" for i in range(n_rekening)],
+        'NAMA_REK': [REKENING_NAMES[i % len(REKENING_NAMES)] for i in range(n_rekening)],
+        'TAHUN': 2025,
+        'SKT': None,
+        'PREFIX': None,
+    }).drop_duplicates('KODE')
+
+    bendahara = pd.DataFrame({
+        'IDSIBAKU': np.arange(9000000, 9000000 + n_bendahara),
+        'IP': [f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}" for i in range(n_bendahara)],
+        'NAMA': [
+            f"{FIRST_NAMES[rng.integers(len(FIRST_NAMES))]} {LAST_NAMES[rng.integers(len(LAST_NAMES))]}"
+            for _ in range(n_bendahara)
+        ],
+        'NIP': [
+            f"19{int(rng.integers(60, 99))}{int(rng.integers(1, 13)):02d}{int(rng.integers(1, 29)):02d} "
+            f"20{int(rng.integers(0, 20)):02d}{int(rng.integers(1, 13)):02d} {int(rng.integers(1, 3))} "
+            f"{int(rng.integers(1, 999)):03d}"
+            for _ in range(n_bendahara)
+        ],
+        'TGINSERT': '2018-01-01 00:00:00.000',
+    })
+
+    # Shuffle so the busiest OPDs are not simply the first codes
+    opd_weights = _zipf_weights(n_opd, 1.2)[rng.permutation(n_opd)]
+    payment_types = np.array(list(PAYMENT_WEIGHTS))
+    payment_mix = rng.dirichlet(np.array(list(PAYMENT_WEIGHTS.values())) * 20, size=n_opd)
+    amount_median = np.exp(rng.normal(np.log(250000), 1.2, size=n_opd))
+
+    # Each OPD collects on a few rekening and has a few bendahara
+    rekening_codes = rekening['KODE'].to_numpy()
+    opd_rekening = [rng.choice(rekening_codes, size=int(rng.integers(3, 16)), replace=False) for _ in range(n_opd)]
+    bendahara_ids = bendahara['IDSIBAKU'].to_numpy()
+    owner = rng.choice(n_opd, size=n_bendahara, p=opd_weights * 0.5 + 0.5 / n_opd)
+    opd_bendahara = [bendahara_ids[owner == i] for i in range(n_opd)]
+    for i in range(n_opd):
+        if len(opd_bendahara[i]) == 0:
+            opd_bendahara[i] = rng.choice(bendahara_ids, size=1)
+
+    return {
+        'opd': opd,
+        'rekening': rekening,
+        'bendahara': bendahara,
+        'opd_weights': opd_weights,
+        'payment_types': payment_types,
+        'payment_mix': payment_mix,
+        'amount_median': amount_median,
+        'opd_rekening': opd_rekening,
+        'opd_bendahara': opd_bendahara,
+    }
+
+
+def _day_weights(start_year: int, years: int) -> tuple:
+    """Calendar days of the period and their share of the volume"""
+    days = pd.date_range(f"{start_year}-01-01", f"{start_year + years - 1}-12-31", freq='D')
+    weights = (
+        np.array(MONTH_WEIGHTS)[days.month - 1]
+        * np.array(WEEKDAY_WEIGHTS)[days.weekday]
+        * (1 + YEARLY_GROWTH) ** np.asarray(days.year - start_year)
+    )
+    return days.values.astype('datetime64[s]'), weights / weights.sum()
+
+
+def _flatten(groups: list) -> tuple:
+    """Concatenate per-OPD arrays into (values, offsets, sizes)"""
+    sizes = np.array([len(group) for group in groups])
+    offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    return np.concatenate(groups), offsets, sizes
+
+
+def _pick_per_opd(rng: np.random.Generator, choices: tuple, opd_index: np.ndarray,
+                  exponent: float) -> np.ndarray:
+    """Pick one value per row from its OPD's group, Zipf-skewed towards the first"""
+    values, offsets, sizes = choices
+    rank = np.minimum(rng.zipf(exponent, size=len(opd_index)) - 1, sizes[opd_index] - 1)
+    return values[offsets[opd_index] + rank]
+
+
+def generate_transaksi(rng: np.random.Generator, reference: dict, rows: int, start_year: int,
+                       years: int, chunk_rows: int = CHUNK_ROWS):
+    """
+    Generate transactions in the layout of the transaksi CSV, chunk by chunk
+
+    Yields:
+        DataFrames of at most chunk_rows rows
+    """
+    days, day_weights = _day_weights(start_year, years)
+    opd_codes = reference['opd']['KODE REK'].to_numpy()
+    n_opd = len(opd_codes)
+    payment_cdf = np.cumsum(reference['payment_mix'], axis=1)
+    rekening_choices = _flatten(reference['opd_rekening'])
+    bendahara_choices = _flatten(reference['opd_bendahara'])
+
+    for offset in range(0, rows, chunk_rows):
+        n = min(chunk_rows, rows - offset)
+
+        opd_index = rng.choice(n_opd, size=n, p=reference['opd_weights'])
+
+        # Working hours, centred on late morning
+        seconds = np.clip(rng.normal(10.5 * 3600, 2.0 * 3600, size=n), 7 * 3600, 20 * 3600).astype('int64')
+        tanggal_terima = rng.choice(days, size=n, p=day_weights) + seconds.astype('timedelta64[s]')
+        tanggal_setor = tanggal_terima + rng.integers(600, 3 * 86400, size=n).astype('timedelta64[s]')
+        tanggal_validasi = tanggal_setor + rng.integers(60, 86400, size=n).astype('timedelta64[s]')
+
+        # Payment type from the OPD's own mix
+        draws = rng.random(n)
+        payment_index = (draws[:, None] > payment_cdf[opd_index]).sum(axis=1)
+        payment = reference['payment_types'][np.minimum(payment_index, len(reference['payment_types']) - 1)]
+
+        # Log-normal amounts around the OPD's median, mostly whole hundreds
+        amount = reference['amount_median'][opd_index] * np.exp(rng.normal(0, 0.9, size=n))
+        amount = np.where(rng.random(n) < 0.9, np.round(amount, -2), np.round(amount, 2))
+        amount = np.maximum(amount, 1000.0)
+
+        # Within an OPD a few rekening and bendahara take most rows
+        rekening = _pick_per_opd(rng, rekening_choices, opd_index, 1.5)
+        kasir = _pick_per_opd(rng, bendahara_choices, opd_index, 1.8).astype(object)
+        kasir[rng.random(n) < 0.01] = None
+
+        tanggal_validasi = pd.Series(tanggal_validasi).where(rng.random(n) >= 0.02)
+        years_of_row = tanggal_terima.astype('datetime64[Y]').astype(int) + 1970
+        ids = np.arange(offset, offset + n)
+
+        yield pd.DataFrame({
+            'KDBILL': [f"{year}{row_id:012d}" for year, row_id in zip(years_of_row, ids)],
+            'TGTERIMA': tanggal_terima,
+            'TGSETOR': tanggal_setor,
+            'TGVALIDBANK': tanggal_validasi,
+            'AYAT': [code + rek for code, rek in zip(opd_codes[opd_index], rekening)],
+            'KDKASIR': kasir,
+            'RPPOKOK': amount,
+            'KDTUNAI': payment,
+            'MINGGU': pd.DatetimeIndex(tanggal_terima).isocalendar().week.to_numpy(),
+            'REKASAL': None,
+            'REKTUJUAN': '0011223344',
+            'KDKEG': None,
+            'NOREF': [f"REF{row_id:010d}" for row_id in ids],
+            'NOREG': None,
+            'KETUM': 'Penerimaan retribusi daerah',
+            'KETUS': [f"Setoran STS {code}" for code in opd_codes[opd_index]],
+        })
+
+
+def write_reference_files(reference: dict, out_dir: str):
+    """Write the OPD, Rekening and Bendahara input files of the migration"""
+    os.makedirs(out_dir, exist_ok=True)
+    reference['opd'].to_excel(os.path.join(out_dir, OPD_FILE), sheet_name='OPD', index=False)
+    reference['rekening'].to_csv(os.path.join(out_dir, REKENING_FILE), index=False)
+    reference['bendahara'].to_csv(os.path.join(out_dir, BENDAHARA_FILE), index=False)
+
+
+def write_files(reference: dict, chunks, out_dir: str) -> int:
+    """Write all migration input files; returns the number of transactions"""
+    write_reference_files(reference, out_dir)
+
+    path = os.path.join(out_dir, TRANSAKSI_FILE)
+    count = 0
+    for i, chunk in enumerate(chunks):
+        chunk.to_csv(path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+        count += len(chunk)
+    return count
+
+
+def build_database(reference: dict, chunks, db_path: str) -> int:
+    """
+    Create a SQLite database with the generated data
+
+    Reference tables go through the migration functions; transaksi rows are
+    bulk-inserted without the ORM and the derived tables rebuilt afterwards.
+
+    Returns:
+        Number of transactions
+    """
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.abspath(db_path)}"
+
+    from sqlalchemy import insert
+    from database.connection import get_db_engine, get_db_manager
+    from database.schema import Base, Transaksi
+    from database.indexes import apply_indexes
+    from database.migrate_data import (
+        migrate_users, migrate_opd, migrate_rekening, migrate_bendahara,
+        ensure_derived_tables, create_dashboard_config
+    )
+    from utils.formatters import rupiah_to_sen
+
+    engine = get_db_engine()
+    Base.metadata.create_all(engine)
+    apply_indexes(engine)
+
+    with tempfile.TemporaryDirectory() as reference_dir:
+        write_reference_files(reference, reference_dir)
+
+        with get_db_manager().bulk_load_scope(rebuild_indexes=True) as session:
+            migrate_users(session)
+            opd_map = migrate_opd(session, reference_dir)
+            rek_map = migrate_rekening(session, reference_dir)
+            bendahara_map = migrate_bendahara(session, reference_dir)
+
+            print("\nInserting transaksi...")
+            count = 0
+            for chunk in chunks:
+                kasir = chunk['KDKASIR']
+                rows = pd.DataFrame({
+                    'kode_billing': chunk['KDBILL'],
+                    'opd_id': chunk['AYAT'].str[:15].map(opd_map),
+                    'rekening_id': chunk['AYAT'].str[15:].map(rek_map),
+                    'bendahara_id': kasir.map(bendahara_map),
+                    'ayat': chunk['AYAT'],
+                    'nominal': chunk['RPPOKOK'],
+                    'nominal_sen': chunk['RPPOKOK'].map(rupiah_to_sen),
+                    'tanggal_terima': chunk['TGTERIMA'],
+                    'tanggal_setor': chunk['TGSETOR'],
+                    'tanggal_validasi_bank': chunk['TGVALIDBANK'],
+                    'jenis_pembayaran': chunk['KDTUNAI'],
+                    'minggu': chunk['MINGGU'],
+                    'rekening_tujuan': chunk['REKTUJUAN'],
+                    'no_ref': chunk['NOREF'],
+                    'keterangan_umum': chunk['KETUM'],
+                    'keterangan_khusus': chunk['KETUS'],
+                })
+                records = rows.astype(object).where(rows.notna(), None).to_dict('records')
+                for record in records:
+                    for col in ('tanggal_terima', 'tanggal_setor', 'tanggal_validasi_bank'):
+                        if record[col] is not None:
+                            record[col] = record[col].to_pydatetime()
+
+                session.execute(insert(Transaksi), records)
+                session.commit()
+                count += len(records)
+                print(f"    Inserted {count:,} transactions...")
+
+            ensure_derived_tables(session)
+            create_dashboard_config(session)
+
+    return count
+
+
+def ensure_synthetic_db(rows: int, seed: int = 42, directory: str = None) -> str:
+    """
+    Path of a synthetic database with the given size, generated on first use
+
+    The database is built by a separate process so the caller's
+    DATABASE_URL and imported modules are left untouched.
+    """
+    directory = directory or tempfile.gettempdir()
+    db_path = os.path.join(directory, f"sts_synthetic_{rows}_{seed}.db")
+    if not os.path.exists(db_path):
+        print(f"Generating synthetic database with {rows:,} rows: {db_path}")
+        # Built under another name, so an interrupted run is not reused
+        tmp_path = f"{db_path}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--rows', str(rows),
+             '--seed', str(seed), '--db', tmp_path],
+            cwd=ROOT_DIR, check=True, stdout=subprocess.DEVNULL
+        )
+        os.replace(tmp_path, db_path)
+    return db_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Synthetic STS data generator')
+    parser.add_argument('--rows', default='100k', help='Transactions to generate, e.g. 100k, 1M, 10M')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+    parser.add_argument('--start-year', type=int, default=2023, help='First year (default: 2023)')
+    parser.add_argument('--years', type=int, default=3, help='Number of years (default: 3)')
+    parser.add_argument('--opd', type=int, default=150, help='Number of OPDs (default: 150)')
+    parser.add_argument('--out', help='Write migration input files to this directory')
+    parser.add_argument('--db', help='Build this SQLite database directly')
+
+    args = parser.parse_args()
+
+    if not args.out and not args.db:
+        parser.error('one of --out or --db is required')
+    if args.db and os.path.exists(args.db):
+        parser.error(f'database already exists: {args.db}')
+
+    rows = parse_rows(args.rows)
+    rng = np.random.default_rng(args.seed)
+    reference = generate_reference(rng, n_opd=args.opd)
+    chunks = generate_transaksi(rng, reference, rows, args.start_year, args.years)
+
+    start = time.perf_counter()
+    if args.db:
+        count = build_database(reference, chunks, args.db)
+        target = args.db
+    else:
+        count = write_files(reference, chunks, args.out)
+        target = args.out
+
+    print(f"\n{count:,} transaksi generated in {time.perf_counter() - start:.1f} s -> {target}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,700 @@
+"""
+Load test the dashboard with concurrent simulated users
+
+Starts the app (run.py --serve, or the development server with
+--dev-server) on a synthetic or given database and lets N users work it
+the way a browser does: each user loads the page and logs in, then
+changes period/OPD/payment filters, switches detail tabs and idles while
+the refresh-interval fires. Callbacks are posted to _dash-update-component
+with the inputs and state the Dash renderer would send, and their outputs
+are applied to the user's copy of the layout, so chained callbacks carry
+the real payloads (filtered-data-store feeds eleven callbacks).
+
+Reports request throughput, latency percentiles per callback and the
+memory of the server process tree, to size WEB_WORKERS/WEB_THREADS ahead
+of the fiscal year-end peak. Each user sends one request at a time.
+
+Usage:
+    python benchmarks/load_test.py --rows 1M --users 50 --duration 300
+    python benchmarks/load_test.py --rows 200k --users 20 --workers 2 --threads 8
+    python benchmarks/load_test.py --url http://10.0.0.5:8050 --users 30 --server-pid 4242
+"""
+
+import argparse
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import requests
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import AUTO_REFRESH_INTERVAL
+
+UPDATE_PATH = '/_dash-update-component'
+PERIOD_TYPES = ['Semua Data', 'Harian', 'Mingguan', 'Bulanan', 'Tahunan', 'Rentang Tanggal']
+
+# Relative frequency of user actions between think times
+ACTION_WEIGHTS = {
+    'period_type': 0.20,
+    'period_value': 0.20,
+    'opd': 0.15,
+    'payment': 0.10,
+    'tab': 0.15,
+    'idle': 0.20,
+}
+TABS = ['tab-opd', 'tab-transaction', 'tab-bendahara']
+
+REQUEST_TIMEOUT = 300
+# List values longer than this are kept only as JSON text; store data is
+# sent back to callbacks but never read by the simulated user
+LARGE_VALUE_ITEMS = 1000
+# Callbacks run per user action at most, guarding against callback loops
+MAX_CALLBACKS_PER_ACTION = 100
+
+
+class Recorder:
+    """Thread-safe collection of request timings"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.response_bytes = defaultdict(int)
+        self.actions = defaultdict(int)
+
+    def request(self, name: str, seconds: float, size: int, ok: bool):
+        with self._lock:
+            self.latencies[name].append(seconds)
+            self.response_bytes[name] += size
+            if not ok:
+                self.errors[name] += 1
+
+    def action(self, name: str):
+        with self._lock:
+            self.actions[name] += 1
+
+    def summary(self, elapsed: float) -> dict:
+        """Throughput and latency percentiles per request name and overall"""
+        with self._lock:
+            latencies = {name: list(values) for name, values in self.latencies.items()}
+            errors = dict(self.errors)
+            response_bytes = dict(self.response_bytes)
+            actions = dict(self.actions)
+
+        def stats(values, error_count, size):
+            ms = np.array(values) * 1000
+            return {
+                'count': len(values),
+                'errors': error_count,
+                'per_second': len(values) / elapsed,
+                'p50_ms': float(np.percentile(ms, 50)),
+                'p90_ms': float(np.percentile(ms, 90)),
+                'p95_ms': float(np.percentile(ms, 95)),
+                'p99_ms': float(np.percentile(ms, 99)),
+                'max_ms': float(ms.max()),
+                'mean_response_kb': size / len(values) / 1024,
+            }
+
+        requests_by_name = {
+            name: stats(values, errors.get(name, 0), response_bytes.get(name, 0))
+            for name, values in sorted(latencies.items())
+        }
+        all_values = [value for values in latencies.values() for value in values]
+        total = stats(all_values, sum(errors.values()), sum(response_bytes.values())) if all_values else {}
+
+        return {
+            'elapsed_seconds': elapsed,
+            'actions': actions,
+            'actions_per_second': sum(actions.values()) / elapsed,
+            'total': total,
+            'requests': requests_by_name,
+        }
+
+
+def _collect_components(node, found: dict):
+    """Collect {id: props} of the components in a serialized layout tree"""
+    if isinstance(node, list):
+        for child in node:
+            _collect_components(child, found)
+    elif isinstance(node, dict):
+        props = node.get('props')
+        if 'type' in node and isinstance(props, dict):
+            if isinstance(props.get('id'), str):
+                found[props['id']] = props
+            for value in props.values():
+                _collect_components(value, found)
+
+
+def parse_callbacks(dependencies: list) -> list:
+    """Callback specs from /_dash-dependencies"""
+    callbacks = []
+    for dependency in dependencies:
+        output = dependency['output']
+        multi = output.startswith('..')
+        targets = output[2:-2].split('...') if multi else [output]
+        outputs = [tuple(target.rsplit('.', 1)) for target in targets]
+        callbacks.append({
+            'output': output,
+            'multi': multi,
+            'outputs': outputs,
+            'inputs': [(item['id'], item['property']) for item in dependency['inputs']],
+            'state': [(item['id'], item['property']) for item in dependency['state']],
+            'prevent_initial_call': dependency.get('prevent_initial_call', False),
+            'name': outputs[0][0],
+        })
+    return callbacks
+
+
+class DashClient:
+    """
+    One simulated browser session
+
+    Keeps the props of the components currently in the page and fires
+    callbacks the way the renderer does: when one of their inputs changes,
+    or on their initial call when an input or output component appears,
+    and only after the callbacks producing their inputs have run.
+    """
+
+    def __init__(self, base_url: str, recorder: Recorder):
+        self.base_url = base_url.rstrip('/')
+        self.recorder = recorder
+        self.http = requests.Session()
+        self.callbacks = []
+        self.components = {}  # {id: {prop: value}}
+        self._subtrees = {}  # {id: ids created by setting its children}
+        self._encoded = {}  # {(id, prop): JSON text}, large store values are sent many times
+
+    def _request(self, method: str, path: str, name: str, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = self.http.request(method, self.base_url + path, timeout=REQUEST_TIMEOUT, **kwargs)
+            content = response.content
+            ok = response.status_code < 400
+        except requests.RequestException:
+            response, content, ok = None, b'', False
+        self.recorder.request(name, time.perf_counter() - start, len(content), ok)
+        return response if ok else None
+
+    def load_page(self):
+        """Fetch the page, layout and callbacks, and run the initial callbacks"""
+        self._request('GET', '/', 'GET /')
+        layout = self._request('GET', '/_dash-layout', 'GET /_dash-layout')
+        dependencies = self._request('GET', '/_dash-dependencies', 'GET /_dash-dependencies')
+        if layout is None or dependencies is None:
+            raise RuntimeError('halaman tidak dapat dimuat')
+
+        self.callbacks = parse_callbacks(dependencies.json())
+        new_ids = self._replace_children(None, layout.json())
+        self._run(set(), new_ids)
+
+    def login(self, username: str, password: str) -> bool:
+        self.set_props({'username-input': {'value': username}, 'password-input': {'value': password}},
+                       run=False)
+        self.set_props({'login-button': {'n_clicks': 1}})
+        session_data = self.get_prop('session-store', 'data') or {}
+        return bool(session_data.get('authenticated'))
+
+    def get_prop(self, component_id: str, prop: str):
+        return self.components.get(component_id, {}).get(prop)
+
+    def has(self, component_id: str) -> bool:
+        return component_id in self.components
+
+    def set_props(self, changes: dict, run: bool = True):
+        """Apply a user interaction and run the callbacks it triggers"""
+        changed, new_ids = self._apply(changes)
+        if run:
+            self._run(changed, new_ids)
+
+    def _replace_children(self, component_id, tree) -> set:
+        for old_id in self._subtrees.pop(component_id, ()):
+            self._remove(old_id)
+
+        found = {}
+        _collect_components(tree, found)
+        for new_id, props in found.items():
+            self.components[new_id] = {prop: value for prop, value in props.items() if prop != 'children'}
+        self._subtrees[component_id] = set(found)
+        return set(found)
+
+    def _remove(self, component_id: str):
+        for prop in self.components.pop(component_id, {}):
+            self._encoded.pop((component_id, prop), None)
+        for nested_id in self._subtrees.pop(component_id, ()):
+            self._remove(nested_id)
+
+    def _apply(self, changes: dict) -> tuple:
+        """Set props; returns the changed (id, prop) pairs and the ids of new components"""
+        changed = set()
+        new_ids = set()
+        for component_id, props in changes.items():
+            if component_id not in self.components:
+                continue  # removed while its callback ran
+            for prop, value in props.items():
+                prop = prop.split('@')[0]  # allow_duplicate outputs
+                if prop == 'children':
+                    new_ids |= self._replace_children(component_id, value)
+                elif isinstance(value, list) and len(value) > LARGE_VALUE_ITEMS:
+                    self.components[component_id][prop] = None
+                    self._encoded[(component_id, prop)] = json.dumps(value)
+                else:
+                    self.components[component_id][prop] = value
+                    self._encoded.pop((component_id, prop), None)
+                changed.add((component_id, prop))
+        return changed, new_ids
+
+    def _triggered(self, changed: set, new_ids: set) -> list:
+        """Callbacks to fire with their triggering inputs"""
+        fired = []
+        for callback in self.callbacks:
+            if not any(self.has(component_id) for component_id, _ in callback['outputs']):
+                continue
+            if not any(self.has(component_id) for component_id, _ in callback['inputs']):
+                continue
+            triggers = [item for item in callback['inputs'] if item in changed]
+            # Initial call when an input or output enters the layout
+            initial = not callback['prevent_initial_call'] and any(
+                component_id in new_ids for component_id, _ in callback['inputs'] + callback['outputs']
+            )
+            if triggers or initial:
+                fired.append((callback, triggers))
+        return fired
+
+    def _run(self, changed: set, new_ids: set):
+        queue = self._triggered(changed, new_ids)
+
+        for _ in range(MAX_CALLBACKS_PER_ACTION):
+            if not queue:
+                return
+
+            # Hold back callbacks whose inputs another queued callback produces
+            index = 0
+            for i, (callback, _) in enumerate(queue):
+                pending = {
+                    output for other, _ in queue if other is not callback for output in other['outputs']
+                }
+                if not any(item in pending for item in callback['inputs']):
+                    index = i
+                    break
+
+            callback, triggers = queue.pop(index)
+            changed, new_ids = self._apply(self._post(callback, triggers))
+
+            for next_callback, next_triggers in self._triggered(changed, new_ids):
+                for queued, queued_triggers in queue:
+                    if queued is next_callback:
+                        queued_triggers.extend(t for t in next_triggers if t not in queued_triggers)
+                        break
+                else:
+                    queue.append((next_callback, next_triggers))
+
+    def _encode_value(self, component_id: str, prop: str) -> str:
+        key = (component_id, prop)
+        encoded = self._encoded.get(key)
+        if encoded is None:
+            encoded = self._encoded[key] = json.dumps(self.get_prop(component_id, prop))
+        return encoded
+
+    def _encode_items(self, items: list) -> str:
+        parts = []
+        for component_id, prop in items:
+            head = f'{{"id": {json.dumps(component_id)}, "property": {json.dumps(prop)}'
+            if self.has(component_id):
+                parts.append(f'{head}, "value": {self._encode_value(component_id, prop)}}}')
+            else:
+                parts.append(head + '}')
+        return '[' + ', '.join(parts) + ']'
+
+    def _post(self, callback: dict, triggers: list) -> dict:
+        """Call one callback; returns {id: {prop: value}} of its outputs"""
+        outputs = [{'id': component_id, 'property': prop} for component_id, prop in callback['outputs']]
+        body = (
+            f'{{"output": {json.dumps(callback["output"])}, '
+            f'"outputs": {json.dumps(outputs if callback["multi"] else outputs[0])}, '
+            f'"inputs": {self._encode_items(callback["inputs"])}, '
+            f'"state": {self._encode_items(callback["state"])}, '
+            f'"changedPropIds": {json.dumps([f"{i}.{p}" for i, p in triggers])}}}'
+        )
+        response = self._request('POST', UPDATE_PATH, callback['name'], data=body.encode(),
+                                 headers={'Content-Type': 'application/json'})
+        if response is None or response.status_code == 204:  # error or PreventUpdate
+            return {}
+        return response.json().get('response', {})
+
+
+class SimulatedUser(threading.Thread):
+    """Logs in, then alternates actions and think time until the deadline"""
+
+    def __init__(self, number: int, args, recorder: Recorder, start_at: float, deadline: float):
+        super().__init__(name=f'user-{number}', daemon=True)
+        self.args = args
+        self.recorder = recorder
+        self.start_at = start_at
+        self.deadline = deadline
+        self.random = random.Random(args.seed + number)
+        self.client = DashClient(args.url, recorder)
+        self.error = None
+
+    def run(self):
+        time.sleep(max(self.start_at - time.time(), 0))
+        try:
+            self.client.load_page()
+            if not self.client.login(self.args.username, self.args.password):
+                raise RuntimeError('login gagal')
+            self.recorder.action('login')
+            self._work()
+        except Exception as e:
+            self.error = str(e)
+            self.recorder.action('failed')
+        finally:
+            self.client.http.close()
+
+    def _refresh_period(self) -> float:
+        if self.args.refresh_interval is not None:
+            return self.args.refresh_interval
+        interval = self.client.get_prop('refresh-interval', 'interval')
+        return interval / 1000 if interval else AUTO_REFRESH_INTERVAL
+
+    def _work(self):
+        next_tick = time.time() + self._refresh_period()
+        actions, weights = zip(*ACTION_WEIGHTS.items())
+
+        while time.time() < self.deadline:
+            action = self.random.choices(actions, weights)[0]
+            if action == 'idle':
+                # Sit on the page for one to three refresh ticks
+                time.sleep(max(min(next_tick + self._refresh_period() * self.random.randint(0, 2),
+                                   self.deadline) - time.time(), 0))
+            else:
+                getattr(self, f'_change_{action}')()
+                self.recorder.action(action)
+                time.sleep(min(self.random.expovariate(1 / self.args.think_time), self.args.think_time * 5))
+
+            # The interval keeps firing whatever the user does
+            while time.time() >= next_tick and time.time() < self.deadline:
+                if not self.client.get_prop('refresh-interval', 'disabled'):
+                    count = self.client.get_prop('refresh-interval', 'n_intervals') or 0
+                    self.client.set_props({'refresh-interval': {'n_intervals': count + 1}})
+                    self.recorder.action('refresh')
+                next_tick += self._refresh_period()
+
+    def _options(self, component_id: str) -> list:
+        options = self.client.get_prop(component_id, 'options') or []
+        return [option['value'] if isinstance(option, dict) else option for option in options]
+
+    def _change_period_type(self):
+        current = self.client.get_prop('period-type-dropdown', 'value')
+        choice = self.random.choice([period for period in PERIOD_TYPES if period != current])
+        self.client.set_props({'period-type-dropdown': {'value': choice}})
+
+    def _change_period_value(self):
+        period_type = self.client.get_prop('period-type-dropdown', 'value')
+        if period_type == 'Harian':
+            self.client.set_props({'date-picker-single': {'date': self._random_date('date-picker-single')}})
+        elif period_type == 'Mingguan':
+            self._pick('week-dropdown')
+        elif period_type == 'Bulanan':
+            self._pick('month-dropdown')
+        elif period_type == 'Tahunan':
+            self._pick('year-dropdown')
+        elif period_type == 'Rentang Tanggal':
+            first, second = sorted([self._random_date('date-picker-start'), self._random_date('date-picker-start')])
+            self.client.set_props({'date-picker-start': {'date': first}}, run=False)
+            self.client.set_props({'date-picker-end': {'date': second}})
+        else:
+            self._change_period_type()
+
+    def _random_date(self, component_id: str) -> str:
+        low = self.client.get_prop(component_id, 'min_date_allowed')
+        high = self.client.get_prop(component_id, 'max_date_allowed')
+        if not low or not high:
+            return date.today().isoformat()
+        low = datetime.fromisoformat(str(low)[:10]).date()
+        high = datetime.fromisoformat(str(high)[:10]).date()
+        return (low + timedelta(days=self.random.randint(0, max((high - low).days, 0)))).isoformat()
+
+    def _pick(self, component_id: str):
+        options = self._options(component_id)
+        if options and self.client.has(component_id):
+            self.client.set_props({component_id: {'value': self.random.choice(options)}})
+
+    def _change_opd(self):
+        options = [option for option in self._options('opd-dropdown') if option != 'Semua OPD']
+        if not options or self.random.random() < 0.3:
+            value = ['Semua OPD']
+        else:
+            value = self.random.sample(options, k=min(self.random.randint(1, 3), len(options)))
+        self.client.set_props({'opd-dropdown': {'value': value}})
+
+    def _change_payment(self):
+        self._pick('payment-dropdown')
+
+    def _change_tab(self):
+        # Tab contents are rendered up front, so this is client-side unless a
+        # callback listens to active_tab
+        current = self.client.get_prop('detail-tabs', 'active_tab')
+        self.client.set_props({'detail-tabs': {'active_tab': self.random.choice(
+            [tab for tab in TABS if tab != current])}})
+
+
+def process_tree(pid: int) -> list:
+    """Pids of a process and all its descendants (Linux /proc)"""
+    children = defaultdict(list)
+    for name in os.listdir('/proc'):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f'/proc/{name}/stat') as f:
+                # The command may contain spaces; fields after it are fixed
+                parent = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children[parent].append(int(name))
+
+    pids, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        pids.append(current)
+        stack.extend(children[current])
+    return pids
+
+
+def _read_kb(path: str, field: str):
+    try:
+        with open(path) as f:
+            for line in f:
+                if line.startswith(field):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def tree_memory_mb(pid: int) -> dict:
+    """RSS and PSS of a process tree; PSS counts shared pages once across workers"""
+    rss = pss = 0
+    pss_known = True
+    pids = process_tree(pid)
+    for current in pids:
+        rss += _read_kb(f'/proc/{current}/status', 'VmRSS:') or 0
+        value = _read_kb(f'/proc/{current}/smaps_rollup', 'Pss:')
+        if value is None:
+            pss_known = False
+        else:
+            pss += value
+    return {'processes': len(pids), 'rss_mb': rss / 1024, 'pss_mb': pss / 1024 if pss_known else None}
+
+
+class MemoryMonitor(threading.Thread):
+    """Samples the memory of the server process tree every second"""
+
+    def __init__(self, pid: int):
+        super().__init__(name='memory-monitor', daemon=True)
+        self.pid = pid
+        self.samples = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self.samples.append(tree_memory_mb(self.pid))
+            self._stop_event.wait(1.0)
+
+    def stop(self) -> dict:
+        self._stop_event.set()
+        self.join()
+        if not self.samples:
+            return {}
+        pss = [sample['pss_mb'] for sample in self.samples if sample['pss_mb'] is not None]
+        return {
+            'processes': self.samples[-1]['processes'],
+            'start_rss_mb': self.samples[0]['rss_mb'],
+            'peak_rss_mb': max(sample['rss_mb'] for sample in self.samples),
+            'end_rss_mb': self.samples[-1]['rss_mb'],
+            'peak_pss_mb': max(pss) if pss else None,
+            'end_pss_mb': pss[-1] if pss else None,
+        }
+
+
+def start_server(args, db_path: str, log_path: str) -> subprocess.Popen:
+    """Start the dashboard on the database and wait until /ready answers 200"""
+    env = dict(os.environ)
+    env.update({
+        'DATABASE_URL': f"sqlite:///{os.path.abspath(db_path)}",
+        'HOST': '127.0.0.1',
+        'PORT': str(args.port),
+        'DEBUG': 'False',
+        'WEB_WORKERS': str(args.workers),
+        'WEB_THREADS': str(args.threads),
+    })
+    command = [sys.executable, os.path.join(ROOT_DIR, 'run.py')]
+    if not args.dev_server:
+        command.append('--serve')
+
+    with open(log_path, 'w') as log:
+        server = subprocess.Popen(command, cwd=ROOT_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+    deadline = time.time() + args.startup_timeout
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"server berhenti saat start, lihat {log_path}")
+        try:
+            if requests.get(f"{args.url}/ready", timeout=5).status_code == 200:
+                return server
+        except requests.RequestException:
+            pass
+        time.sleep(1)
+
+    server.terminate()
+    raise RuntimeError(f"server tidak siap dalam {args.startup_timeout} s, lihat {log_path}")
+
+
+def print_report(report: dict):
+    summary = report['summary']
+    total = summary['total']
+    print(f"\nDurasi {summary['elapsed_seconds']:.0f} s, {report['meta']['users']} user, "
+          f"{sum(summary['actions'].values())} aksi ({summary['actions_per_second']:.2f}/s)")
+    print(f"Aksi: {', '.join(f'{name}={count}' for name, count in sorted(summary['actions'].items()))}")
+    if total:
+        print(f"Request: {total['count']} ({total['per_second']:.1f}/s), error {total['errors']}, "
+              f"p50 {total['p50_ms']:.0f} ms, p95 {total['p95_ms']:.0f} ms, p99 {total['p99_ms']:.0f} ms")
+
+    print(f"\n{'request':<32} {'count':>7} {'err':>5} {'req/s':>7} {'p50 ms':>8} {'p90 ms':>8} "
+          f"{'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'resp KB':>9}")
+    for name, stats in summary['requests'].items():
+        print(f"{name:<32} {stats['count']:>7} {stats['errors']:>5} {stats['per_second']:>7.2f} "
+              f"{stats['p50_ms']:>8.0f} {stats['p90_ms']:>8.0f} {stats['p95_ms']:>8.0f} "
+              f"{stats['p99_ms']:>8.0f} {stats['max_ms']:>8.0f} {stats['mean_response_kb']:>9.1f}")
+
+    memory = report.get('server_memory')
+    if memory:
+        pss = f", PSS peak {memory['peak_pss_mb']:.0f} MB" if memory.get('peak_pss_mb') else ''
+        print(f"\nServer ({memory['processes']} proses): RSS start {memory['start_rss_mb']:.0f} MB, "
+              f"peak {memory['peak_rss_mb']:.0f} MB, end {memory['end_rss_mb']:.0f} MB{pss}")
+
+    if report['user_errors']:
+        print(f"\n{len(report['user_errors'])} user gagal: {report['user_errors'][0]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Dashboard load test')
+    parser.add_argument('--db', help='SQLite database file')
+    parser.add_argument('--rows', default='200k', help='Synthetic database size when --db and --url are not given')
+    parser.add_argument('--url', help='Test a running server instead of starting one')
+    parser.add_argument('--server-pid', type=int, help='Pid of the running server, for memory sampling with --url')
+    parser.add_argument('--users', type=int, default=20, help='Concurrent users (default: 20)')
+    parser.add_argument('--duration', type=float, default=120, help='Seconds of load (default: 120)')
+    parser.add_argument('--ramp-up', type=float, default=10, help='Seconds over which users start (default: 10)')
+    parser.add_argument('--think-time', type=float, default=5, help='Mean seconds between actions (default: 5)')
+    parser.add_argument('--refresh-interval', type=float,
+                        help=f'Seconds between refresh ticks (default: the layout, {AUTO_REFRESH_INTERVAL})')
+    parser.add_argument('--workers', type=int, default=2, help='WEB_WORKERS of the started server (default: 2)')
+    parser.add_argument('--threads', type=int, default=4, help='WEB_THREADS of the started server (default: 4)')
+    parser.add_argument('--dev-server', action='store_true', help='Start the development server instead of --serve')
+    parser.add_argument('--port', type=int, default=8091, help='Port of the started server (default: 8091)')
+    parser.add_argument('--startup-timeout', type=float, default=600, help='Seconds to wait for /ready')
+    parser.add_argument('--username', default='bapendaptip', help='Login username')
+    parser.add_argument('--password', default='ptipbapenda2025', help='Login password')
+    parser.add_argument('--seed', type=int, default=42, help='Seed of the data and the user behaviour')
+    parser.add_argument('--output', help='Write the report to this JSON file')
+
+    args = parser.parse_args()
+
+    server = None
+    db_path = None
+    if args.url:
+        server_pid = args.server_pid
+    else:
+        if args.db:
+            db_path = args.db
+            if not os.path.exists(db_path):
+                print(f"Database not found: {db_path}")
+                sys.exit(1)
+        else:
+            from generate_data import ensure_synthetic_db, parse_rows
+            db_path = ensure_synthetic_db(parse_rows(args.rows), args.seed)
+
+        args.url = f"http://127.0.0.1:{args.port}"
+        log_path = os.path.join(tempfile.gettempdir(), f"sts_load_test_{args.port}.log")
+        mode = 'development server' if args.dev_server else f"{args.workers} worker x {args.threads} thread"
+        print(f"Starting server ({mode}) on {db_path}, log: {log_path}")
+        start = time.perf_counter()
+        server = start_server(args, db_path, log_path)
+        server_pid = server.pid
+        print(f"Server ready in {time.perf_counter() - start:.1f} s")
+
+    print("=" * 60)
+    print(f"LOAD TEST {args.url} - {args.users} user, {args.duration:.0f} s")
+    print("=" * 60)
+
+    monitor = None
+    if server_pid and os.path.exists('/proc'):
+        monitor = MemoryMonitor(server_pid)
+        monitor.start()
+
+    recorder = Recorder()
+    started = time.time()
+    deadline = started + args.duration
+    users = [
+        SimulatedUser(i, args, recorder, started + args.ramp_up * i / max(args.users, 1), deadline)
+        for i in range(args.users)
+    ]
+
+    try:
+        for user in users:
+            user.start()
+        for user in users:
+            # Actions running at the deadline may finish, within the request timeout
+            user.join(max(deadline - time.time(), 0) + REQUEST_TIMEOUT)
+        elapsed = time.time() - started
+    finally:
+        server_memory = monitor.stop() if monitor else None
+        if server is not None:
+            # SIGINT is the quick shutdown of gunicorn; SIGTERM waits for open connections
+            server.send_signal(signal.SIGINT if os.name == 'posix' else signal.SIGTERM)
+            try:
+                server.wait(30)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+    from bench_data_service import git_commit
+
+    report = {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'url': args.url,
+            'database': os.path.abspath(db_path) if db_path else None,
+            'users': args.users,
+            'duration': args.duration,
+            'think_time': args.think_time,
+            'workers': args.workers if server is not None else None,
+            'threads': args.threads if server is not None else None,
+            'dev_server': args.dev_server if server is not None else None,
+            'commit': git_commit(),
+        },
+        'summary': recorder.summary(elapsed),
+        'server_memory': server_memory,
+        'user_errors': [f"{user.name}: {user.error}" for user in users if user.error],
+    }
+
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -8,7 +8,7 @@ from dash import dcc
 import pandas as pd
 
 from config import COLORS, CHART_COLORS, CHART_COLORSCALE, PLOTLY_LAYOUT, PLOTLY_CONFIG
-from utils.formatters import format_rupiah_short, scale_value
+from utils.formatters import format_rupiah_short, format_rupiah_short_column, scale_value
 
 
 def create_opd_chart(df: pd.DataFrame, top_n: int = 15):
@@ -40,7 +40,7 @@ def create_opd_chart(df: pd.DataFrame, top_n: int = 15):
             colorscale=CHART_COLORSCALE,
             line=dict(color=COLORS['primary'], width=1)
         ),
-        text=chart_data['total'].apply(format_rupiah_short),
+        text=format_rupiah_short_column(chart_data['total']),
         textposition='outside',
         textfont=dict(size=12, color=COLORS['text_primary']),
         hovertemplate='<b>%{y}</b><br>' +
@@ -50,9 +50,8 @@ def create_opd_chart(df: pd.DataFrame, top_n: int = 15):
     ))
 
     fig.update_layout(
-        **PLOTLY_LAYOUT,
+        **dict(PLOTLY_LAYOUT, margin=dict(l=10, r=100, t=10, b=40)),
         height=450,
-        margin=dict(l=10, r=100, t=10, b=40),
         xaxis=dict(
             title=dict(text=f'Total Penerimaan {scale_label}', font=dict(size=13)),
             gridcolor='#eee',
@@ -106,9 +105,8 @@ def create_payment_chart(df: pd.DataFrame):
     )])
 
     fig.update_layout(
-        **PLOTLY_LAYOUT,
+        **dict(PLOTLY_LAYOUT, margin=dict(l=20, r=20, t=20, b=20)),
         height=350,
-        margin=dict(l=20, r=20, t=20, b=20),
         showlegend=False,
         annotations=[dict(
             text=f'<b>{format_rupiah_short(total_all)}</b>',
@@ -155,9 +153,8 @@ def create_trend_chart(df: pd.DataFrame):
     ))
 
     fig.update_layout(
-        **PLOTLY_LAYOUT,
+        **dict(PLOTLY_LAYOUT, margin=dict(l=15, r=15, t=10, b=40)),
         height=380,
-        margin=dict(l=15, r=15, t=10, b=40),
         xaxis=dict(
             title=dict(text='Tanggal', font=dict(size=13)),
             gridcolor='#eee',
@@ -206,7 +203,7 @@ def create_monthly_chart(df: pd.DataFrame):
             colorscale=[[0, COLORS['secondary']], [0.5, COLORS['accent']], [1, COLORS['primary']]],
             line=dict(color=COLORS['white'], width=1)
         ),
-        text=df['total'].apply(format_rupiah_short),
+        text=format_rupiah_short_column(df['total']),
         textposition='outside',
         textfont=dict(size=11),
         hovertemplate='<b>%{x}</b><br>' +
@@ -216,9 +213,8 @@ def create_monthly_chart(df: pd.DataFrame):
     ))
 
     fig.update_layout(
-        **PLOTLY_LAYOUT,
+        **dict(PLOTLY_LAYOUT, margin=dict(l=15, r=15, t=40, b=60)),
         height=350,
-        margin=dict(l=15, r=15, t=40, b=60),
         xaxis=dict(
             title='',
             gridcolor='#eee',
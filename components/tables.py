@@ -7,7 +7,7 @@ import dash_bootstrap_components as dbc
 import pandas as pd
 
 from config import COLORS, TABLE_PAGE_SIZE
-from utils.formatters import format_rupiah, format_date
+from utils.formatters import format_rupiah_column, format_number_column, format_date
 
 
 def create_base_table_style():
@@ -80,11 +80,11 @@ def create_opd_table(df: pd.DataFrame):
 
     # Format columns
     display_df = df.copy()
-    display_df['total'] = display_df['total'].apply(format_rupiah)
-    display_df['rata_rata'] = display_df['rata_rata'].apply(format_rupiah)
-    display_df['minimum'] = display_df['minimum'].apply(format_rupiah)
-    display_df['maksimum'] = display_df['maksimum'].apply(format_rupiah)
-    display_df['jumlah'] = display_df['jumlah'].apply(lambda x: f"{x:,}".replace(",", "."))
+    display_df['total'] = format_rupiah_column(display_df['total'])
+    display_df['rata_rata'] = format_rupiah_column(display_df['rata_rata'])
+    display_df['minimum'] = format_rupiah_column(display_df['minimum'])
+    display_df['maksimum'] = format_rupiah_column(display_df['maksimum'])
+    display_df['jumlah'] = format_number_column(display_df['jumlah'])
 
     columns = [
         {'name': 'Nama OPD', 'id': 'nama_opd'},
@@ -147,7 +147,7 @@ def create_transaction_table(df: pd.DataFrame, max_rows: int = 500):
     display_df['tanggal_terima'] = pd.to_datetime(display_df['tanggal_terima']).dt.strftime('%d/%m/%Y')
     display_df['tanggal_setor'] = pd.to_datetime(display_df['tanggal_setor']).dt.strftime('%d/%m/%Y')
     display_df['tanggal_validasi_bank'] = pd.to_datetime(display_df['tanggal_validasi_bank']).dt.strftime('%d/%m/%Y')
-    display_df['nominal'] = display_df['nominal'].apply(format_rupiah)
+    display_df['nominal'] = format_rupiah_column(display_df['nominal'])
 
     # Select and rename columns
     display_df = display_df[[
@@ -276,8 +276,8 @@ def create_bendahara_table(df: pd.DataFrame, max_rows: int = 100):
 
     # Format columns
     display_df = df.head(max_rows).copy()
-    display_df['total'] = display_df['total'].apply(format_rupiah)
-    display_df['jumlah'] = display_df['jumlah'].apply(lambda x: f"{x:,}".replace(",", "."))
+    display_df['total'] = format_rupiah_column(display_df['total'])
+    display_df['jumlah'] = format_number_column(display_df['jumlah'])
 
     columns = [
         {'name': 'Nama Bendahara', 'id': 'nama_kasir'},
@@ -13,12 +13,63 @@ DEBUG = os.environ.get('DEBUG', 'False').lower() == 'true'
 HOST = os.environ.get('HOST', '0.0.0.0')
 PORT = int(os.environ.get('PORT', 8050))
 
+# Production Server (python run.py --serve: gunicorn, waitress on Windows)
+WEB_WORKERS = int(os.environ.get('WEB_WORKERS', 4))
+WEB_THREADS = int(os.environ.get('WEB_THREADS', 4))  # threads per worker
+WEB_TIMEOUT = int(os.environ.get('WEB_TIMEOUT', 120))  # seconds
+
+# Metrics: callback/DataService timings and payload sizes served at /metrics
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True').lower() == 'true'
+
 # Database Settings
 DATABASE_URL = os.environ.get(
     'DATABASE_URL',
     'sqlite:///data/monitoring_sts.db'
 )
 
+# Read-only database used by dashboard queries. Empty means DATABASE_URL with
+# its own connection pool; can point at a replica or a read-only SQLite URI,
+# e.g. sqlite:///file:data/monitoring_sts.db?mode=ro&uri=true
+DATABASE_READ_URL = os.environ.get('DATABASE_READ_URL', '')
+
+# Connection Pool Settings (primary engine: logins, migration writes)
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))  # seconds
+
+# Connection Pool Settings (read engine: dashboard queries)
+DB_READ_POOL_SIZE = int(os.environ.get('DB_READ_POOL_SIZE', 5))
+DB_READ_MAX_OVERFLOW = int(os.environ.get('DB_READ_MAX_OVERFLOW', 10))
+DB_READ_POOL_TIMEOUT = int(os.environ.get('DB_READ_POOL_TIMEOUT', 10))  # seconds
+
+# SQLite Runtime Settings (applied to every new connection)
+SQLITE_PRAGMAS_ENABLED = os.environ.get('SQLITE_PRAGMAS_ENABLED', 'True').lower() == 'true'
+SQLITE_PRAGMAS = {
+    'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 268435456)),  # bytes (256 MB)
+    'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', -65536)),  # negative = KiB (64 MB)
+    'temp_store': os.environ.get('SQLITE_TEMP_STORE', 'MEMORY'),
+    'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000)),  # milliseconds
+}
+
+# SQLite Bulk Load Settings (applied only while the migration is loading data)
+BULK_LOAD_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'OFF',
+    'temp_store': 'MEMORY',
+    'cache_size': -262144,  # negative = KiB, i.e. 256 MB page cache
+}
+# Drop and rebuild idx_transaksi_* when a load has at least this many rows
+BULK_LOAD_MIN_ROWS = int(os.environ.get('BULK_LOAD_MIN_ROWS', 50000))
+
+# SQL Profiling (per-statement timings; slow statements printed with their plan)
+SQL_PROFILE = os.environ.get('SQL_PROFILE', 'False').lower() == 'true'
+SQL_SLOW_QUERY_MS = float(os.environ.get('SQL_SLOW_QUERY_MS', 200))
+
+# Diagnostics (/diagnostics, admin only): stack depth kept per allocation
+# once tracemalloc is started there
+TRACEMALLOC_FRAMES = int(os.environ.get('TRACEMALLOC_FRAMES', 10))
+
 # Authentication
 SECRET_KEY = os.environ.get('SECRET_KEY', 'bapenda-jatim-secret-key-2025')
 SESSION_TIMEOUT = int(os.environ.get('SESSION_TIMEOUT', 3600))  # 1 hour
@@ -31,6 +82,41 @@ DEFAULT_PASSWORD = 'ptipbapenda2025'
 DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
 ASSETS_DIR = os.path.join(os.path.dirname(__file__), 'assets')
 
+# Archive Settings (closed fiscal years moved out of the database)
+ARCHIVE_DIR = os.environ.get('ARCHIVE_DIR', os.path.join(DATA_DIR, 'archive'))
+ARCHIVE_COMPRESSION = os.environ.get('ARCHIVE_COMPRESSION', 'zstd')
+
+# Data Backend: 'pandas' (default) or 'duckdb' (filters and aggregations run
+# by DuckDB on the Parquet snapshots of transaksi_dashboard and the archives)
+DATA_BACKEND = os.environ.get('DATA_BACKEND', 'pandas').lower()
+SNAPSHOT_DIR = os.environ.get('SNAPSHOT_DIR', os.path.join(DATA_DIR, 'snapshot'))
+DUCKDB_THREADS = int(os.environ.get('DUCKDB_THREADS', os.cpu_count() or 1))
+DUCKDB_MEMORY_LIMIT = os.environ.get('DUCKDB_MEMORY_LIMIT', '1GB')  # spills to disk beyond this
+
+# Shared Snapshot (one worker refreshes, all gunicorn workers memory-map the
+# same versioned Arrow IPC files instead of each holding its own copy)
+SHARED_SNAPSHOT = os.environ.get('SHARED_SNAPSHOT', 'False').lower() == 'true'
+SHARED_SNAPSHOT_DIR = os.environ.get('SHARED_SNAPSHOT_DIR', os.path.join(DATA_DIR, 'shared'))
+SHARED_SNAPSHOT_KEEP = int(os.environ.get('SHARED_SNAPSHOT_KEEP', 3))  # versions kept on disk
+
+# Result cache (filter results, aggregates, rendered components) per worker:
+# byte budget and eviction policy, 'lru' or 'cost' (cheap-to-recompute
+# bytes evicted first). RESULT_CACHE_MB=0 disables it
+RESULT_CACHE_MB = int(os.environ.get('RESULT_CACHE_MB', 256))
+RESULT_CACHE_POLICY = os.environ.get('RESULT_CACHE_POLICY', 'lru').lower()
+
+# Disk tier of the result cache for aggregates, shared by the workers of a
+# host and kept across restarts. RESULT_DISK_CACHE_MB=0 disables it
+RESULT_DISK_CACHE_MB = int(os.environ.get('RESULT_DISK_CACHE_MB', 512))
+RESULT_DISK_CACHE_DIR = os.environ.get('RESULT_DISK_CACHE_DIR', os.path.join(DATA_DIR, 'cache'))
+
+# Redis tier of the result cache for aggregates, shared by every instance
+# (empty REDIS_URL disables it, e.g. redis://localhost:6379/0)
+REDIS_URL = os.environ.get('REDIS_URL', '')
+REDIS_CACHE_PREFIX = os.environ.get('REDIS_CACHE_PREFIX', 'sts:')
+REDIS_CACHE_TTL = int(os.environ.get('REDIS_CACHE_TTL', 86400))  # seconds
+REDIS_SOCKET_TIMEOUT = float(os.environ.get('REDIS_SOCKET_TIMEOUT', 0.5))  # seconds
+
 # Auto Refresh Settings
 AUTO_REFRESH_INTERVAL = 30  # seconds
 ENABLE_AUTO_REFRESH = True
@@ -81,6 +167,11 @@ PAYMENT_TYPES = {
     5: 'QRIS'
 }
 
+# Amounts are processed as int64 sen (1/100 Rupiah) and converted to Rupiah
+# only when results leave DataService
+NOMINAL_MINOR_UNITS = os.environ.get('NOMINAL_MINOR_UNITS', 'True').lower() == 'true'
+SEN_PER_RUPIAH = 100
+
 # Month Names (Indonesian)
 MONTH_NAMES = {
     1: 'Januari', 2: 'Februari', 3: 'Maret', 4: 'April',
@@ -94,6 +185,14 @@ MONTH_NAMES_SHORT = {
     9: 'Sep', 10: 'Okt', 11: 'Nov', 12: 'Des'
 }
 
+# First month of the fiscal year (APBD runs January to December); the
+# calendar dimension derives tahun_anggaran, triwulan and semester from it
+FISCAL_YEAR_START_MONTH = int(os.environ.get('FISCAL_YEAR_START_MONTH', '1'))
+
+# Days after the end of a fiscal year in which its late postings are still
+# accepted; a year is closed (never reloaded, may be archived) only after them
+FISCAL_YEAR_GRACE_DAYS = int(os.environ.get('FISCAL_YEAR_GRACE_DAYS', '31'))
+
 # Day Names (Indonesian)
 DAY_NAMES = {
     'Monday': 'Senin',
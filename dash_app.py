@@ -6,14 +6,14 @@ Main Dash Application
 import dash
 from dash import Dash, html, dcc, Input, Output, State, callback, no_update
 import dash_bootstrap_components as dbc
-from flask import Flask, session
+from flask import Flask, session, request
 import os
 import uuid
 from datetime import datetime
 
 from config import (
     APP_NAME, DEBUG, HOST, PORT, SECRET_KEY, COLORS,
-    AUTO_REFRESH_INTERVAL, ENABLE_AUTO_REFRESH
+    AUTO_REFRESH_INTERVAL, ENABLE_AUTO_REFRESH, METRICS_ENABLED
 )
 
 # Initialize Flask server
@@ -45,9 +45,15 @@ from pages.dashboard import register_callbacks as register_dashboard_callbacks
 from pages.data_detail import register_callbacks as register_detail_callbacks
 from utils.auth import is_authenticated, logout_user
 
-# Register callbacks
-register_dashboard_callbacks(app)
-register_detail_callbacks(app)
+# Register callbacks (timed and exposed at /metrics when enabled)
+if METRICS_ENABLED:
+    from utils.metrics import instrument_app
+    callback_app = instrument_app(app)
+else:
+    callback_app = app
+
+register_dashboard_callbacks(callback_app)
+register_detail_callbacks(callback_app)
 
 # Main app layout with session handling
 app.layout = html.Div([
@@ -111,6 +117,8 @@ def handle_login(n_clicks, username, password, session_data):
     success, user_data = authenticate_user(username, password)
 
     if success:
+        # Server-side copy for the Flask routes (e.g. /diagnostics)
+        session['user'] = user_data
         return (
             {
                 'authenticated': True,
@@ -137,10 +145,42 @@ def handle_login(n_clicks, username, password, session_data):
 def handle_logout(n_clicks):
     """Handle logout button click"""
     if n_clicks:
+        session.pop('user', None)
         return {'authenticated': False, 'user': None}
     return no_update
 
 
+@server.route('/ready')
+def readiness():
+    """Readiness probe: 200 once the data cache is warm, 503 while warming"""
+    from utils.data_service import is_data_service_warm
+
+    if is_data_service_warm():
+        return {'status': 'ready'}, 200
+    return {'status': 'warming'}, 503
+
+
+@server.route('/diagnostics')
+def diagnostics():
+    """
+    Memory diagnostics of this worker (admin only)
+
+    Query parameters: tracemalloc=start|stop|reset, top=N and
+    group=lineno|filename|traceback.
+    """
+    from utils.auth import check_permission
+    from utils.diagnostics import collect_diagnostics
+
+    if not check_permission(session.get('user'), 'admin'):
+        return {'error': 'Akses ditolak'}, 403
+
+    return collect_diagnostics(
+        tracemalloc_action=request.args.get('tracemalloc'),
+        top=request.args.get('top', 25, type=int),
+        group_by=request.args.get('group', 'lineno')
+    )
+
+
 # Custom index string with proper meta tags
 app.index_string = '''
 <!DOCTYPE html>
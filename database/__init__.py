@@ -4,14 +4,20 @@ Database package untuk Monitoring STS
 
 from .schema import (
     Base, User, OPD, Rekening, Bendahara, Transaksi,
+    TransaksiDashboard, RekapHarian,
     OPDRekening, AuditLog, DashboardConfig,
     create_database, get_session
 )
-from .connection import get_db_engine, get_db_session, DatabaseManager
+from .connection import (
+    get_db_engine, get_db_session, get_db_read_engine, get_db_read_session,
+    DatabaseManager
+)
 
 __all__ = [
     'Base', 'User', 'OPD', 'Rekening', 'Bendahara', 'Transaksi',
+    'TransaksiDashboard', 'RekapHarian',
     'OPDRekening', 'AuditLog', 'DashboardConfig',
     'create_database', 'get_session',
-    'get_db_engine', 'get_db_session', 'DatabaseManager'
+    'get_db_engine', 'get_db_session', 'get_db_read_engine', 'get_db_read_session',
+    'DatabaseManager'
 ]
@@ -0,0 +1,295 @@
+"""
+Archive - move closed fiscal years of transaksi into Parquet files
+
+Each archived year becomes ARCHIVE_DIR/transaksi_<year>.parquet holding the
+transaksi_dashboard columns plus the raw transaksi columns needed to restore
+the year. The per-week catalog is stored in the file metadata so listing
+years and date ranges only reads the Parquet footer. Requires pyarrow.
+
+The rekap_harian rows of an archived year are kept, so rollup summaries
+still include it; database.rollup checks and rebuilds them from the file.
+
+Usage:
+    python -m database.archive --archive 2023
+    python -m database.archive --restore 2023
+    python -m database.archive --list
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, insert, select
+from database.schema import Transaksi, TransaksiDashboard
+from config import ARCHIVE_DIR, ARCHIVE_COMPRESSION
+from utils.kalender import is_closed_year
+
+ARCHIVE_PATTERN = re.compile(r'transaksi_(\d{4})\.parquet$')
+
+# Parquet schema metadata key holding the per-week catalog
+CATALOG_METADATA_KEY = b'sts_catalog'
+
+# Raw transaksi columns kept in the archive so the year can be restored
+RAW_COLUMNS = [
+    'opd_id', 'rekening_id', 'bendahara_id', 'minggu',
+    'rekening_asal', 'rekening_tujuan', 'kode_kegiatan',
+    'no_ref', 'no_reg', 'created_at', 'updated_at'
+]
+
+# Maximum number of ids per IN (...) statement
+DELETE_BATCH_SIZE = 900
+
+
+def _require_pyarrow():
+    """Import pyarrow or fail with an actionable message"""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise RuntimeError("Arsip Parquet membutuhkan pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+
+def archive_path(year: int) -> str:
+    """Get the Parquet file path of an archived year"""
+    return os.path.join(ARCHIVE_DIR, f"transaksi_{year}.parquet")
+
+
+def list_archived_years() -> list:
+    """Get sorted list of years that have an archive file"""
+    years = []
+    for path in glob.glob(os.path.join(ARCHIVE_DIR, 'transaksi_*.parquet')):
+        match = ARCHIVE_PATTERN.search(os.path.basename(path))
+        if match:
+            years.append(int(match.group(1)))
+    return sorted(years)
+
+
+def _build_catalog(df: pd.DataFrame) -> list:
+    """Per-week row counts and date ranges of the non-BAPENDA rows"""
+    visible = df[~df['is_bapenda'].astype(bool)]
+    if visible.empty:
+        return []
+
+    catalog = visible.groupby(['tahun', 'minggu_tahun']).agg(
+        min_tanggal=('tanggal_terima', 'min'),
+        max_tanggal=('tanggal_terima', 'max'),
+        jumlah=('id', 'count')
+    ).reset_index()
+
+    return [
+        {
+            'tahun': int(row.tahun),
+            'minggu_tahun': int(row.minggu_tahun),
+            'min_tanggal': row.min_tanggal.isoformat(),
+            'max_tanggal': row.max_tanggal.isoformat(),
+            'jumlah': int(row.jumlah),
+        }
+        for row in catalog.itertuples()
+    ]
+
+
+def read_archive_catalog(year: int) -> pd.DataFrame:
+    """
+    Read the per-week catalog of an archived year from the Parquet footer
+
+    Returns:
+        DataFrame with columns ['tahun', 'minggu_tahun', 'min_tanggal', 'max_tanggal', 'jumlah']
+    """
+    _require_pyarrow()
+    import pyarrow.parquet as pq
+
+    metadata = pq.read_schema(archive_path(year)).metadata or {}
+    catalog = pd.DataFrame(
+        json.loads(metadata.get(CATALOG_METADATA_KEY, b'[]')),
+        columns=['tahun', 'minggu_tahun', 'min_tanggal', 'max_tanggal', 'jumlah']
+    )
+    catalog['min_tanggal'] = pd.to_datetime(catalog['min_tanggal'])
+    catalog['max_tanggal'] = pd.to_datetime(catalog['max_tanggal'])
+    return catalog
+
+
+def read_archived_columns(year: int) -> list:
+    """Get the column names of an archived year from the Parquet footer"""
+    _require_pyarrow()
+    import pyarrow.parquet as pq
+
+    return pq.read_schema(archive_path(year)).names
+
+
+def count_archived_rows(year: int) -> int:
+    """Get the row count of an archived year from the Parquet footer"""
+    _require_pyarrow()
+    import pyarrow.parquet as pq
+
+    return pq.read_metadata(archive_path(year)).num_rows
+
+
+def read_archived_year(year: int, columns: list = None, filters: list = None) -> pd.DataFrame:
+    """
+    Read an archived year, memory-mapping the Parquet file
+
+    Args:
+        year: Archived year
+        columns: Columns to read (default: all)
+        filters: pyarrow row filters, e.g. [('id', 'in', ids)] (default: all rows)
+
+    Returns:
+        DataFrame with the archived rows
+    """
+    _require_pyarrow()
+    import pyarrow.parquet as pq
+
+    table = pq.read_table(archive_path(year), columns=columns, filters=filters, memory_map=True)
+    return table.to_pandas()
+
+
+def archive_year(session, year: int) -> int:
+    """
+    Move one closed year from transaksi/transaksi_dashboard into Parquet (commits)
+
+    The file is written and verified under a temporary name before any row
+    is deleted, and only renamed into place once the deletion is committed,
+    so a failure never leaves the year both in the database and in
+    ARCHIVE_DIR. The year's rekap_harian rows stay in place.
+
+    Args:
+        session: Database session on the primary engine
+        year: Calendar year (tahun), closed per kalender.is_closed_year
+
+    Returns:
+        Number of archived rows
+    """
+    pa = _require_pyarrow()
+    import pyarrow.parquet as pq
+
+    if not is_closed_year(year):
+        raise ValueError(f"Tahun {year} belum ditutup dan tidak dapat diarsipkan")
+
+    raw_columns = [getattr(Transaksi, col) for col in RAW_COLUMNS]
+    statement = select(
+        *TransaksiDashboard.__table__.columns, *raw_columns
+    ).join(
+        Transaksi, Transaksi.id == TransaksiDashboard.id
+    ).where(
+        TransaksiDashboard.tahun == year
+    ).order_by(TransaksiDashboard.id)
+
+    df = pd.read_sql(statement, session.connection())
+    if df.empty:
+        return 0
+
+    for col in ['tanggal_terima', 'tanggal_setor', 'tanggal_validasi_bank', 'created_at', 'updated_at']:
+        df[col] = pd.to_datetime(df[col])
+    df['tanggal'] = pd.to_datetime(df['tanggal']).dt.date
+    df['is_bapenda'] = df['is_bapenda'].astype(bool)
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[CATALOG_METADATA_KEY] = json.dumps(_build_catalog(df)).encode()
+    table = table.replace_schema_metadata(metadata)
+
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    path = archive_path(year)
+    tmp_path = f"{path}.tmp"
+    pq.write_table(table, tmp_path, compression=ARCHIVE_COMPRESSION)
+
+    try:
+        if pq.read_metadata(tmp_path).num_rows != len(df):
+            raise RuntimeError(f"Verifikasi arsip tahun {year} gagal")
+
+        ids = df['id'].tolist()
+        for i in range(0, len(ids), DELETE_BATCH_SIZE):
+            batch = ids[i:i + DELETE_BATCH_SIZE]
+            session.execute(delete(TransaksiDashboard).where(TransaksiDashboard.id.in_(batch)))
+            session.execute(delete(Transaksi).where(Transaksi.id.in_(batch)))
+        session.commit()
+    except BaseException:
+        session.rollback()
+        os.remove(tmp_path)
+        raise
+
+    try:
+        os.replace(tmp_path, path)
+    except OSError as e:
+        # The rows are gone; the verified file is the only copy of the year
+        raise RuntimeError(
+            f"Transaksi tahun {year} sudah dihapus, tetapi arsip tidak dapat dipindahkan: "
+            f"pindahkan {tmp_path} ke {path} secara manual ({e})"
+        ) from e
+
+    return len(df)
+
+
+def restore_year(session, year: int) -> int:
+    """
+    Move an archived year back into transaksi/transaksi_dashboard (caller commits)
+
+    The archive file is removed after the caller commits successfully.
+
+    Returns:
+        Number of restored rows
+    """
+    df = read_archived_year(year)
+    if df.empty:
+        return 0
+
+    df = df.astype(object).where(df.notna(), None)
+    for col in ['tanggal_terima', 'tanggal_setor', 'tanggal_validasi_bank', 'created_at', 'updated_at']:
+        df[col] = [value.to_pydatetime() if value is not None else None for value in df[col]]
+
+    # Archives written before a column existed leave it NULL
+    model_columns = [
+        col.name for col in TransaksiDashboard.__table__.columns if col.name in df.columns
+    ]
+    transaksi_columns = [
+        col for col in [
+            'id', 'kode_billing', 'ayat', 'nominal', 'nominal_sen', 'tanggal_terima',
+            'tanggal_setor', 'tanggal_validasi_bank', 'jenis_pembayaran',
+            'keterangan_umum', 'keterangan_khusus'
+        ] + RAW_COLUMNS if col in df.columns
+    ]
+
+    session.execute(insert(Transaksi), df[transaksi_columns].to_dict('records'))
+    session.execute(insert(TransaksiDashboard), df[model_columns].to_dict('records'))
+    session.flush()
+
+    return len(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Arsip tahun anggaran tertutup')
+    parser.add_argument('--archive', type=int, metavar='YEAR', help='Archive a closed year to Parquet')
+    parser.add_argument('--restore', type=int, metavar='YEAR', help='Restore an archived year')
+    parser.add_argument('--list', action='store_true', help='List archived years')
+
+    args = parser.parse_args()
+
+    from database.connection import get_db_manager
+
+    if args.archive:
+        with get_db_manager().session_scope() as session:
+            count = archive_year(session, args.archive)
+        print(f"Tahun {args.archive}: {count} transaksi diarsipkan ke {archive_path(args.archive)}")
+
+    elif args.restore:
+        with get_db_manager().session_scope() as session:
+            count = restore_year(session, args.restore)
+        os.remove(archive_path(args.restore))
+        print(f"Tahun {args.restore}: {count} transaksi dikembalikan ke database")
+
+    else:
+        for year in list_archived_years():
+            catalog = read_archive_catalog(year)
+            print(f"  {year}: {int(catalog['jumlah'].sum())} transaksi  {archive_path(year)}")
+
+
+if __name__ == '__main__':
+    main()
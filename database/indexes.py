@@ -0,0 +1,215 @@
+"""
+Index Advisor - compare database indexes with the schema and explain the
+queries the dashboard and the ingest pipeline issue
+
+Indexes declared in schema.py are the target set. The advisor reports
+indexes that are missing from the database, indexes superseded by a
+covering index (same leading columns) and the query plan of each
+representative query, so it is visible whether a query is answered from
+an index alone.
+
+Usage:
+    python -m database.indexes            # Report missing/superseded indexes and plans
+    python -m database.indexes --apply    # Create missing, drop superseded, ANALYZE
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import inspect, text
+from database.schema import Base
+
+# Tables whose indexes are managed by the advisor
+ADVISED_TABLES = ['transaksi', 'transaksi_dashboard', 'rekap_harian']
+
+# Indexes of earlier schema versions, replaced by covering indexes
+LEGACY_INDEXES = {
+    'idx_transaksi_tanggal': ('transaksi', ['tanggal_terima']),
+    'idx_transaksi_opd_tanggal': ('transaksi', ['opd_id', 'tanggal_terima']),
+    'idx_transaksi_jenis_pembayaran': ('transaksi', ['jenis_pembayaran']),
+    'ix_transaksi_tanggal_terima': ('transaksi', ['tanggal_terima']),
+    'ix_transaksi_opd_id': ('transaksi', ['opd_id']),
+}
+
+# Representative aggregate queries: name -> (SQL, parameters)
+ADVISOR_QUERIES = {
+    'rollup_rebuild': (
+        "SELECT date(tanggal_terima), coalesce(opd_id, 0), coalesce(jenis_pembayaran, 0), "
+        "coalesce(bendahara_id, 0), sum(nominal_sen), count(*), min(nominal_sen), max(nominal_sen) "
+        "FROM transaksi GROUP BY 1, 2, 3, 4",
+        {}
+    ),
+    'periode_per_jenis': (
+        "SELECT jenis_pembayaran, sum(nominal_sen), count(*) FROM transaksi "
+        "WHERE tanggal_terima >= :start AND tanggal_terima < :end GROUP BY jenis_pembayaran",
+        {'start': '2025-01-01', 'end': '2025-04-01'}
+    ),
+    'periode_per_opd': (
+        "SELECT opd_id, sum(nominal_sen), count(*) FROM transaksi "
+        "WHERE tanggal_terima >= :start AND tanggal_terima < :end GROUP BY opd_id",
+        {'start': '2025-01-01', 'end': '2025-04-01'}
+    ),
+    'jenis_per_opd': (
+        "SELECT opd_id, sum(nominal_sen), count(*) FROM transaksi "
+        "WHERE jenis_pembayaran = :jenis AND tanggal_terima >= :start AND tanggal_terima < :end "
+        "GROUP BY opd_id",
+        {'jenis': 2, 'start': '2025-01-01', 'end': '2025-04-01'}
+    ),
+    'tren_harian_opd': (
+        "SELECT date(tanggal_terima), sum(nominal_sen), count(*) FROM transaksi "
+        "WHERE opd_id = :opd_id AND tanggal_terima >= :start AND tanggal_terima < :end GROUP BY 1",
+        {'opd_id': 1, 'start': '2025-01-01', 'end': '2026-01-01'}
+    ),
+    'rekap_opd_jenis': (
+        "SELECT opd_id, jenis_pembayaran, sum(jumlah), sum(total_sen), min(minimum_sen), max(maksimum_sen) "
+        "FROM rekap_harian WHERE tanggal BETWEEN :start AND :end GROUP BY opd_id, jenis_pembayaran",
+        {'start': '2025-01-01', 'end': '2025-12-31'}
+    ),
+    'katalog_minggu': (
+        "SELECT tahun, minggu_tahun, min(tanggal_terima), max(tanggal_terima), count(*) "
+        "FROM transaksi_dashboard WHERE is_bapenda = 0 GROUP BY tahun, minggu_tahun",
+        {}
+    ),
+}
+
+
+def _model_indexes() -> dict:
+    """Indexes declared in schema.py: {name: (table, [columns])}"""
+    indexes = {}
+    for table_name in ADVISED_TABLES:
+        table = Base.metadata.tables[table_name]
+        for index in table.indexes:
+            indexes[index.name] = (table_name, [col.name for col in index.columns])
+    return indexes
+
+
+def _database_indexes(engine) -> dict:
+    """Indexes present in the database: {name: (table, [columns], unique)}"""
+    inspector = inspect(engine)
+    indexes = {}
+    for table_name in ADVISED_TABLES:
+        if not inspector.has_table(table_name):
+            continue
+        for index in inspector.get_indexes(table_name):
+            indexes[index['name']] = (table_name, list(index['column_names']), bool(index.get('unique')))
+    return indexes
+
+
+def _is_superseded(name: str, table_name: str, columns: list, model: dict) -> bool:
+    """An index is superseded when a schema index on the table starts with its columns"""
+    if name in model:
+        return False
+    for other_table, other_columns in model.values():
+        if other_table == table_name and other_columns[:len(columns)] == columns:
+            return True
+    return name in LEGACY_INDEXES
+
+
+def advise(engine) -> dict:
+    """
+    Compare database indexes with the schema
+
+    Returns:
+        Dictionary with 'missing' (names to create) and 'superseded'
+        (names to drop)
+    """
+    model = _model_indexes()
+    existing = _database_indexes(engine)
+
+    missing = [name for name in model if name not in existing]
+    # Unique indexes enforce constraints and are never superseded
+    superseded = [
+        name for name, (table_name, columns, unique) in existing.items()
+        if not unique and _is_superseded(name, table_name, columns, model)
+    ]
+
+    return {'missing': missing, 'superseded': superseded}
+
+
+def explain(connection, sql: str, params: dict = None) -> list:
+    """
+    Get the SQLite query plan of a statement
+
+    Returns:
+        List of plan detail lines
+    """
+    rows = connection.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params or {})
+    return [row[-1] for row in rows]
+
+
+def uses_covering_index(plan: list) -> bool:
+    """Check if every table access in a plan is answered from an index"""
+    accesses = [line for line in plan if line.startswith(('SCAN', 'SEARCH'))]
+    return bool(accesses) and all('COVERING INDEX' in line for line in accesses)
+
+
+def apply_indexes(engine, drop_superseded: bool = True) -> dict:
+    """
+    Create missing schema indexes, drop superseded ones and refresh statistics
+
+    Args:
+        engine: Engine of the primary database
+        drop_superseded: Drop indexes replaced by a covering index
+
+    Returns:
+        Result of advise() before the changes
+    """
+    advice = advise(engine)
+    indexes = {
+        index.name: index
+        for table_name in ADVISED_TABLES
+        for index in Base.metadata.tables[table_name].indexes
+    }
+
+    with engine.begin() as connection:
+        for name in advice['missing']:
+            indexes[name].create(bind=connection, checkfirst=True)
+            print(f"  Created index {name}")
+
+        if drop_superseded:
+            for name in advice['superseded']:
+                connection.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+                print(f"  Dropped index {name}")
+
+        if advice['missing'] or (drop_superseded and advice['superseded']):
+            connection.exec_driver_sql("ANALYZE")
+
+    return advice
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Index advisor')
+    parser.add_argument('--apply', action='store_true', help='Create missing and drop superseded indexes')
+    parser.add_argument('--keep-superseded', action='store_true', help='Do not drop superseded indexes')
+
+    args = parser.parse_args()
+
+    from database.connection import get_db_engine
+
+    engine = get_db_engine()
+
+    if args.apply:
+        apply_indexes(engine, drop_superseded=not args.keep_superseded)
+
+    advice = advise(engine)
+    print(f"Missing indexes: {', '.join(advice['missing']) or '-'}")
+    print(f"Superseded indexes: {', '.join(advice['superseded']) or '-'}")
+
+    if engine.dialect.name != 'sqlite':
+        return
+
+    print("\nQuery plans:")
+    with engine.connect() as connection:
+        for name, (sql, params) in ADVISOR_QUERIES.items():
+            plan = explain(connection, sql, params)
+            status = 'covering' if uses_covering_index(plan) else 'table lookup'
+            print(f"  {name} [{status}]")
+            for line in plan:
+                print(f"      {line}")
+
+
+if __name__ == '__main__':
+    main()
@@ -5,6 +5,7 @@ Script untuk migrasi data dari CSV ke Database
 import pandas as pd
 import os
 import sys
+from sqlalchemy import inspect
 from datetime import datetime
 from hashlib import sha256
 
@@ -15,7 +16,31 @@ from database.schema import (
     Base, User, OPD, Rekening, Bendahara, Transaksi, OPDRekening,
     create_database, DashboardConfig
 )
-from database.connection import get_db_engine, get_db_session
+from database.connection import get_db_engine, get_db_manager
+from database.rollup import RollupAccumulator, ensure_rollups
+from database.read_model import sync_read_model, ensure_read_model
+from database.archive import list_archived_years
+from database.indexes import apply_indexes
+from database.queries import (
+    USER_BY_USERNAME, OPD_ID_BY_KODE, REKENING_ID_BY_KODE,
+    BENDAHARA_ID_BY_SIBAKU, EXISTING_BILLING_CODES, CONFIG_BY_KEY
+)
+from config import BULK_LOAD_MIN_ROWS, SEN_PER_RUPIAH, DATA_BACKEND, SQL_PROFILE
+from utils.formatters import rupiah_to_sen
+
+TRANSAKSI_CSV = "kasdasts_202512100801.csv"
+
+# Maximum number of billing codes per IN (...) lookup
+BILLING_LOOKUP_BATCH_SIZE = 900
+
+# Sen columns added to existing databases, backfilled from their Rupiah column
+SEN_BACKFILL = {
+    ('transaksi', 'nominal_sen'): 'nominal',
+    ('transaksi_dashboard', 'nominal_sen'): 'nominal',
+    ('rekap_harian', 'total_sen'): 'total',
+    ('rekap_harian', 'minimum_sen'): 'minimum',
+    ('rekap_harian', 'maksimum_sen'): 'maksimum',
+}
 
 
 def hash_password(password: str) -> str:
@@ -38,7 +63,7 @@ def migrate_users(session):
     )
 
     # Check if user exists
-    existing = session.query(User).filter_by(username='bapendaptip').first()
+    existing = session.scalars(USER_BY_USERNAME, {'username': admin.username}).first()
     if not existing:
         session.add(admin)
         session.commit()
@@ -67,9 +92,9 @@ def migrate_opd(session, data_dir: str):
         kode = str(row['KODE_OPD']).strip()
 
         # Check if OPD exists
-        existing = session.query(OPD).filter_by(kode_opd=kode).first()
-        if existing:
-            opd_map[kode] = existing.id
+        existing_id = session.scalar(OPD_ID_BY_KODE, {'kode_opd': kode})
+        if existing_id:
+            opd_map[kode] = existing_id
             continue
 
         opd = OPD(
@@ -122,9 +147,9 @@ def migrate_rekening(session, data_dir: str):
         seen_codes.add(kode)
 
         # Check if rekening exists in database
-        existing = session.query(Rekening).filter_by(kode_rekening=kode).first()
-        if existing:
-            rek_map[kode] = existing.id
+        existing_id = session.scalar(REKENING_ID_BY_KODE, {'kode_rekening': kode})
+        if existing_id:
+            rek_map[kode] = existing_id
             continue
 
         # Determine level based on code length
@@ -172,9 +197,9 @@ def migrate_bendahara(session, data_dir: str):
         id_sibaku = int(row['IDSIBAKU'])
 
         # Check if bendahara exists
-        existing = session.query(Bendahara).filter_by(id_sibaku=id_sibaku).first()
-        if existing:
-            bendahara_map[id_sibaku] = existing.id
+        existing_id = session.scalar(BENDAHARA_ID_BY_SIBAKU, {'id_sibaku': id_sibaku})
+        if existing_id:
+            bendahara_map[id_sibaku] = existing_id
             continue
 
         bendahara = Bendahara(
@@ -203,7 +228,7 @@ def migrate_transaksi(session, data_dir: str, opd_map: dict, rek_map: dict, bend
     """Migrasi data Transaksi STS"""
     print("\nMigrating Transaksi data...")
 
-    csv_path = os.path.join(data_dir, "kasdasts_202512100801.csv")
+    csv_path = os.path.join(data_dir, TRANSAKSI_CSV)
     if not os.path.exists(csv_path):
         print(f"  File not found: {csv_path}")
         return
@@ -213,9 +238,19 @@ def migrate_transaksi(session, data_dir: str, opd_map: dict, rek_map: dict, bend
     count = 0
     skipped = 0
     seen_billing_codes = set()  # Track already processed billing codes
+    archived_years = set(list_archived_years())  # Closed years live in Parquet
+    rollup = RollupAccumulator()
 
     for chunk in pd.read_csv(csv_path, chunksize=chunk_size,
                               parse_dates=['TGTERIMA', 'TGSETOR', 'TGVALIDBANK']):
+        inserted = []
+
+        # Billing codes of this chunk already in the database
+        existing_codes = set()
+        codes = chunk['KDBILL'].astype(str).unique().tolist()
+        for i in range(0, len(codes), BILLING_LOOKUP_BATCH_SIZE):
+            batch = codes[i:i + BILLING_LOOKUP_BATCH_SIZE]
+            existing_codes.update(session.scalars(EXISTING_BILLING_CODES, {'kode_billing': batch}))
 
         for _, row in chunk.iterrows():
             kode_billing = str(row['KDBILL'])
@@ -226,9 +261,13 @@ def migrate_transaksi(session, data_dir: str, opd_map: dict, rek_map: dict, bend
                 continue
             seen_billing_codes.add(kode_billing)
 
+            # Skip rows of archived years
+            if pd.notna(row['TGTERIMA']) and row['TGTERIMA'].year in archived_years:
+                skipped += 1
+                continue
+
             # Check if transaction exists in database
-            existing = session.query(Transaksi).filter_by(kode_billing=kode_billing).first()
-            if existing:
+            if kode_billing in existing_codes:
                 skipped += 1
                 continue
 
@@ -250,6 +289,7 @@ def migrate_transaksi(session, data_dir: str, opd_map: dict, rek_map: dict, bend
                 bendahara_id=bendahara_id,
                 ayat=ayat,
                 nominal=float(row['RPPOKOK']) if pd.notna(row['RPPOKOK']) else 0,
+                nominal_sen=rupiah_to_sen(row['RPPOKOK']),
                 tanggal_terima=row['TGTERIMA'] if pd.notna(row['TGTERIMA']) else datetime.now(),
                 tanggal_setor=row['TGSETOR'] if pd.notna(row['TGSETOR']) else None,
                 tanggal_validasi_bank=row['TGVALIDBANK'] if pd.notna(row['TGVALIDBANK']) else None,
@@ -264,12 +304,19 @@ def migrate_transaksi(session, data_dir: str, opd_map: dict, rek_map: dict, bend
                 keterangan_khusus=str(row['KETUS']) if pd.notna(row['KETUS']) else None
             )
             session.add(transaksi)
+            inserted.append(transaksi)
+            rollup.add(transaksi.tanggal_terima, opd_id, transaksi.jenis_pembayaran,
+                       bendahara_id, transaksi.nominal)
             count += 1
 
             if count % 1000 == 0:
                 session.flush()
                 print(f"    Processed {count} transactions...")
 
+        # Keep rekap_harian and transaksi_dashboard in step with this chunk
+        session.flush()
+        sync_read_model(session, [t.id for t in inserted])
+        rollup.flush(session)
         session.commit()
 
     print(f"  Migrated {count} transactions, skipped {skipped} existing")
@@ -342,8 +389,8 @@ def create_dashboard_config(session):
     ]
 
     for key, value, description in configs:
-        existing = session.query(DashboardConfig).filter_by(key=key).first()
-        if not existing:
+        existing_id = session.scalar(CONFIG_BY_KEY, {'key': key})
+        if not existing_id:
             config = DashboardConfig(key=key, value=value, description=description)
             session.add(config)
 
@@ -351,6 +398,81 @@ def create_dashboard_config(session):
     print(f"  Created {len(configs)} config entries")
 
 
+def ensure_derived_tables(session):
+    """Build rekap_harian and transaksi_dashboard if they lag behind transaksi"""
+    if ensure_rollups(session):
+        print("\nRebuilt rekap_harian from existing transaksi")
+    if ensure_read_model(session):
+        print("\nRebuilt transaksi_dashboard from existing transaksi")
+    session.commit()
+
+
+def refresh_snapshot(session):
+    """Re-export the Parquet snapshots read by the DuckDB backend"""
+    if DATA_BACKEND != 'duckdb':
+        return
+
+    from database.snapshot import export_snapshot
+    exported = export_snapshot(session)
+    print(f"\nExported Parquet snapshot: {sum(exported.values())} rows in {len(exported)} years")
+
+
+def upgrade_schema(engine):
+    """
+    Add columns introduced after an existing database was created
+
+    create_all only creates missing tables, so new columns of existing
+    tables are added here and backfilled where they derive from others.
+    """
+    inspector = inspect(engine)
+
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+
+            existing = {col['name'] for col in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+
+                column_type = column.type.compile(dialect=engine.dialect)
+                connection.exec_driver_sql(
+                    f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"
+                )
+                print(f"  Added column {table.name}.{column.name}")
+
+                source = SEN_BACKFILL.get((table.name, column.name))
+                if source:
+                    connection.exec_driver_sql(
+                        f"UPDATE {table.name} SET {column.name} = "
+                        f"CAST(ROUND({source} * {SEN_PER_RUPIAH}) AS BIGINT) "
+                        f"WHERE {source} IS NOT NULL"
+                    )
+
+
+def prepare_database():
+    """Create missing tables and derived data for an existing database"""
+    engine = get_db_engine()
+    Base.metadata.create_all(engine)
+    upgrade_schema(engine)
+    apply_indexes(engine)
+
+    with get_db_manager().session_scope() as session:
+        ensure_derived_tables(session)
+        refresh_snapshot(session)
+
+
+def count_csv_rows(csv_path: str) -> int:
+    """Count data rows of a CSV file without parsing it"""
+    if not os.path.exists(csv_path):
+        return 0
+
+    with open(csv_path, 'rb') as f:
+        lines = sum(block.count(b'\n') for block in iter(lambda: f.read(1 << 20), b''))
+    return max(lines - 1, 0)
+
+
 def run_migration(data_dir: str = "data"):
     """Run full migration"""
     print("=" * 60)
@@ -364,32 +486,42 @@ def run_migration(data_dir: str = "data"):
     print("\nCreating database schema...")
     engine = get_db_engine()
     Base.metadata.create_all(engine)
+    upgrade_schema(engine)
+    apply_indexes(engine)
     print("  Schema created successfully")
 
-    # Get session
-    session = get_db_session()
+    # Large loads run without the secondary transaksi indexes
+    incoming_rows = count_csv_rows(os.path.join(data_dir, TRANSAKSI_CSV))
+    rebuild_indexes = incoming_rows >= BULK_LOAD_MIN_ROWS
+    if rebuild_indexes:
+        print(f"\nBulk load mode: {incoming_rows} rows, indexes rebuilt after load")
 
     try:
-        # Run migrations in order
-        migrate_users(session)
-        opd_map = migrate_opd(session, data_dir)
-        rek_map = migrate_rekening(session, data_dir)
-        bendahara_map = migrate_bendahara(session, data_dir)
-        migrate_transaksi(session, data_dir, opd_map, rek_map, bendahara_map)
-        migrate_opd_rekening(session, data_dir)
-        create_dashboard_config(session)
+        with get_db_manager().bulk_load_scope(rebuild_indexes=rebuild_indexes) as session:
+            # Run migrations in order
+            migrate_users(session)
+            opd_map = migrate_opd(session, data_dir)
+            rek_map = migrate_rekening(session, data_dir)
+            bendahara_map = migrate_bendahara(session, data_dir)
+            migrate_transaksi(session, data_dir, opd_map, rek_map, bendahara_map)
+            ensure_derived_tables(session)
+            migrate_opd_rekening(session, data_dir)
+            create_dashboard_config(session)
+            refresh_snapshot(session)
 
         elapsed = datetime.now() - start_time
         print("\n" + "=" * 60)
         print(f"MIGRATION COMPLETED in {elapsed.total_seconds():.2f} seconds")
         print("=" * 60)
 
+        if SQL_PROFILE:
+            from database.profiler import get_query_profiler
+            print("\nSQL profile (top statements by total time):")
+            print(get_query_profiler().format_report())
+
     except Exception as e:
-        session.rollback()
         print(f"\nError during migration: {e}")
         raise
-    finally:
-        session.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,193 @@
+"""
+Query Profiler - per-statement timings from SQLAlchemy cursor events
+
+Enabled with SQL_PROFILE=true. Statements are grouped by fingerprint (the
+SQL with literals and IN lists collapsed), keeping count, total and p95
+time and affected rows. Statements slower than SQL_SLOW_QUERY_MS are
+printed once per fingerprint with their query plan (EXPLAIN QUERY PLAN on
+SQLite, EXPLAIN elsewhere). Times cover the cursor execute call; rows
+fetched afterwards (streamed partitions) are not included.
+"""
+
+import functools
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+
+import numpy as np
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import SQL_SLOW_QUERY_MS
+from utils.diagnostics import register_cache
+
+# Durations kept per fingerprint for the percentile
+SAMPLE_SIZE = 1000
+
+# Statements that can be explained
+EXPLAINABLE = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH')
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_NAMED_PARAMETER = re.compile(r"%\(\w+\)s|:\w+|\$\d+|%s")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=1024)
+def fingerprint(statement: str) -> str:
+    """Normalize a statement so executions differing only in values group together"""
+    text = _WHITESPACE.sub(' ', statement).strip()
+    text = _STRING_LITERAL.sub('?', text)
+    text = _NAMED_PARAMETER.sub('?', text)
+    text = _NUMBER_LITERAL.sub('?', text)
+    return _PLACEHOLDER_LIST.sub('(?, ...)', text)
+
+
+register_cache('sql_fingerprint', lambda: fingerprint.cache_info()._asdict())
+
+
+class _StatementStats:
+    """Aggregated timings of one fingerprint"""
+
+    __slots__ = ('count', 'total', 'max', 'rows', 'samples', 'plan')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.samples = deque(maxlen=SAMPLE_SIZE)
+        self.plan = None
+
+
+class QueryProfiler:
+    """Collects statement timings of the engines it is attached to"""
+
+    def __init__(self, slow_query_ms: float = SQL_SLOW_QUERY_MS):
+        self.slow_query_seconds = slow_query_ms / 1000
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def attach(self, engine):
+        """Listen to the cursor events of an engine"""
+        event.listen(engine, 'before_cursor_execute', self._before_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_execute)
+
+    def detach(self, engine):
+        """Stop listening to an engine"""
+        event.remove(engine, 'before_cursor_execute', self._before_execute)
+        event.remove(engine, 'after_cursor_execute', self._after_execute)
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        # Kept on the execution context, so a failed statement leaves nothing behind
+        context.query_start_time = time.perf_counter()
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context.query_start_time
+        key = fingerprint(statement)
+        rows = cursor.rowcount if cursor.rowcount and cursor.rowcount > 0 else 0
+
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = _StatementStats()
+            stats.count += 1
+            stats.total += elapsed
+            stats.max = max(stats.max, elapsed)
+            stats.rows += rows
+            stats.samples.append(elapsed)
+            explain = elapsed >= self.slow_query_seconds and stats.plan is None
+            if explain:
+                stats.plan = ''  # claimed, so concurrent slow runs do not explain again
+
+        if explain:
+            plan = self._explain(conn, statement, parameters, executemany)
+            stats.plan = plan
+            print(f"[SLOW SQL] {elapsed * 1000:.0f} ms: {key}\n{plan}")
+
+    def _explain(self, conn, statement: str, parameters, executemany: bool) -> str:
+        """Query plan of a statement, run on a separate DBAPI cursor"""
+        if not statement.lstrip().upper().startswith(EXPLAINABLE):
+            return '  (no plan)'
+
+        prefix = 'EXPLAIN QUERY PLAN ' if conn.dialect.name == 'sqlite' else 'EXPLAIN '
+        if executemany:
+            parameters = parameters[0] if parameters else ()
+
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute(prefix + statement, parameters)
+            lines = [' | '.join(str(value) for value in row) for row in cursor.fetchall()]
+        except Exception as e:
+            lines = [f"(EXPLAIN gagal: {e})"]
+        finally:
+            cursor.close()
+
+        return '\n'.join(f"  {line}" for line in lines)
+
+    def report(self, order_by: str = 'total', limit: int = 20) -> list:
+        """
+        Collected statistics per fingerprint
+
+        Args:
+            order_by: 'total', 'count', 'p95' or 'max'
+            limit: Number of fingerprints returned (None for all)
+
+        Returns:
+            List of dictionaries with fingerprint, count, total_ms, mean_ms,
+            p95_ms, max_ms, rows and plan
+        """
+        with self._lock:
+            items = [(key, stats, list(stats.samples)) for key, stats in self._stats.items()]
+
+        rows = []
+        for key, stats, samples in items:
+            rows.append({
+                'fingerprint': key,
+                'count': stats.count,
+                'total_ms': stats.total * 1000,
+                'mean_ms': stats.total / stats.count * 1000,
+                'p95_ms': float(np.percentile(samples, 95)) * 1000,
+                'max_ms': stats.max * 1000,
+                'rows': stats.rows,
+                'plan': stats.plan,
+            })
+
+        sort_key = 'count' if order_by == 'count' else f"{order_by}_ms"
+        rows.sort(key=lambda row: row[sort_key], reverse=True)
+        return rows[:limit] if limit else rows
+
+    def format_report(self, order_by: str = 'total', limit: int = 20) -> str:
+        """Report as a text table"""
+        lines = [f"{'count':>8} {'total ms':>10} {'mean ms':>9} {'p95 ms':>9} {'max ms':>9} {'rows':>9}  statement"]
+        for row in self.report(order_by, limit):
+            statement = row['fingerprint']
+            if len(statement) > 120:
+                statement = statement[:117] + '...'
+            lines.append(
+                f"{row['count']:>8} {row['total_ms']:>10.1f} {row['mean_ms']:>9.2f} "
+                f"{row['p95_ms']:>9.2f} {row['max_ms']:>9.2f} {row['rows']:>9}  {statement}"
+            )
+        return '\n'.join(lines)
+
+    def reset(self):
+        """Discard collected statistics"""
+        with self._lock:
+            self._stats = {}
+
+
+# Global profiler, attached by DatabaseManager when SQL_PROFILE is enabled
+_query_profiler = None
+
+
+def get_query_profiler() -> QueryProfiler:
+    """Get the query profiler instance"""
+    global _query_profiler
+    if _query_profiler is None:
+        _query_profiler = QueryProfiler()
+    return _query_profiler
@@ -0,0 +1,152 @@
+"""
+Queries - statements on hot paths, constructed once at import
+
+Values are passed as bound parameters at execution time, so a call only
+looks the statement up in the engine's compiled cache instead of building
+and compiling an ORM query each time.
+"""
+
+import os
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import bindparam, func, select
+from database.schema import (
+    User, OPD, Rekening, Bendahara, Transaksi, TransaksiDashboard,
+    RekapHarian, DashboardConfig
+)
+from config import NOMINAL_MINOR_UNITS
+
+# Open-ended bounds for date range parameters
+MIN_DATE = date(1900, 1, 1)
+MAX_DATE = date(9999, 12, 31)
+
+# --- Authentication ---
+
+# Params: username
+USER_BY_USERNAME = select(User).where(
+    User.username == bindparam('username'),
+    User.is_active.is_(True)
+).limit(1)
+
+# --- Migration lookups ---
+
+# Params: kode_opd
+OPD_ID_BY_KODE = select(OPD.id).where(OPD.kode_opd == bindparam('kode_opd'))
+
+# Params: kode_rekening
+REKENING_ID_BY_KODE = select(Rekening.id).where(Rekening.kode_rekening == bindparam('kode_rekening'))
+
+# Params: id_sibaku
+BENDAHARA_ID_BY_SIBAKU = select(Bendahara.id).where(Bendahara.id_sibaku == bindparam('id_sibaku'))
+
+# Params: kode_billing (list)
+EXISTING_BILLING_CODES = select(Transaksi.kode_billing).where(
+    Transaksi.kode_billing.in_(bindparam('kode_billing', expanding=True))
+)
+
+# Params: key
+CONFIG_BY_KEY = select(DashboardConfig.id).where(DashboardConfig.key == bindparam('key'))
+
+# Params: tanggal (list)
+REKAP_HARIAN_BY_TANGGAL = select(RekapHarian).where(
+    RekapHarian.tanggal.in_(bindparam('tanggal', expanding=True))
+)
+
+# --- Dashboard (read engine) ---
+
+# Per-week catalog of the read model
+DASHBOARD_CATALOG = select(
+    TransaksiDashboard.tahun,
+    TransaksiDashboard.minggu_tahun,
+    func.min(TransaksiDashboard.tanggal_terima).label('min_tanggal'),
+    func.max(TransaksiDashboard.tanggal_terima).label('max_tanggal'),
+    func.count().label('jumlah')
+).where(
+    TransaksiDashboard.is_bapenda.is_(False)
+).group_by(
+    TransaksiDashboard.tahun,
+    TransaksiDashboard.minggu_tahun
+)
+
+# One year partition of the read model, the columns filters and aggregates
+# use. Params: tahun
+DASHBOARD_PARTITION = select(
+    TransaksiDashboard.id,
+    TransaksiDashboard.kode_billing,
+    TransaksiDashboard.tanggal_terima,
+    TransaksiDashboard.nominal_sen if NOMINAL_MINOR_UNITS else TransaksiDashboard.nominal,
+    TransaksiDashboard.jenis_pembayaran,
+    TransaksiDashboard.nama_opd,
+    TransaksiDashboard.nama_kasir,
+    TransaksiDashboard.nip_kasir,
+    TransaksiDashboard.hari_key,
+    TransaksiDashboard.jenis_pembayaran_nama
+).where(
+    TransaksiDashboard.tahun == bindparam('tahun'),
+    TransaksiDashboard.is_bapenda.is_(False)
+)
+
+# Display-only columns of read-model rows. Params: ids (list)
+DASHBOARD_DETAIL = select(
+    TransaksiDashboard.id,
+    TransaksiDashboard.tanggal_setor,
+    TransaksiDashboard.tanggal_validasi_bank,
+    TransaksiDashboard.keterangan_umum,
+    TransaksiDashboard.keterangan_khusus,
+    TransaksiDashboard.ayat,
+    TransaksiDashboard.kode_opd,
+    TransaksiDashboard.kode_rekening,
+    TransaksiDashboard.nama_rekening
+).where(
+    TransaksiDashboard.id.in_(bindparam('ids', expanding=True))
+)
+
+# rekap_harian rows with OPD names. Params: start_date, end_date
+REKAP_HARIAN_RANGE = select(
+    RekapHarian.tanggal,
+    RekapHarian.opd_id,
+    RekapHarian.jenis_pembayaran,
+    RekapHarian.bendahara_id,
+    RekapHarian.total,
+    RekapHarian.jumlah,
+    RekapHarian.minimum,
+    RekapHarian.maksimum,
+    RekapHarian.total_sen,
+    RekapHarian.minimum_sen,
+    RekapHarian.maksimum_sen,
+    OPD.nama_opd
+).outerjoin(
+    OPD, RekapHarian.opd_id == OPD.id
+).where(
+    RekapHarian.tanggal.between(bindparam('start_date'), bindparam('end_date'))
+)
+
+# rekap_harian totals per OPD and jenis_pembayaran over a date range, which
+# the OPD and payment summaries are combined from. Aggregated before the OPD
+# join so only rekap_harian is grouped. SQLite picks the index from its
+# statistics: idx_rekap_harian_summary_cover reads the range in group order
+# from the index alone, idx_rekap_harian_opd reads it by date and groups in
+# a temp B-tree (see rekap_opd_jenis in python -m database.indexes).
+# Params: start_date, end_date
+_REKAP_HARIAN_TOTALS = select(
+    RekapHarian.opd_id,
+    RekapHarian.jenis_pembayaran,
+    func.sum(RekapHarian.jumlah).label('jumlah'),
+    func.sum(RekapHarian.total_sen).label('total_sen'),
+    func.min(RekapHarian.minimum_sen).label('minimum_sen'),
+    func.max(RekapHarian.maksimum_sen).label('maksimum_sen')
+).where(
+    RekapHarian.tanggal.between(bindparam('start_date'), bindparam('end_date'))
+).group_by(
+    RekapHarian.opd_id, RekapHarian.jenis_pembayaran
+).subquery()
+
+REKAP_HARIAN_SUMMARY_RANGE = select(
+    _REKAP_HARIAN_TOTALS,
+    OPD.nama_opd
+).outerjoin(
+    OPD, _REKAP_HARIAN_TOTALS.c.opd_id == OPD.id
+)
@@ -0,0 +1,218 @@
+"""
+Transaksi Dashboard - denormalized read model maintained by the ingest pipeline
+
+transaksi_dashboard holds one row per transaksi with the OPD, Bendahara and
+Rekening columns already joined, the calendar columns derived from
+tanggal_terima and the BAPENDA exclusion stored as a flag, so the dashboard
+loads it with a single scan. The calendar columns come from the calendar
+dimension by hari_key; the dashboard itself only loads the key.
+
+Usage:
+    python -m database.read_model --rebuild   # Recompute read model from transaksi
+"""
+
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, func, insert, select
+from database.schema import Transaksi, TransaksiDashboard, OPD, Bendahara, Rekening
+from config import PAYMENT_TYPES
+from utils.formatters import rupiah_to_sen
+from utils.kalender import day_keys, lookup
+
+# Maximum number of ids per IN (...) lookup
+SYNC_BATCH_SIZE = 900
+
+# Rows per batch when rebuilding the whole read model
+REBUILD_BATCH_SIZE = 20000
+
+BAPENDA_NAME = 'Badan Pendapatan Daerah'
+
+
+def _source_select():
+    """SELECT joining transaksi with its reference tables"""
+    return select(
+        Transaksi.id,
+        Transaksi.kode_billing,
+        Transaksi.tanggal_terima,
+        Transaksi.tanggal_setor,
+        Transaksi.tanggal_validasi_bank,
+        Transaksi.nominal,
+        Transaksi.nominal_sen,
+        Transaksi.jenis_pembayaran,
+        Transaksi.keterangan_umum,
+        Transaksi.keterangan_khusus,
+        Transaksi.ayat,
+        OPD.kode_opd,
+        OPD.nama_opd,
+        Bendahara.nama.label('nama_kasir'),
+        Bendahara.nip.label('nip_kasir'),
+        Rekening.kode_rekening,
+        Rekening.nama_rekening
+    ).outerjoin(
+        OPD, Transaksi.opd_id == OPD.id
+    ).outerjoin(
+        Bendahara, Transaksi.bendahara_id == Bendahara.id
+    ).outerjoin(
+        Rekening, Transaksi.rekening_id == Rekening.id
+    )
+
+
+def build_read_model_rows(df: pd.DataFrame) -> list:
+    """
+    Derive read-model columns for a batch of joined transaksi rows
+
+    Args:
+        df: DataFrame with the columns of _source_select()
+
+    Returns:
+        List of dicts ready for a bulk insert into transaksi_dashboard
+    """
+    if df.empty:
+        return []
+
+    df = df.copy()
+    df['tanggal_terima'] = pd.to_datetime(df['tanggal_terima'])
+    df['tanggal_setor'] = pd.to_datetime(df['tanggal_setor'])
+    df['tanggal_validasi_bank'] = pd.to_datetime(df['tanggal_validasi_bank'])
+
+    df['hari_key'] = day_keys(df['tanggal_terima'])
+    calendar = lookup(df['hari_key'], ['tanggal', 'tahun', 'bulan', 'nama_bulan', 'minggu_iso', 'hari'])
+    for column in ['tanggal', 'nama_bulan', 'hari']:
+        df[column] = calendar[column].astype(object)
+    for column, source in [('tahun', 'tahun'), ('bulan', 'bulan'), ('minggu_tahun', 'minggu_iso')]:
+        df[column] = calendar[source].astype('int64')
+    df['jenis_pembayaran_nama'] = df['jenis_pembayaran'].map(PAYMENT_TYPES).fillna('Lainnya')
+
+    # Rows migrated before nominal_sen existed are converted here
+    missing = df['nominal_sen'].isna()
+    if missing.any():
+        df.loc[missing, 'nominal_sen'] = df.loc[missing, 'nominal'].map(rupiah_to_sen)
+    df['nominal_sen'] = df['nominal_sen'].astype('int64')
+
+    df['nama_opd'] = df['nama_opd'].fillna('OPD Tidak Diketahui')
+    df['is_bapenda'] = df['nama_opd'].str.contains(BAPENDA_NAME, case=False, na=False)
+
+    # NaT/NaN -> None so the driver stores NULL
+    df = df.astype(object).where(df.notna(), None)
+    for col in ['tanggal_terima', 'tanggal_setor', 'tanggal_validasi_bank']:
+        # An object Series, as a plain list is re-inferred as datetime64 (None -> NaT)
+        df[col] = pd.Series(
+            [value.to_pydatetime() if value is not None else None for value in df[col]],
+            index=df.index, dtype=object
+        )
+
+    return df.to_dict('records')
+
+
+def _write_rows(session, df: pd.DataFrame) -> int:
+    """Insert derived rows for a joined batch, replacing existing ids"""
+    rows = build_read_model_rows(df)
+    if not rows:
+        return 0
+
+    ids = [row['id'] for row in rows]
+    session.execute(delete(TransaksiDashboard).where(TransaksiDashboard.id.in_(ids)))
+    session.execute(insert(TransaksiDashboard), rows)
+    return len(rows)
+
+
+def sync_read_model(session, transaksi_ids: list) -> int:
+    """
+    Insert or refresh read-model rows for the given transaksi ids (caller commits)
+
+    Args:
+        session: Database session
+        transaksi_ids: Ids of inserted or changed transaksi rows
+
+    Returns:
+        Number of read-model rows written
+    """
+    written = 0
+    connection = session.connection()
+
+    for i in range(0, len(transaksi_ids), SYNC_BATCH_SIZE):
+        batch = transaksi_ids[i:i + SYNC_BATCH_SIZE]
+        df = pd.read_sql(_source_select().where(Transaksi.id.in_(batch)), connection)
+        written += _write_rows(session, df)
+
+    session.flush()
+    return written
+
+
+def rebuild_read_model(session, batch_size: int = REBUILD_BATCH_SIZE) -> int:
+    """
+    Recompute transaksi_dashboard from transaksi (caller commits)
+
+    Returns:
+        Number of read-model rows written
+    """
+    session.execute(delete(TransaksiDashboard))
+    connection = session.connection()
+
+    written = 0
+    last_id = 0
+
+    while True:
+        statement = _source_select().where(
+            Transaksi.id > last_id
+        ).order_by(Transaksi.id).limit(batch_size)
+
+        df = pd.read_sql(statement, connection)
+        if df.empty:
+            break
+
+        written += _write_rows(session, df)
+        last_id = int(df['id'].max())
+
+    session.flush()
+    return written
+
+
+def ensure_read_model(session) -> bool:
+    """
+    Rebuild transaksi_dashboard if its row count differs from transaksi
+    or rows lack their hari_key (written before the calendar dimension)
+
+    Returns:
+        True if a rebuild was performed
+    """
+    source_count = session.query(func.count(Transaksi.id)).scalar()
+    model_count = session.query(func.count(TransaksiDashboard.id)).scalar()
+    missing_keys = session.query(TransaksiDashboard.id).filter(TransaksiDashboard.hari_key.is_(None)).first()
+
+    if source_count == model_count and missing_keys is None:
+        return False
+
+    rebuild_read_model(session)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Transaksi dashboard read model')
+    parser.add_argument('--rebuild', action='store_true', help='Recompute read model from transaksi')
+
+    args = parser.parse_args()
+
+    from database.connection import get_db_manager
+    from database.schema import Base
+
+    db_manager = get_db_manager()
+    Base.metadata.create_all(db_manager.engine)
+
+    with db_manager.session_scope() as session:
+        if args.rebuild:
+            count = rebuild_read_model(session)
+            print(f"Read model rebuilt: {count} rows")
+        else:
+            rebuilt = ensure_read_model(session)
+            print("Read model rebuilt" if rebuilt else "Read model up to date")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,324 @@
+"""
+Rekap Harian - rollup table maintained by the ingest pipeline
+
+Rows are keyed by tanggal x opd_id x jenis_pembayaran x bendahara_id and
+hold sum, count, min and max of nominal. The migrator updates them
+incrementally; rebuild_rollups() recomputes everything from transaksi.
+
+Archiving a year moves its transactions to Parquet but keeps its rollup
+rows, so summaries read from rekap_harian still cover archived years.
+Checks and rebuilds aggregate archived years from their Parquet files.
+
+Usage:
+    python -m database.rollup --check     # Compare rollup with transaksi and archives
+    python -m database.rollup --rebuild   # Recompute rollup from transaksi and archives
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime, date
+from decimal import Decimal
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, insert, select
+from database.schema import Transaksi, RekapHarian
+from database.queries import REKAP_HARIAN_BY_TANGGAL
+from utils.formatters import rupiah_to_sen
+from config import SEN_PER_RUPIAH
+
+# Maximum number of dates per IN (...) lookup
+LOOKUP_BATCH_SIZE = 500
+
+
+def _sen_to_decimal(sen: int) -> Decimal:
+    """Convert integer sen to an exact Rupiah Decimal"""
+    return Decimal(sen) / SEN_PER_RUPIAH
+
+
+class RollupAccumulator:
+    """Collect rollup deltas for transactions inserted in one batch"""
+
+    def __init__(self):
+        self._deltas = {}
+
+    def __len__(self):
+        return len(self._deltas)
+
+    def add(self, tanggal, opd_id, jenis_pembayaran, bendahara_id, nominal):
+        """
+        Add one inserted transaction to the pending deltas
+
+        Args:
+            tanggal: Transaction date or datetime (tanggal_terima)
+            opd_id: OPD id or None
+            jenis_pembayaran: Payment type code or None
+            bendahara_id: Bendahara id or None
+            nominal: Transaction amount
+        """
+        if isinstance(tanggal, datetime):
+            tanggal = tanggal.date()
+
+        key = (tanggal, opd_id or 0, jenis_pembayaran or 0, bendahara_id or 0)
+        sen = rupiah_to_sen(nominal)
+
+        delta = self._deltas.get(key)
+        if delta is None:
+            self._deltas[key] = [sen, 1, sen, sen]
+        else:
+            delta[0] += sen
+            delta[1] += 1
+            delta[2] = min(delta[2], sen)
+            delta[3] = max(delta[3], sen)
+
+    def flush(self, session) -> int:
+        """
+        Apply pending deltas to rekap_harian (caller commits)
+
+        Returns:
+            Number of rollup keys touched
+        """
+        touched = apply_rollup_deltas(session, self._deltas)
+        self._deltas = {}
+        return touched
+
+
+def apply_rollup_deltas(session, deltas: dict) -> int:
+    """
+    Merge deltas into existing rekap_harian rows
+
+    Args:
+        session: Database session
+        deltas: {(tanggal, opd_id, jenis_pembayaran, bendahara_id): [total, jumlah, min, max]}
+            with amounts in sen
+
+    Returns:
+        Number of rollup keys touched
+    """
+    if not deltas:
+        return 0
+
+    dates = sorted({key[0] for key in deltas})
+    existing = {}
+
+    for i in range(0, len(dates), LOOKUP_BATCH_SIZE):
+        batch = dates[i:i + LOOKUP_BATCH_SIZE]
+        for row in session.scalars(REKAP_HARIAN_BY_TANGGAL, {'tanggal': batch}):
+            existing[(row.tanggal, row.opd_id, row.jenis_pembayaran, row.bendahara_id)] = row
+
+    new_rows = []
+    for key, (total, jumlah, minimum, maksimum) in deltas.items():
+        row = existing.get(key)
+        if row is None:
+            new_rows.append({
+                'tanggal': key[0],
+                'opd_id': key[1],
+                'jenis_pembayaran': key[2],
+                'bendahara_id': key[3],
+                'total': _sen_to_decimal(total),
+                'jumlah': jumlah,
+                'minimum': _sen_to_decimal(minimum),
+                'maksimum': _sen_to_decimal(maksimum),
+                'total_sen': total,
+                'minimum_sen': minimum,
+                'maksimum_sen': maksimum,
+                'updated_at': datetime.utcnow(),
+            })
+            continue
+
+        if row.minimum_sen is not None:
+            minimum = min(row.minimum_sen, minimum)
+        if row.maksimum_sen is not None:
+            maksimum = max(row.maksimum_sen, maksimum)
+
+        row.total_sen = (row.total_sen or 0) + total
+        row.jumlah = (row.jumlah or 0) + jumlah
+        row.minimum_sen = minimum
+        row.maksimum_sen = maksimum
+        row.total = _sen_to_decimal(row.total_sen)
+        row.minimum = _sen_to_decimal(minimum)
+        row.maksimum = _sen_to_decimal(maksimum)
+
+    if new_rows:
+        session.execute(insert(RekapHarian), new_rows)
+    session.flush()
+
+    return len(deltas)
+
+
+def _rollup_select():
+    """SELECT computing rekap_harian rows from transaksi"""
+    # Only columns of idx_transaksi_tanggal_cover are read, so the aggregate
+    # is answered from the index; Rupiah amounts derive from the sen sums
+    tanggal = func.date(Transaksi.tanggal_terima)
+    total_sen = func.sum(Transaksi.nominal_sen)
+    minimum_sen = func.min(Transaksi.nominal_sen)
+    maksimum_sen = func.max(Transaksi.nominal_sen)
+    return select(
+        tanggal.label('tanggal'),
+        func.coalesce(Transaksi.opd_id, 0).label('opd_id'),
+        func.coalesce(Transaksi.jenis_pembayaran, 0).label('jenis_pembayaran'),
+        func.coalesce(Transaksi.bendahara_id, 0).label('bendahara_id'),
+        (total_sen / float(SEN_PER_RUPIAH)).label('total'),
+        func.count().label('jumlah'),
+        (minimum_sen / float(SEN_PER_RUPIAH)).label('minimum'),
+        (maksimum_sen / float(SEN_PER_RUPIAH)).label('maksimum'),
+        total_sen.label('total_sen'),
+        minimum_sen.label('minimum_sen'),
+        maksimum_sen.label('maksimum_sen'),
+    ).group_by(
+        tanggal,
+        func.coalesce(Transaksi.opd_id, 0),
+        func.coalesce(Transaksi.jenis_pembayaran, 0),
+        func.coalesce(Transaksi.bendahara_id, 0),
+    )
+
+
+def _archived_deltas() -> dict:
+    """
+    Rollup deltas of the transactions in the Parquet archives
+
+    Returns:
+        Deltas as taken by apply_rollup_deltas; empty without archives
+    """
+    from database.archive import list_archived_years, read_archived_columns, read_archived_year
+
+    keys = ['tanggal', 'opd_id', 'jenis_pembayaran', 'bendahara_id']
+    deltas = {}
+    for year in list_archived_years():
+        # Archives written before nominal_sen existed only hold nominal
+        amount = 'nominal_sen' if 'nominal_sen' in read_archived_columns(year) else 'nominal'
+        df = read_archived_year(year, columns=['tanggal_terima'] + keys[1:] + [amount])
+        if df.empty:
+            continue
+
+        df['tanggal'] = pd.to_datetime(df.pop('tanggal_terima')).dt.date
+        for key in keys[1:]:
+            df[key] = df[key].fillna(0).astype('int64')
+        df['sen'] = df.pop(amount).map(rupiah_to_sen) if amount == 'nominal' else df.pop(amount).astype('int64')
+
+        grouped = df.groupby(keys).agg(
+            total=('sen', 'sum'), jumlah=('sen', 'count'), minimum=('sen', 'min'), maksimum=('sen', 'max')
+        )
+        for (tanggal, *ids), row in zip(grouped.index, grouped.itertuples(index=False)):
+            key = (tanggal, *(int(value) for value in ids))
+            deltas[key] = [int(row.total), int(row.jumlah), int(row.minimum), int(row.maksimum)]
+
+    return deltas
+
+
+def rebuild_rollups(session) -> int:
+    """
+    Recompute rekap_harian from transaksi and the Parquet archives (caller commits)
+
+    Returns:
+        Number of rollup rows written
+    """
+    session.query(RekapHarian).delete()
+
+    source = _rollup_select().subquery()
+    session.execute(
+        insert(RekapHarian).from_select(
+            ['tanggal', 'opd_id', 'jenis_pembayaran', 'bendahara_id',
+             'total', 'jumlah', 'minimum', 'maksimum',
+             'total_sen', 'minimum_sen', 'maksimum_sen'],
+            select(
+                source.c.tanggal, source.c.opd_id, source.c.jenis_pembayaran,
+                source.c.bendahara_id, source.c.total, source.c.jumlah,
+                source.c.minimum, source.c.maksimum,
+                source.c.total_sen, source.c.minimum_sen, source.c.maksimum_sen
+            )
+        )
+    )
+    session.flush()
+
+    # Archived years are merged in, also days that still have transaksi rows
+    apply_rollup_deltas(session, _archived_deltas())
+
+    return session.query(func.count(RekapHarian.id)).scalar()
+
+
+def ensure_rollups(session) -> bool:
+    """
+    Rebuild rekap_harian if the transactions it counts differ from the
+    rows of transaksi and the Parquet archives
+
+    Returns:
+        True if a rebuild was performed
+    """
+    from database.archive import count_archived_rows, list_archived_years
+
+    counted = session.query(func.coalesce(func.sum(RekapHarian.jumlah), 0)).scalar()
+    source_count = session.query(func.count(Transaksi.id)).scalar()
+    source_count += sum(count_archived_rows(year) for year in list_archived_years())
+
+    if counted == source_count:
+        return False
+
+    rebuild_rollups(session)
+    return True
+
+
+def check_rollups(session) -> list:
+    """
+    Compare rekap_harian against a fresh aggregate of transaksi and the archives
+
+    Returns:
+        List of (key, expected, actual) tuples for mismatching keys,
+        where expected/actual are (total_sen, jumlah) or None
+    """
+    expected = {}
+    for row in session.execute(_rollup_select()):
+        tanggal = row.tanggal
+        if not isinstance(tanggal, date):
+            tanggal = datetime.strptime(str(tanggal)[:10], '%Y-%m-%d').date()
+        key = (tanggal, row.opd_id, row.jenis_pembayaran, row.bendahara_id)
+        expected[key] = (row.total_sen, row.jumlah)
+
+    for key, (total, jumlah, _, _) in _archived_deltas().items():
+        current = expected.get(key, (0, 0))
+        expected[key] = (current[0] + total, current[1] + jumlah)
+
+    actual = {}
+    for row in session.query(RekapHarian):
+        key = (row.tanggal, row.opd_id, row.jenis_pembayaran, row.bendahara_id)
+        actual[key] = (row.total_sen, row.jumlah)
+
+    mismatches = []
+    for key in sorted(set(expected) | set(actual)):
+        if expected.get(key) != actual.get(key):
+            mismatches.append((key, expected.get(key), actual.get(key)))
+
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rekap harian maintenance')
+    parser.add_argument('--check', action='store_true', help='Compare rollup with transaksi')
+    parser.add_argument('--rebuild', action='store_true', help='Recompute rollup from transaksi')
+
+    args = parser.parse_args()
+
+    from database.connection import get_db_manager
+    from database.schema import Base
+
+    db_manager = get_db_manager()
+    Base.metadata.create_all(db_manager.engine)
+
+    with db_manager.session_scope() as session:
+        if args.check or not args.rebuild:
+            mismatches = check_rollups(session)
+            print(f"Rekap harian: {len(mismatches)} mismatching keys")
+            for key, expected, actual in mismatches[:20]:
+                print(f"  {key}: expected={expected} actual={actual}")
+
+        if args.rebuild:
+            count = rebuild_rollups(session)
+            print(f"Rekap harian rebuilt: {count} rows")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,7 +4,7 @@ Skema relasional dengan SQLAlchemy ORM
 """
 
 from sqlalchemy import (
-    create_engine, Column, Integer, String, Float, DateTime, Date,
+    create_engine, Column, Integer, BigInteger, String, Float, DateTime, Date,
     ForeignKey, Text, Boolean, Index, Numeric, Enum
 )
 from sqlalchemy.ext.declarative import declarative_base
@@ -120,16 +120,17 @@ class Transaksi(Base):
     kode_billing = Column(String(50), unique=True, nullable=False, index=True)
 
     # Foreign Keys
-    opd_id = Column(Integer, ForeignKey('opd.id'), index=True)
+    opd_id = Column(Integer, ForeignKey('opd.id'))
     rekening_id = Column(Integer, ForeignKey('rekening.id'), index=True)
     bendahara_id = Column(Integer, ForeignKey('bendahara.id'), index=True)
 
     # Data Transaksi
     ayat = Column(String(50))
     nominal = Column(Numeric(18, 2), nullable=False, default=0)
+    nominal_sen = Column(BigInteger)  # nominal dalam sen (1/100 Rupiah)
 
     # Tanggal-tanggal penting
-    tanggal_terima = Column(DateTime, nullable=False, index=True)
+    tanggal_terima = Column(DateTime, nullable=False)
     tanggal_setor = Column(DateTime)
     tanggal_validasi_bank = Column(DateTime)
 
@@ -159,17 +160,104 @@ class Transaksi(Base):
     rekening = relationship("Rekening", back_populates="transaksi")
     bendahara = relationship("Bendahara", back_populates="transaksi")
 
-    # Indexes
+    # Indexes - covering the aggregates over transaksi (rollup rebuild,
+    # period totals per payment type / OPD) so no row is read from the table
     __table_args__ = (
-        Index('idx_transaksi_tanggal', 'tanggal_terima'),
-        Index('idx_transaksi_opd_tanggal', 'opd_id', 'tanggal_terima'),
-        Index('idx_transaksi_jenis_pembayaran', 'jenis_pembayaran'),
+        Index('idx_transaksi_tanggal_cover', 'tanggal_terima', 'jenis_pembayaran', 'opd_id', 'bendahara_id', 'nominal_sen'),
+        Index('idx_transaksi_opd_cover', 'opd_id', 'tanggal_terima', 'jenis_pembayaran', 'nominal_sen'),
+        Index('idx_transaksi_jenis_cover', 'jenis_pembayaran', 'tanggal_terima', 'opd_id', 'nominal_sen'),
     )
 
     def __repr__(self):
         return f"<Transaksi(billing='{self.kode_billing}', nominal={self.nominal})>"
 
 
+class TransaksiDashboard(Base):
+    """Tabel read-model transaksi untuk dashboard (denormalisasi, diisi saat migrasi)"""
+    __tablename__ = 'transaksi_dashboard'
+
+    id = Column(Integer, primary_key=True, autoincrement=False)  # = transaksi.id
+    kode_billing = Column(String(50), nullable=False)
+
+    # Data transaksi
+    tanggal_terima = Column(DateTime, nullable=False)
+    tanggal_setor = Column(DateTime)
+    tanggal_validasi_bank = Column(DateTime)
+    nominal = Column(Numeric(18, 2), nullable=False, default=0)
+    nominal_sen = Column(BigInteger)  # nominal dalam sen (1/100 Rupiah)
+    jenis_pembayaran = Column(Integer)
+    jenis_pembayaran_nama = Column(String(50))
+    keterangan_umum = Column(Text)
+    keterangan_khusus = Column(Text)
+    ayat = Column(String(50))
+
+    # Kolom hasil join OPD, Bendahara, Rekening
+    kode_opd = Column(String(20))
+    nama_opd = Column(String(255))
+    nama_kasir = Column(String(255))
+    nip_kasir = Column(String(50))
+    kode_rekening = Column(String(50))
+    nama_rekening = Column(String(255))
+
+    # Kunci dimensi kalender (YYYYMMDD) dan kolom kalender turunan tanggal_terima
+    hari_key = Column(Integer)
+    tanggal = Column(Date)
+    tahun = Column(Integer)
+    bulan = Column(Integer)
+    nama_bulan = Column(String(20))
+    minggu_tahun = Column(Integer)
+    hari = Column(String(20))
+
+    # BAPENDA dikecualikan dari analisis
+    is_bapenda = Column(Boolean, nullable=False, default=False)
+
+    __table_args__ = (
+        Index('idx_transaksi_dashboard_bapenda_tanggal', 'is_bapenda', 'tanggal_terima'),
+        # Year pruning for partition loads; covers the per-year catalog query
+        Index('idx_transaksi_dashboard_tahun', 'tahun', 'is_bapenda', 'minggu_tahun', 'tanggal_terima'),
+    )
+
+    def __repr__(self):
+        return f"<TransaksiDashboard(billing='{self.kode_billing}', nominal={self.nominal})>"
+
+
+class RekapHarian(Base):
+    """Tabel rekap harian transaksi (diperbarui saat migrasi transaksi)"""
+    __tablename__ = 'rekap_harian'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    tanggal = Column(Date, nullable=False)
+
+    # Dimensi rekap (0 = tidak diketahui)
+    opd_id = Column(Integer, nullable=False, default=0)
+    jenis_pembayaran = Column(Integer, nullable=False, default=0)
+    bendahara_id = Column(Integer, nullable=False, default=0)
+
+    # Agregat
+    total = Column(Numeric(18, 2), nullable=False, default=0)
+    jumlah = Column(Integer, nullable=False, default=0)
+    minimum = Column(Numeric(18, 2))
+    maksimum = Column(Numeric(18, 2))
+
+    # Agregat dalam sen (1/100 Rupiah)
+    total_sen = Column(BigInteger, nullable=False, default=0)
+    minimum_sen = Column(BigInteger)
+    maksimum_sen = Column(BigInteger)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index('idx_rekap_harian_key', 'tanggal', 'opd_id', 'jenis_pembayaran', 'bendahara_id', unique=True),
+        Index('idx_rekap_harian_opd', 'opd_id', 'tanggal'),
+        # Dashboard OPD and payment summaries (REKAP_HARIAN_SUMMARY_RANGE)
+        Index('idx_rekap_harian_summary_cover', 'opd_id', 'jenis_pembayaran', 'tanggal',
+              'jumlah', 'total_sen', 'minimum_sen', 'maksimum_sen'),
+    )
+
+    def __repr__(self):
+        return f"<RekapHarian(tanggal='{self.tanggal}', opd_id={self.opd_id}, total={self.total})>"
+
+
 class OPDRekening(Base):
     """Tabel relasi antara OPD dan Rekening"""
     __tablename__ = 'opd_rekening'
@@ -0,0 +1,155 @@
+"""
+Snapshot - export transaksi_dashboard to Parquet for the DuckDB backend
+
+Each year of the read model becomes SNAPSHOT_DIR/transaksi_<year>.parquet.
+The number of non-BAPENDA rows is stored in the file metadata so readers
+can detect a snapshot that lags behind the database. Archived years are
+read from their archive files instead. Requires pyarrow.
+
+Usage:
+    python -m database.snapshot             # Export all years
+    python -m database.snapshot --year 2025 # Export one year
+"""
+
+import argparse
+import glob
+import os
+import re
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select
+from database.schema import TransaksiDashboard
+from database.archive import _require_pyarrow
+from config import SNAPSHOT_DIR, ARCHIVE_COMPRESSION
+
+SNAPSHOT_PATTERN = re.compile(r'transaksi_(\d{4})\.parquet$')
+
+# Parquet schema metadata key holding the number of non-BAPENDA rows
+VISIBLE_ROWS_METADATA_KEY = b'sts_visible_rows'
+
+
+def snapshot_path(year: int) -> str:
+    """Get the Parquet snapshot path of a year"""
+    return os.path.join(SNAPSHOT_DIR, f"transaksi_{year}.parquet")
+
+
+def list_snapshot_years() -> list:
+    """Get sorted list of years that have a snapshot file"""
+    years = []
+    for path in glob.glob(os.path.join(SNAPSHOT_DIR, 'transaksi_*.parquet')):
+        match = SNAPSHOT_PATTERN.search(os.path.basename(path))
+        if match:
+            years.append(int(match.group(1)))
+    return sorted(years)
+
+
+def read_snapshot_visible_rows(year: int) -> int:
+    """Get the non-BAPENDA row count recorded in a snapshot (-1 if unknown)"""
+    _require_pyarrow()
+    import pyarrow.parquet as pq
+
+    metadata = pq.read_schema(snapshot_path(year)).metadata or {}
+    return int(metadata.get(VISIBLE_ROWS_METADATA_KEY, b'-1'))
+
+
+def read_snapshot_columns(year: int) -> list:
+    """Get the column names of a snapshot from the Parquet footer"""
+    _require_pyarrow()
+    import pyarrow.parquet as pq
+
+    return pq.read_schema(snapshot_path(year)).names
+
+
+def export_year(session, year: int) -> int:
+    """
+    Write one year of transaksi_dashboard to its snapshot file
+
+    Args:
+        session: Database session
+        year: Value of tahun to export
+
+    Returns:
+        Number of exported rows
+    """
+    pa = _require_pyarrow()
+    import pyarrow.parquet as pq
+
+    statement = select(TransaksiDashboard.__table__).where(
+        TransaksiDashboard.tahun == year
+    ).order_by(TransaksiDashboard.id)
+
+    df = pd.read_sql(statement, session.connection())
+
+    for col in ['tanggal_terima', 'tanggal_setor', 'tanggal_validasi_bank']:
+        df[col] = pd.to_datetime(df[col])
+    df['tanggal'] = pd.to_datetime(df['tanggal']).dt.date
+    df['is_bapenda'] = df['is_bapenda'].astype(bool)
+    df['nominal'] = df['nominal'].astype(float)
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[VISIBLE_ROWS_METADATA_KEY] = str(int((~df['is_bapenda']).sum())).encode()
+    table = table.replace_schema_metadata(metadata)
+
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    path = snapshot_path(year)
+    tmp_path = f"{path}.tmp"
+    pq.write_table(table, tmp_path, compression=ARCHIVE_COMPRESSION)
+    os.replace(tmp_path, path)
+
+    return len(df)
+
+
+def export_snapshot(session, years: list = None) -> dict:
+    """
+    Export years of transaksi_dashboard to Parquet snapshots
+
+    Snapshots of years no longer in the read model (e.g. archived) are
+    removed when all years are exported.
+
+    Args:
+        session: Database session
+        years: Years to export (default: all years in the read model)
+
+    Returns:
+        Dictionary {year: exported rows}
+    """
+    all_years = years is None
+    if all_years:
+        years = [
+            int(year) for (year,) in session.execute(
+                select(TransaksiDashboard.tahun).distinct()
+            ) if year is not None
+        ]
+
+    exported = {year: export_year(session, year) for year in sorted(years)}
+
+    if all_years:
+        for year in list_snapshot_years():
+            if year not in exported:
+                os.remove(snapshot_path(year))
+
+    return exported
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Parquet snapshot of transaksi_dashboard')
+    parser.add_argument('--year', type=int, help='Export only this year')
+
+    args = parser.parse_args()
+
+    from database.connection import get_db_manager
+
+    with get_db_manager().session_scope() as session:
+        exported = export_snapshot(session, [args.year] if args.year else None)
+
+    for year, count in exported.items():
+        print(f"  {year}: {count} baris -> {snapshot_path(year)}")
+
+
+if __name__ == '__main__':
+    main()
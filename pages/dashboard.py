@@ -5,7 +5,6 @@ Dashboard Page - Main monitoring dashboard
 from dash import html, dcc, Input, Output, State, callback, no_update
 import dash_bootstrap_components as dbc
 from datetime import datetime
-import pandas as pd
 
 from config import COLORS, MONTH_NAMES_SHORT
 from components.header import create_header
@@ -15,6 +14,7 @@ from components.charts import create_opd_chart, create_payment_chart, create_tre
 from components.tables import create_opd_table, create_transaction_table, create_bendahara_table
 from components.footer import create_footer
 from utils.data_service import get_data_service
+from utils.cache import get_result_cache, make_key
 from utils.formatters import format_date
 
 
@@ -167,13 +167,12 @@ def register_callbacks(app):
         data_service = get_data_service()
 
         try:
-            df = data_service.get_all_transactions()
             min_date, max_date = data_service.get_date_range()
             opd_list = data_service.get_opd_list()
             payment_types = data_service.get_payment_types()
 
-            years = sorted(df['tahun'].unique().tolist()) if not df.empty else [datetime.now().year]
-            weeks = sorted(df['minggu_tahun'].unique().tolist()) if not df.empty else list(range(1, 53))
+            years = data_service.get_available_years() or [datetime.now().year]
+            weeks = data_service.get_available_weeks() or list(range(1, 53))
 
         except Exception as e:
             print(f"Error loading data: {e}")
@@ -202,10 +201,9 @@ def register_callbacks(app):
         data_service = get_data_service()
 
         try:
-            df = data_service.get_all_transactions()
             min_date, max_date = data_service.get_date_range()
-            years = sorted(df['tahun'].unique().tolist()) if not df.empty else [datetime.now().year]
-            weeks = sorted(df['minggu_tahun'].unique().tolist()) if not df.empty else list(range(1, 53))
+            years = data_service.get_available_years() or [datetime.now().year]
+            weeks = data_service.get_available_weeks() or list(range(1, 53))
         except:
             min_date = max_date = datetime.now()
             years = [datetime.now().year]
@@ -245,50 +243,51 @@ def register_callbacks(app):
         selected_year,
         refresh_clicks, refresh_intervals
     ):
-        """Filter data based on all filter inputs"""
+        """
+        Filter data based on all filter inputs
+
+        The store keeps the filter parameters and counts, not the rows: the
+        filtered data stays on the server and the other callbacks look its
+        cached summaries up by these parameters.
+        """
         data_service = get_data_service()
 
         try:
-            df = data_service.get_all_transactions()
-
-            # Parse dates
-            if single_date:
-                single_date = pd.to_datetime(single_date).date()
-            if start_date:
-                start_date = pd.to_datetime(start_date).date()
-            if end_date:
-                end_date = pd.to_datetime(end_date).date()
-
-            # Apply filters
-            df_filtered, period_label = data_service.filter_data(
-                df,
-                period_type=period_type or 'Semua Data',
-                selected_date=single_date,
-                start_date=start_date,
-                end_date=end_date,
-                selected_week=selected_week,
-                selected_month=selected_month,
-                selected_year=selected_year or year_week or year_month,
-                selected_opd=selected_opd,
-                selected_payment=selected_payment
-            )
+            filters = {
+                'period_type': period_type or 'Semua Data',
+                'selected_date': single_date,
+                'start_date': start_date,
+                'end_date': end_date,
+                'selected_week': selected_week,
+                'selected_month': selected_month,
+                'selected_year': selected_year or year_week or year_month,
+                'selected_opd': selected_opd,
+                'selected_payment': selected_payment,
+            }
+            metrics = data_service.get_filtered_summary(filters, 'get_summary_metrics')
+
+            return {
+                'filters': filters,
+                'rows': int(metrics['jumlah_sts']),
+                'opd_count': int(metrics['jumlah_opd']),
+            }, data_service.get_period_label(filters)
 
-            # Convert to serializable format
-            data_dict = df_filtered.to_dict('records')
+        except Exception as e:
+            print(f"Error filtering data: {e}")
+            return None, "Semua Data"
 
-            # Convert datetime objects to strings
-            for record in data_dict:
-                for key, value in record.items():
-                    if isinstance(value, (datetime, pd.Timestamp)):
-                        record[key] = value.isoformat()
-                    elif pd.isna(value):
-                        record[key] = None
+    def has_rows(data) -> bool:
+        """Check if the filtered-data-store selects any transactions"""
+        return bool(data) and data.get('rows', 0) > 0
 
-            return data_dict, period_label
+    def summary(data, name: str, **kwargs):
+        """Cached summary of the data selected by the filtered-data-store"""
+        return get_data_service().get_filtered_summary(data['filters'], name, **kwargs)
 
-        except Exception as e:
-            print(f"Error filtering data: {e}")
-            return [], "Semua Data"
+    def render_cached(data, name: str, render):
+        """Rendered component for the filtered-data-store, cached with its data"""
+        key = make_key('render', get_data_service().filter_key(data['filters']), name)
+        return get_result_cache().get_or_compute(key, render)
 
     @app.callback(
         Output('info-box-container', 'children'),
@@ -297,10 +296,9 @@ def register_callbacks(app):
     )
     def update_info_box(data, period_label):
         """Update info box"""
-        if not data:
+        if not has_rows(data):
             return create_info_box("Semua Data", 0, 0, "-")
 
-        df = pd.DataFrame(data)
         data_service = get_data_service()
         min_date, max_date = data_service.get_date_range()
 
@@ -308,8 +306,8 @@ def register_callbacks(app):
 
         return create_info_box(
             period_label or "Semua Data",
-            len(df),
-            df['nama_opd'].nunique() if not df.empty else 0,
+            data['rows'],
+            data['opd_count'],
             date_range
         )
 
@@ -319,7 +317,7 @@ def register_callbacks(app):
     )
     def update_metric_cards(data):
         """Update metric cards"""
-        if not data:
+        if not has_rows(data):
             return create_metric_cards({
                 'total_penerimaan': 0,
                 'jumlah_sts': 0,
@@ -327,11 +325,9 @@ def register_callbacks(app):
                 'jumlah_opd': 0
             })
 
-        df = pd.DataFrame(data)
-        data_service = get_data_service()
-        metrics = data_service.get_summary_metrics(df)
-
-        return create_metric_cards(metrics)
+        return render_cached(data, 'metric_cards', lambda: create_metric_cards(
+            summary(data, 'get_summary_metrics')
+        ))
 
     @app.callback(
         Output('opd-chart-container', 'children'),
@@ -339,14 +335,12 @@ def register_callbacks(app):
     )
     def update_opd_chart(data):
         """Update OPD chart"""
-        if not data:
+        if not has_rows(data):
             return html.Div("Tidak ada data", style={'padding': '2rem', 'textAlign': 'center'})
 
-        df = pd.DataFrame(data)
-        data_service = get_data_service()
-        opd_summary = data_service.get_opd_summary(df, top_n=15)
-
-        return create_opd_chart(opd_summary)
+        return render_cached(data, 'opd_chart', lambda: create_opd_chart(
+            summary(data, 'get_opd_summary', top_n=15)
+        ))
 
     @app.callback(
         [Output('payment-chart-container', 'children'),
@@ -355,21 +349,23 @@ def register_callbacks(app):
     )
     def update_payment_section(data):
         """Update payment chart and table"""
-        if not data:
+        if not has_rows(data):
             return html.Div("Tidak ada data"), html.Div()
 
-        df = pd.DataFrame(data)
-        data_service = get_data_service()
-        payment_summary = data_service.get_payment_summary(df)
+        return render_cached(data, 'payment_section', lambda: render_payment_section(
+            summary(data, 'get_payment_summary')
+        ))
 
+    def render_payment_section(payment_summary):
+        """Payment chart and table of a payment summary"""
         chart = create_payment_chart(payment_summary)
 
         # Simple payment table
         if not payment_summary.empty:
-            from utils.formatters import format_rupiah, format_percentage
+            from utils.formatters import format_rupiah_column, format_percentage_column
             table_df = payment_summary.copy()
-            table_df['total'] = table_df['total'].apply(format_rupiah)
-            table_df['persentase'] = table_df['persentase'].apply(lambda x: f"{x:.1f}%")
+            table_df['total'] = format_rupiah_column(table_df['total'])
+            table_df['persentase'] = format_percentage_column(table_df['persentase'])
 
             table = dbc.Table.from_dataframe(
                 table_df[['jenis_pembayaran', 'total', 'jumlah', 'persentase']],
@@ -390,15 +386,12 @@ def register_callbacks(app):
     )
     def update_trend_chart(data):
         """Update daily trend chart"""
-        if not data:
+        if not has_rows(data):
             return html.Div("Tidak ada data", style={'padding': '2rem', 'textAlign': 'center'})
 
-        df = pd.DataFrame(data)
-        df['tanggal'] = pd.to_datetime(df['tanggal_terima']).dt.date
-        data_service = get_data_service()
-        trend_data = data_service.get_daily_trend(df)
-
-        return create_trend_chart(trend_data)
+        return render_cached(data, 'trend_chart', lambda: create_trend_chart(
+            summary(data, 'get_daily_trend')
+        ))
 
     @app.callback(
         Output('monthly-chart-container', 'children'),
@@ -406,18 +399,12 @@ def register_callbacks(app):
     )
     def update_monthly_chart(data):
         """Update monthly chart"""
-        if not data:
+        if not has_rows(data):
             return html.Div("Tidak ada data", style={'padding': '2rem', 'textAlign': 'center'})
 
-        df = pd.DataFrame(data)
-        df['tanggal_terima'] = pd.to_datetime(df['tanggal_terima'])
-        df['tahun'] = df['tanggal_terima'].dt.year
-        df['bulan'] = df['tanggal_terima'].dt.month
-
-        data_service = get_data_service()
-        monthly_data = data_service.get_monthly_summary(df)
-
-        return create_monthly_chart(monthly_data)
+        return render_cached(data, 'monthly_chart', lambda: create_monthly_chart(
+            summary(data, 'get_monthly_summary')
+        ))
 
     @app.callback(
         Output('opd-table-container', 'children'),
@@ -425,14 +412,12 @@ def register_callbacks(app):
     )
     def update_opd_table(data):
         """Update OPD table"""
-        if not data:
+        if not has_rows(data):
             return html.Div("Tidak ada data")
 
-        df = pd.DataFrame(data)
-        data_service = get_data_service()
-        opd_summary = data_service.get_opd_summary(df, top_n=None)
-
-        return create_opd_table(opd_summary)
+        return render_cached(data, 'opd_table', lambda: create_opd_table(
+            summary(data, 'get_opd_summary', top_n=None)
+        ))
 
     @app.callback(
         Output('transaction-table-container', 'children'),
@@ -440,14 +425,12 @@ def register_callbacks(app):
     )
     def update_transaction_table(data):
         """Update transaction table"""
-        if not data:
+        if not has_rows(data):
             return html.Div("Tidak ada data")
 
-        df = pd.DataFrame(data)
-        data_service = get_data_service()
-        detail_data = data_service.get_transaction_detail(df, limit=500)
-
-        return create_transaction_table(detail_data)
+        return render_cached(data, 'transaction_table', lambda: create_transaction_table(
+            summary(data, 'get_transaction_detail', limit=500)
+        ))
 
     @app.callback(
         Output('bendahara-table-container', 'children'),
@@ -455,14 +438,12 @@ def register_callbacks(app):
     )
     def update_bendahara_table(data):
         """Update bendahara table"""
-        if not data:
+        if not has_rows(data):
             return html.Div("Tidak ada data")
 
-        df = pd.DataFrame(data)
-        data_service = get_data_service()
-        bendahara_data = data_service.get_bendahara_summary(df)
-
-        return create_bendahara_table(bendahara_data)
+        return render_cached(data, 'bendahara_table', lambda: create_bendahara_table(
+            summary(data, 'get_bendahara_summary')
+        ))
 
     @app.callback(
         Output('refresh-interval', 'disabled'),
@@ -479,11 +460,10 @@ def register_callbacks(app):
     )
     def update_data_info(data):
         """Update data info in sidebar"""
-        if not data:
+        if not has_rows(data):
             return "Tidak ada data", ""
 
-        df = pd.DataFrame(data)
-        info_text = f"{len(df):,} transaksi | {df['nama_opd'].nunique()} OPD"
+        info_text = f"{data['rows']:,} transaksi | {data['opd_count']} OPD"
         update_text = f"Update: {datetime.now().strftime('%H:%M:%S')}"
 
         return info_text, update_text
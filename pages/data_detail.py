@@ -35,8 +35,7 @@ def register_callbacks(app):
         from datetime import datetime
 
         data_service = get_data_service()
-        df = data_service.get_all_transactions()
-        opd_summary = data_service.get_opd_summary(df, top_n=None)
+        opd_summary = data_service.get_opd_summary_from_rollup(top_n=None)
 
         if opd_summary.empty:
             return no_update
@@ -66,14 +65,8 @@ def register_callbacks(app):
         if df.empty:
             return no_update
 
-        # Select relevant columns
-        export_cols = [
-            'kode_billing', 'tanggal_terima', 'tanggal_setor',
-            'tanggal_validasi_bank', 'nama_opd', 'nominal',
-            'jenis_pembayaran_nama', 'nama_kasir', 'keterangan_umum'
-        ]
-
-        export_df = df[export_cols].copy()
+        # Select relevant columns, amounts in Rupiah, rows in stored order
+        export_df = data_service.get_transaction_detail(df, limit=None, newest_first=False)
 
         return dcc.send_data_frame(
             export_df.to_csv,
@@ -5,7 +5,12 @@ Main Entry Point
 
 Usage:
     python run.py              # Run Dash app (default)
+    python run.py --serve      # Run production server (gunicorn/waitress)
     python run.py --migrate    # Run database migration only
+    python run.py --rebuild-rollup  # Check and rebuild rekap_harian
+    python run.py --rebuild-read-model  # Rebuild transaksi_dashboard
+    python run.py --archive-year 2023   # Move a closed year to Parquet
+    python run.py --export-snapshot     # Export Parquet snapshot for DuckDB
     python run.py --streamlit  # Run old Streamlit app
 """
 
@@ -24,16 +29,89 @@ def run_migration():
     migrate()
 
 
-def run_dash_app():
-    """Run Dash application"""
-    from config import DEBUG, HOST, PORT
+def run_rollup_rebuild():
+    """Check rekap_harian against transaksi and the archives and rebuild it"""
+    from database.connection import get_db_manager
+    from database.schema import Base
+    from database.rollup import check_rollups, rebuild_rollups
+
+    db_manager = get_db_manager()
+    Base.metadata.create_all(db_manager.engine)
+
+    with db_manager.session_scope() as session:
+        mismatches = check_rollups(session)
+        print(f"Rekap harian sebelum rebuild: {len(mismatches)} key tidak cocok")
+        count = rebuild_rollups(session)
+        print(f"Rekap harian dibangun ulang: {count} baris")
+
+
+def run_read_model_rebuild():
+    """Rebuild the transaksi_dashboard read model"""
+    from database.connection import get_db_manager
+    from database.schema import Base
+    from database.read_model import rebuild_read_model
+
+    db_manager = get_db_manager()
+    Base.metadata.create_all(db_manager.engine)
+
+    with db_manager.session_scope() as session:
+        count = rebuild_read_model(session)
+        print(f"Read model transaksi_dashboard dibangun ulang: {count} baris")
+
 
-    # Check if database exists, if not run migration
-    db_path = os.path.join('data', 'monitoring_sts.db')
-    if not os.path.exists(db_path):
+def run_archive_year(year: int):
+    """Archive a closed fiscal year to Parquet"""
+    from database.connection import get_db_manager
+    from database.archive import archive_year, archive_path
+
+    with get_db_manager().session_scope() as session:
+        count = archive_year(session, year)
+    print(f"Tahun {year}: {count} transaksi diarsipkan ke {archive_path(year)}")
+
+
+def run_export_snapshot():
+    """Export transaksi_dashboard to Parquet snapshots for the DuckDB backend"""
+    from database.connection import get_db_manager
+    from database.snapshot import export_snapshot, snapshot_path
+
+    with get_db_manager().session_scope() as session:
+        exported = export_snapshot(session)
+    for year, count in exported.items():
+        print(f"Tahun {year}: {count} baris diekspor ke {snapshot_path(year)}")
+
+
+def prepare_app_database():
+    """Run migration for a new database, otherwise bring an existing one up to date"""
+    from sqlalchemy.engine import make_url
+    from config import DATABASE_URL
+
+    # Only a SQLite file can be missing; a database server is migrated by --migrate
+    url = make_url(DATABASE_URL)
+    if url.get_backend_name() == 'sqlite' and not os.path.exists(url.database or ''):
         print("\n[INFO] Database tidak ditemukan. Menjalankan migrasi...")
         run_migration()
         print("\n[INFO] Migrasi selesai. Memulai aplikasi...\n")
+    else:
+        from database.migrate_data import prepare_database
+        prepare_database()
+
+
+def warm_up():
+    """Load the data cache so the first request does not pay the cold load"""
+    from utils.data_service import warm_data_service
+
+    stats = warm_data_service()
+    print(
+        f"[INFO] Cache siap: {stats['rows']:,} transaksi, "
+        f"{len(stats['years'])} tahun dalam {stats['seconds']:.1f} s"
+    )
+
+
+def run_dash_app():
+    """Run Dash application"""
+    from config import DEBUG, HOST, PORT
+
+    prepare_app_database()
 
     print("=" * 60)
     print("MONITORING STS DASHBOARD")
@@ -42,10 +120,83 @@ def run_dash_app():
     print(f"\nServer berjalan di: http://{HOST}:{PORT}")
     print("Tekan Ctrl+C untuk menghentikan server\n")
 
+    # Warm in the background; with the reloader only the serving child does
+    if not DEBUG or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        import threading
+        threading.Thread(target=warm_up, daemon=True).start()
+
     from dash_app import app
     app.run(debug=DEBUG, host=HOST, port=PORT)
 
 
+def run_production_server():
+    """Run Dash application on a multi-worker WSGI server with a warm cache"""
+    from config import HOST, PORT, WEB_WORKERS, WEB_THREADS
+
+    prepare_app_database()
+
+    print("=" * 60)
+    print("MONITORING STS DASHBOARD - PRODUCTION")
+    print("BAPENDA Jawa Timur")
+    print("=" * 60)
+
+    if os.name == 'nt':
+        # No fork on Windows: one process, WEB_WORKERS * WEB_THREADS threads
+        from waitress import serve
+        from dash_app import server
+
+        warm_up()
+        print(f"\nServer (waitress) berjalan di: http://{HOST}:{PORT}\n")
+        serve(server, host=HOST, port=PORT, threads=WEB_WORKERS * WEB_THREADS)
+    else:
+        print(f"\nServer (gunicorn, {WEB_WORKERS} worker) berjalan di: http://{HOST}:{PORT}\n")
+        _gunicorn_application(HOST, PORT).run()
+
+
+def _gunicorn_application(host: str, port: int):
+    """
+    Gunicorn application that loads and warms the app once in the master
+
+    Workers are forked after warm-up, so they start with the cached
+    partitions and share their memory pages copy-on-write.
+    """
+    import gc
+    from gunicorn.app.base import BaseApplication
+    from config import WEB_WORKERS, WEB_THREADS, WEB_TIMEOUT
+
+    def post_fork(server, worker):
+        from database.connection import get_db_manager
+        from utils.data_service import get_data_service
+
+        get_db_manager().dispose_after_fork()
+        get_data_service().after_fork()
+
+    class DashApplication(BaseApplication):
+        def load_config(self):
+            options = {
+                'bind': f"{host}:{port}",
+                'workers': WEB_WORKERS,
+                'threads': WEB_THREADS,
+                'worker_class': 'gthread',
+                'timeout': WEB_TIMEOUT,
+                'preload_app': True,
+                'post_fork': post_fork,
+            }
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from dash_app import server
+
+            warm_up()
+            # Keep the garbage collector from touching (and so copying) the
+            # warmed objects in every worker
+            gc.freeze()
+            return server
+
+    return DashApplication()
+
+
 def run_streamlit_app():
     """Run old Streamlit application"""
     print("Menjalankan aplikasi Streamlit...")
@@ -55,19 +206,35 @@ def run_streamlit_app():
 def main():
     parser = argparse.ArgumentParser(description='Monitoring STS Dashboard')
     parser.add_argument('--migrate', action='store_true', help='Run database migration only')
+    parser.add_argument('--serve', action='store_true', help='Run production server (gunicorn/waitress)')
     parser.add_argument('--streamlit', action='store_true', help='Run old Streamlit app')
+    parser.add_argument('--rebuild-rollup', action='store_true', help='Check and rebuild rekap_harian')
+    parser.add_argument('--rebuild-read-model', action='store_true', help='Rebuild transaksi_dashboard')
+    parser.add_argument('--archive-year', type=int, metavar='YEAR', help='Archive a closed year to Parquet')
+    parser.add_argument('--export-snapshot', action='store_true', help='Export Parquet snapshot for DuckDB backend')
     parser.add_argument('--port', type=int, default=8050, help='Port number (default: 8050)')
 
     args = parser.parse_args()
 
     if args.migrate:
         run_migration()
+    elif args.rebuild_rollup:
+        run_rollup_rebuild()
+    elif args.rebuild_read_model:
+        run_read_model_rebuild()
+    elif args.archive_year:
+        run_archive_year(args.archive_year)
+    elif args.export_snapshot:
+        run_export_snapshot()
     elif args.streamlit:
         run_streamlit_app()
     else:
         if args.port != 8050:
             os.environ['PORT'] = str(args.port)
-        run_dash_app()
+        if args.serve:
+            run_production_server()
+        else:
+            run_dash_app()
 
 
 if __name__ == '__main__':
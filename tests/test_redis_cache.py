@@ -0,0 +1,189 @@
+"""
+Tests for the Redis tier of the result cache, against fakeredis
+
+Usage:
+    python -m pytest tests
+"""
+
+import os
+import sys
+import time
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+fakeredis = pytest.importorskip('fakeredis')
+
+from utils import cache
+from utils.cache import MISSING, MemoryCache, RedisCache, ResultCache, make_key
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def client(server):
+    return fakeredis.FakeRedis(server=server)
+
+
+@pytest.fixture
+def redis_cache(client):
+    return RedisCache(client, prefix='test:', ttl=60, version='v1')
+
+
+def summary_frame() -> pd.DataFrame:
+    return pd.DataFrame({
+        'nama_opd': pd.Categorical(['Dinas A', 'Dinas B']),
+        'total': [1500000.5, 250000.0],
+        'jumlah': [3, 1],
+    })
+
+
+def test_put_and_get_frame(redis_cache):
+    key = make_key('summary', 'filter', 'get_opd_summary')
+    expected = summary_frame()
+
+    assert redis_cache.put(key, expected)
+    actual = redis_cache.get(key)
+
+    pd.testing.assert_frame_equal(actual, expected)
+    assert redis_cache.stats()['writes'] == 1
+
+
+def test_put_and_get_json(redis_cache):
+    key = make_key('summary', 'filter', 'get_summary_metrics')
+    metrics = {'total_penerimaan': 1750000.5, 'jumlah_sts': 4}
+
+    assert redis_cache.put(key, metrics)
+    assert redis_cache.get(key) == metrics
+
+
+def test_missing_key(redis_cache):
+    assert redis_cache.get('summary:missing') is MISSING
+    assert redis_cache.get('summary:missing', None) is None
+
+
+def test_keys_carry_prefix_and_version(redis_cache, client):
+    redis_cache.put('summary:abc', [1, 2])
+
+    assert client.keys() == [b'test:v1:summary:abc']
+
+
+def test_other_version_is_not_read(redis_cache, client):
+    redis_cache.put('summary:abc', [1, 2])
+    newer = RedisCache(client, prefix='test:', ttl=60, version='v2')
+
+    assert newer.get('summary:abc') is MISSING
+
+
+def test_ttl_is_set(redis_cache, client):
+    redis_cache.put('summary:abc', [1])
+
+    assert 0 < client.ttl('test:v1:summary:abc') <= 60
+
+
+def test_ttl_expiry(client):
+    short = RedisCache(client, prefix='test:', ttl=1, version='v1')
+    short.put('summary:abc', [1])
+
+    time.sleep(1.1)
+
+    assert short.get('summary:abc') is MISSING
+
+
+def test_ttl_zero_never_expires(client):
+    forever = RedisCache(client, prefix='test:', ttl=0, version='v1')
+    forever.put('summary:abc', [1])
+
+    assert client.ttl('test:v1:summary:abc') == -1
+
+
+def test_unencodable_value_is_skipped(redis_cache, client):
+    assert not redis_cache.put('summary:abc', object())
+    assert client.keys() == []
+
+
+def test_value_over_limit_is_skipped(redis_cache, client, monkeypatch):
+    monkeypatch.setattr(cache, 'REDIS_MAX_VALUE_BYTES', 16)
+
+    assert not redis_cache.put('summary:abc', list(range(100)))
+    assert client.keys() == []
+
+
+def test_namespace_filtering(redis_cache):
+    assert redis_cache.accepts('summary:abc')
+    assert not redis_cache.accepts('filter:abc')
+    assert not redis_cache.accepts('detail:abc')
+    assert not redis_cache.accepts('render:abc')
+
+
+def test_result_cache_keeps_only_shared_namespaces(redis_cache, client):
+    results = ResultCache([MemoryCache(1024 * 1024), redis_cache])
+
+    results.get_or_compute('summary:abc', lambda: [1, 2])
+    results.get_or_compute('filter:abc', lambda: [3, 4])
+    results.get_or_compute('detail:abc', lambda: [5, 6])
+
+    assert client.keys() == [b'test:v1:summary:abc']
+
+
+def test_result_cache_reads_redis_before_computing(client):
+    first = ResultCache([MemoryCache(1024 * 1024), RedisCache(client, prefix='test:', version='v1')])
+    second = ResultCache([MemoryCache(1024 * 1024), RedisCache(client, prefix='test:', version='v1')])
+
+    first.get_or_compute('summary:abc', lambda: {'jumlah': 3})
+    value = second.get_or_compute('summary:abc', lambda: pytest.fail('computed despite a Redis hit'))
+
+    assert value == {'jumlah': 3}
+    assert second.stats()['computed'] == 0
+    assert second.stats()['tiers'][1]['hits'] == 1
+
+
+def test_clear_removes_every_version(client):
+    RedisCache(client, prefix='test:', version='v1').put('summary:abc', [1])
+    RedisCache(client, prefix='test:', version='v2').put('summary:abc', [2])
+    client.set('other:key', b'x')
+
+    RedisCache(client, prefix='test:', version='v2').clear()
+
+    assert client.keys() == [b'other:key']
+
+
+def test_fallback_when_redis_is_down(redis_cache, server):
+    redis_cache.put('summary:abc', [1])
+    server.connected = False
+
+    assert redis_cache.get('summary:abc') is MISSING
+    assert not redis_cache.put('summary:def', [2])
+
+    stats = redis_cache.stats()
+    assert stats['errors'] == 1
+    assert not stats['available']
+
+
+def test_redis_skipped_until_retry(redis_cache, server):
+    server.connected = False
+    redis_cache.get('summary:abc')
+    server.connected = True
+
+    # Within the retry window Redis is not asked, even though it is back
+    assert redis_cache.get('summary:abc') is MISSING
+    assert not redis_cache.put('summary:abc', [1])
+
+    # Once the window has passed it is used again
+    redis_cache._retry_at = 0.0
+    assert redis_cache.put('summary:abc', [1])
+    assert redis_cache.get('summary:abc') == [1]
+
+
+def test_result_cache_computes_when_redis_is_down(redis_cache, server):
+    results = ResultCache([MemoryCache(1024 * 1024), redis_cache])
+    server.connected = False
+
+    assert results.get_or_compute('summary:abc', lambda: [1, 2]) == [1, 2]
+    assert results.get_or_compute('summary:abc', lambda: pytest.fail('not cached in memory')) == [1, 2]
+    assert results.stats()['computed'] == 1
@@ -0,0 +1,111 @@
+"""
+Tests for the tier chain of the result cache
+
+Usage:
+    python -m pytest tests
+"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.cache import MemoryCache, ResultCache
+
+
+def compute_concurrently(results: ResultCache, key: str, threads: int = 8):
+    """Run get_or_compute for key from several threads, all arriving while the first computes"""
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return [1, 2]
+
+    values = []
+
+    def worker():
+        values.append(results.get_or_compute(key, compute))
+
+    first = threading.Thread(target=worker)
+    first.start()
+    started.wait(5)
+    others = [threading.Thread(target=worker) for _ in range(threads - 1)]
+    for thread in others:
+        thread.start()
+    # Let the waiters block on the lookup in progress before it finishes
+    time.sleep(0.05)
+    release.set()
+    for thread in [first] + others:
+        thread.join(5)
+
+    return calls, values
+
+
+def test_concurrent_misses_compute_once():
+    results = ResultCache([MemoryCache(1024 * 1024)])
+
+    calls, values = compute_concurrently(results, 'summary:abc')
+
+    assert len(calls) == 1
+    assert values == [[1, 2]] * 8
+    assert results.stats()['computed'] == 1
+    assert results.stats()['shared'] == 7
+
+
+def test_concurrent_misses_compute_once_without_tiers():
+    results = ResultCache([])
+
+    calls, values = compute_concurrently(results, 'summary:abc')
+
+    assert len(calls) == 1
+    assert values == [[1, 2]] * 8
+
+
+def test_later_arrival_reads_the_first_tier():
+    results = ResultCache([MemoryCache(1024 * 1024)])
+    compute_concurrently(results, 'summary:abc')
+
+    value = results.get_or_compute('summary:abc', lambda: pytest.fail('computed again'))
+
+    assert value == [1, 2]
+    assert results.stats()['tiers'][0]['hits'] == 1
+
+
+def test_error_reaches_every_waiter_and_is_not_cached():
+    results = ResultCache([MemoryCache(1024 * 1024)])
+    started = threading.Event()
+    release = threading.Event()
+    errors = []
+
+    def compute():
+        started.set()
+        release.wait(5)
+        raise ValueError('gagal')
+
+    def worker():
+        try:
+            results.get_or_compute('summary:abc', compute)
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker)]
+    threads[0].start()
+    started.wait(5)
+    threads += [threading.Thread(target=worker) for _ in range(3)]
+    for thread in threads[1:]:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(errors) == 4
+    assert results.get_or_compute('summary:abc', lambda: [3]) == [3]
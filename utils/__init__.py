@@ -2,12 +2,16 @@
 Utility functions package
 """
 
-from .formatters import format_rupiah, format_rupiah_short, format_number
+from .formatters import (
+    format_rupiah, format_rupiah_short, format_number, format_percentage,
+    format_rupiah_column, format_rupiah_short_column, format_number_column, format_percentage_column
+)
 from .auth import authenticate_user, is_authenticated, hash_password
 from .data_service import DataService
 
 __all__ = [
-    'format_rupiah', 'format_rupiah_short', 'format_number',
+    'format_rupiah', 'format_rupiah_short', 'format_number', 'format_percentage',
+    'format_rupiah_column', 'format_rupiah_short_column', 'format_number_column', 'format_percentage_column',
     'authenticate_user', 'is_authenticated', 'hash_password',
     'DataService'
 ]
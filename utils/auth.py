@@ -42,15 +42,12 @@ def authenticate_user(username: str, password: str) -> tuple:
     """
     try:
         from database.connection import get_db_session
-        from database.schema import User
+        from database.queries import USER_BY_USERNAME
 
         session = get_db_session()
 
         try:
-            user = session.query(User).filter_by(
-                username=username,
-                is_active=True
-            ).first()
+            user = session.scalars(USER_BY_USERNAME, {'username': username}).first()
 
             if user and verify_password(password, user.password_hash):
                 # Update last login
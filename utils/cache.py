@@ -0,0 +1,823 @@
+"""
+Result Cache - cache tiers for computed results
+
+Filter results, aggregates and rendered components are cached in memory
+under one byte budget per worker (RESULT_CACHE_MB). When an insert would
+exceed it, entries are evicted by the configured policy:
+
+- lru: least recently used first
+- cost: GreedyDual-Size; entries that were cheap to compute per byte
+  go first, so a small aggregate that took seconds outlives a large
+  frame that took milliseconds
+
+Keys carry the data version of their inputs, so entries of reloaded data
+are never served and age out under the policy.
+
+Aggregates missing in memory are looked up in slower tiers before they are
+recomputed: on disk (RESULT_DISK_CACHE_MB), shared by the workers of a host
+and kept across restarts, then in Redis (REDIS_URL), shared by every
+instance. Each tier is a CacheBackend; ResultCache chains them. Those tiers
+outlive the code that filled them, so their keys also carry cache_version(),
+which changes with the application version, the value format and the
+source of the modules computing cached results.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import (
+    APP_VERSION, RESULT_CACHE_MB, RESULT_CACHE_POLICY, RESULT_DISK_CACHE_MB, RESULT_DISK_CACHE_DIR,
+    REDIS_URL, REDIS_CACHE_PREFIX, REDIS_CACHE_TTL, REDIS_SOCKET_TIMEOUT
+)
+from utils.metrics import record_cache, record_eviction
+
+POLICIES = ('lru', 'cost')
+
+# Returned by get for a missing key (None is a valid cached value)
+MISSING = object()
+
+# Python object overhead counted for containers and scalars
+OBJECT_OVERHEAD = 64
+
+# Key namespaces kept outside the process (disk, Redis): DataService aggregates
+SHARED_NAMESPACES = ('summary',)
+
+# Version of the encode_value format, part of cache_version()
+CACHE_FORMAT_VERSION = 1
+# Modules whose source shapes cached results (relative to the project root)
+VERSIONED_SOURCES = (
+    'config.py', 'utils/cache.py', 'utils/data_service.py', 'utils/duckdb_service.py',
+    'utils/formatters.py', 'utils/kalender.py', 'database/queries.py',
+)
+
+DISK_SUFFIX = '.bin'
+# Pruning removes the least recently used files down to this share of the budget
+DISK_PRUNE_TARGET = 0.8
+
+# Largest encoded value written to Redis
+REDIS_MAX_VALUE_BYTES = 8 * 1024 * 1024
+# Seconds Redis is skipped after a connection error
+REDIS_RETRY_SECONDS = 30
+
+# Format tags of encode_value
+FRAME_TAG = b'A'  # Arrow IPC stream, zstd compressed
+JSON_TAG = b'J'
+
+
+def estimate_size(value) -> int:
+    """
+    Estimate the memory held by a cached value in bytes
+
+    DataFrames and Series are measured with memory_usage(deep=True).
+    Plotly figures and Dash components are measured by their JSON
+    encoding, which is what they cost to keep and to send.
+
+    Args:
+        value: Value to measure
+
+    Returns:
+        Estimated size in bytes
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if hasattr(value, 'to_plotly_json'):
+        from plotly.io.json import to_json_plotly
+        return len(to_json_plotly(value))
+    if isinstance(value, dict):
+        return OBJECT_OVERHEAD + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return OBJECT_OVERHEAD + sum(estimate_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+def _json_scalar(value):
+    if hasattr(value, 'item'):  # numpy scalar
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def encode_value(value) -> Optional[bytes]:
+    """
+    Serialize a result for a cache tier outside the process
+
+    DataFrames are written as a zstd compressed Arrow IPC stream with their
+    index and dtypes; other values as JSON, numpy scalars as Python numbers.
+
+    Returns:
+        Tagged bytes, or None when the value has neither form
+    """
+    if isinstance(value, pd.DataFrame):
+        import pyarrow as pa
+
+        try:
+            table = pa.Table.from_pandas(value, preserve_index=True)
+        except (pa.ArrowException, TypeError, ValueError):
+            return None
+        sink = pa.BufferOutputStream()
+        options = pa.ipc.IpcWriteOptions(compression='zstd')
+        with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+            writer.write_table(table)
+        return FRAME_TAG + sink.getvalue().to_pybytes()
+
+    try:
+        return JSON_TAG + json.dumps(value, default=_json_scalar).encode('utf-8')
+    except (TypeError, ValueError):
+        return None
+
+
+def decode_value(data: bytes):
+    """Inverse of encode_value"""
+    tag, body = data[:1], data[1:]
+    if tag == FRAME_TAG:
+        import pyarrow as pa
+        return pa.ipc.open_stream(body).read_all().to_pandas()
+    if tag == JSON_TAG:
+        return json.loads(body)
+    raise ValueError(f"Unknown cache value format: {tag!r}")
+
+
+_cache_version = None
+
+
+def cache_version() -> str:
+    """
+    Version of cached results, for the tiers kept outside the process
+
+    Digest of APP_VERSION, CACHE_FORMAT_VERSION and the source of
+    VERSIONED_SOURCES, so a deploy that changes how results are computed
+    or encoded never reads results of the previous code.
+    """
+    global _cache_version
+    if _cache_version is None:
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        digest = hashlib.sha1(f"{APP_VERSION}:{CACHE_FORMAT_VERSION}".encode('utf-8'))
+        for source in VERSIONED_SOURCES:
+            try:
+                with open(os.path.join(root, source), 'rb') as f:
+                    digest.update(f.read())
+            except OSError:
+                digest.update(source.encode('utf-8'))
+        _cache_version = digest.hexdigest()[:12]
+    return _cache_version
+
+
+def make_key(namespace: str, *parts) -> str:
+    """
+    Build a cache key from a namespace and JSON-serializable parts
+
+    Returns:
+        'namespace:digest', stable across processes
+    """
+    encoded = json.dumps(parts, sort_keys=True, default=str, separators=(',', ':'))
+    return f"{namespace}:{hashlib.sha1(encoded.encode('utf-8')).hexdigest()[:24]}"
+
+
+class CacheBackend:
+    """
+    Storage of one cache tier
+
+    Backends store and return values; ResultCache decides which tier is
+    asked when and counts hits. Keys are 'namespace:digest' from make_key.
+    """
+
+    name = 'backend'
+
+    def __init__(self, namespaces: Optional[tuple] = None):
+        """
+        Args:
+            namespaces: Key namespaces this tier keeps (None for all)
+        """
+        self.namespaces = namespaces
+
+    def accepts(self, key: str) -> bool:
+        """Check if this tier keeps keys of this namespace"""
+        return self.namespaces is None or key.split(':', 1)[0] in self.namespaces
+
+    def get(self, key: str, default=MISSING):
+        """Return the cached value, or default when the key is missing"""
+        raise NotImplementedError
+
+    def put(self, key: str, value, cost: float = 0.0) -> bool:
+        """
+        Store a value
+
+        Args:
+            key: Cache key
+            value: Value to cache; treat it as read-only once cached
+            cost: Seconds it took to compute or fetch
+
+        Returns:
+            False when the value was not stored
+        """
+        raise NotImplementedError
+
+    def clear(self):
+        """Remove all entries"""
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        """Sizes and counters of this tier"""
+        raise NotImplementedError
+
+
+class _Entry:
+    __slots__ = ('value', 'size', 'cost', 'priority')
+
+    def __init__(self, value, size: int, cost: float):
+        self.value = value
+        self.size = size
+        self.cost = cost
+        self.priority = 0.0
+
+
+class MemoryCache(CacheBackend):
+    """In-process cache bounded by the estimated bytes of its values"""
+
+    name = 'memory'
+
+    def __init__(self, max_bytes: int, policy: str = 'lru'):
+        """
+        Args:
+            max_bytes: Budget for the estimated size of all values
+            policy: Eviction policy, 'lru' or 'cost'
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown cache policy: {policy} (expected one of {', '.join(POLICIES)})")
+
+        super().__init__()
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self._entries = OrderedDict()  # {key: _Entry}, least recently used first
+        self._bytes = 0
+        self._clock = 0.0  # GreedyDual-Size inflation value
+        self._lock = threading.Lock()
+        self._evictions = 0
+        self._rejected = 0
+
+    def _priority(self, entry: _Entry) -> float:
+        return self._clock + entry.cost / max(entry.size, 1)
+
+    def get(self, key: str, default=MISSING):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            self._entries.move_to_end(key)
+            entry.priority = self._priority(entry)
+            return entry.value
+
+    def put(self, key: str, value, cost: float = 0.0, size: Optional[int] = None) -> bool:
+        """
+        Cache a value, evicting others until it fits the budget
+
+        Args:
+            key: Cache key
+            value: Value to cache; treat it as read-only once cached
+            cost: Seconds it took to compute (used by the cost policy)
+            size: Size in bytes (default: estimate_size(value))
+
+        Returns:
+            False when the value is larger than the whole budget and was
+            not cached
+        """
+        size = estimate_size(value) if size is None else size
+
+        with self._lock:
+            self._remove(key)
+            if size > self.max_bytes:
+                self._rejected += 1
+                return False
+
+            while self._bytes + size > self.max_bytes and self._entries:
+                self._evict()
+
+            entry = _Entry(value, size, cost)
+            entry.priority = self._priority(entry)
+            self._entries[key] = entry
+            self._bytes += size
+            return True
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def _evict(self):
+        if self.policy == 'lru':
+            key = next(iter(self._entries))
+        else:
+            key = min(self._entries, key=lambda k: self._entries[k].priority)
+            self._clock = self._entries[key].priority
+        self._remove(key)
+        self._evictions += 1
+        record_eviction(key.split(':', 1)[0])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._clock = 0.0
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            Dictionary with policy, entries, bytes, max_bytes, evictions,
+            rejected and entries and bytes per key namespace
+        """
+        with self._lock:
+            namespaces = {}
+            for key, entry in self._entries.items():
+                namespace = namespaces.setdefault(key.split(':', 1)[0], {'entries': 0, 'bytes': 0})
+                namespace['entries'] += 1
+                namespace['bytes'] += entry.size
+
+            return {
+                'policy': self.policy,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'evictions': self._evictions,
+                'rejected': self._rejected,
+                'namespaces': namespaces,
+            }
+
+
+class DiskCache(CacheBackend):
+    """
+    Result cache in files, shared by the workers of a host and kept across restarts
+
+    Each value is one file named after its key, which holds the data version
+    of its inputs, and the cache version, so files of older data or older
+    code are never read and only wait to be pruned. Files are written under
+    a temporary name and renamed into place, so readers never see a partial
+    file. Beyond max_bytes the least recently used files are removed.
+    """
+
+    name = 'disk'
+
+    def __init__(self, directory: str, max_bytes: int, namespaces: tuple = SHARED_NAMESPACES,
+                 version: Optional[str] = None):
+        """
+        Args:
+            directory: Directory of the cache files, created if missing
+            max_bytes: Budget for the size of all files
+            namespaces: Key namespaces kept on disk
+            version: Version in every file name (default: cache_version())
+        """
+        import pyarrow  # noqa: F401 - DataFrames are stored as Arrow IPC
+
+        super().__init__(namespaces)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.version = version or cache_version()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._pruned = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._bytes = sum(size for _, size, _ in self._files())
+
+    def _path(self, key: str) -> str:
+        namespace, digest = key.split(':', 1)
+        return os.path.join(self.directory, f"{namespace}-{self.version}-{digest}{DISK_SUFFIX}")
+
+    def _files(self) -> list:
+        """[(path, size, last use)] of the cache files, including leftovers of failed writes"""
+        files = []
+        for entry in os.scandir(self.directory):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:  # removed by another worker
+                continue
+            files.append((entry.path, stat.st_size, stat.st_mtime))
+        return files
+
+    def get(self, key: str, default=MISSING):
+        """Read a cached value; unreadable files are removed and count as missing"""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = decode_value(f.read())
+        except FileNotFoundError:
+            return default
+        except Exception as e:
+            print(f"Cache disk tidak terbaca, dihapus: {path} ({e})")
+            self._discard(path)
+            return default
+
+        try:
+            os.utime(path)  # last use, for pruning
+        except OSError:
+            pass
+        return value
+
+    def put(self, key: str, value, cost: float = 0.0) -> bool:
+        """
+        Write a value, pruning old files when over the budget
+
+        Returns:
+            False when the value was not written: it cannot be encoded, it
+            exceeds the budget or the write failed
+        """
+        data = encode_value(value)
+        if data is None or len(data) > self.max_bytes:
+            return False
+
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Cache disk gagal ditulis: {path} ({e})")
+            self._discard(tmp_path)
+            return False
+
+        with self._lock:
+            self._writes += 1
+            self._bytes += len(data)
+            if self._bytes > self.max_bytes:
+                self._prune()
+        return True
+
+    def _discard(self, path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _prune(self):
+        """Remove the least recently used files down to DISK_PRUNE_TARGET of the budget"""
+        files = sorted(self._files(), key=lambda file: file[2])
+        total = sum(size for _, size, _ in files)
+        target = self.max_bytes * DISK_PRUNE_TARGET
+
+        for path, size, _ in files:
+            if total <= target:
+                break
+            self._discard(path)
+            total -= size
+            self._pruned += 1
+
+        # Other workers write to the same directory; resynchronize
+        self._bytes = total
+
+    def clear(self):
+        with self._lock:
+            for path, _, _ in self._files():
+                self._discard(path)
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            Dictionary with directory, version, bytes (as last seen by this
+            process), max_bytes, writes and pruned files
+        """
+        with self._lock:
+            return {
+                'directory': self.directory,
+                'version': self.version,
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'writes': self._writes,
+                'pruned': self._pruned,
+            }
+
+
+class RedisCache(CacheBackend):
+    """
+    Result cache in Redis, shared by every instance of the dashboard
+
+    The client (redis.Redis or compatible) is passed in, so connection
+    settings stay with the caller. Keys are prefix, cache version and key,
+    so instances running other code never share values. Values are encoded
+    as for the disk tier and expire after ttl seconds; the server's
+    maxmemory policy bounds the total. While Redis is unreachable, lookups miss and writes are skipped
+    for REDIS_RETRY_SECONDS, so the dashboard keeps running on its local
+    tiers.
+    """
+
+    name = 'redis'
+
+    def __init__(self, client, prefix: str = 'sts:', ttl: int = 3600,
+                 namespaces: tuple = SHARED_NAMESPACES, version: Optional[str] = None):
+        """
+        Args:
+            client: Redis client with get, set, scan_iter and delete
+            prefix: Prefix of every key, to share a Redis database
+            ttl: Seconds a value is kept (0 for no expiry)
+            namespaces: Key namespaces kept in Redis
+            version: Version in every key (default: cache_version())
+        """
+        super().__init__(namespaces)
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+        self.version = version or cache_version()
+        self._lock = threading.Lock()
+        self._retry_at = 0.0
+        self._writes = 0
+        self._errors = 0
+
+    def _available(self) -> bool:
+        return time.monotonic() >= self._retry_at
+
+    def _failed(self, error: Exception):
+        with self._lock:
+            if self._available():
+                print(f"Cache Redis tidak dapat dihubungi ({error}), dicoba lagi dalam {REDIS_RETRY_SECONDS} s")
+            self._retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+            self._errors += 1
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}{self.version}:{key}"
+
+    def get(self, key: str, default=MISSING):
+        if not self._available():
+            return default
+        try:
+            data = self.client.get(self._key(key))
+        except Exception as e:
+            self._failed(e)
+            return default
+        if data is None:
+            return default
+
+        try:
+            return decode_value(data)
+        except Exception as e:
+            print(f"Cache Redis tidak terbaca: {key} ({e})")
+            return default
+
+    def put(self, key: str, value, cost: float = 0.0) -> bool:
+        """
+        Returns:
+            False when the value was not written: Redis is unreachable, the
+            value cannot be encoded or exceeds REDIS_MAX_VALUE_BYTES
+        """
+        if not self._available():
+            return False
+        data = encode_value(value)
+        if data is None or len(data) > REDIS_MAX_VALUE_BYTES:
+            return False
+
+        try:
+            self.client.set(self._key(key), data, ex=self.ttl or None)
+        except Exception as e:
+            self._failed(e)
+            return False
+
+        with self._lock:
+            self._writes += 1
+        return True
+
+    def clear(self):
+        """Remove the keys under this prefix, of every version"""
+        try:
+            keys = list(self.client.scan_iter(match=self.prefix + '*'))
+            if keys:
+                self.client.delete(*keys)
+        except Exception as e:
+            self._failed(e)
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            Dictionary with prefix, version, ttl, writes, errors and
+            whether Redis is currently used
+        """
+        with self._lock:
+            return {
+                'prefix': self.prefix,
+                'version': self.version,
+                'ttl': self.ttl,
+                'writes': self._writes,
+                'errors': self._errors,
+                'available': self._available(),
+            }
+
+
+class _Pending:
+    """Result of a lookup in progress, awaited by concurrent misses on its key"""
+
+    def __init__(self):
+        self._done = threading.Event()
+        self._value = None
+        self._error = None
+
+    def set(self, value):
+        self._value = value
+        self._done.set()
+
+    def fail(self, error: BaseException):
+        self._error = error
+        self._done.set()
+
+    def result(self):
+        """Wait for the lookup and return its value, raising its error"""
+        self._done.wait()
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+
+class ResultCache:
+    """Cache tiers in front of a computation, fastest first"""
+
+    def __init__(self, backends: List[CacheBackend]):
+        """
+        Args:
+            backends: Tiers asked in order, usually a MemoryCache first;
+                may be empty when every tier is disabled
+        """
+        self.backends = backends
+        self._lock = threading.Lock()
+        self._pending = {}  # {key: _Pending} so concurrent misses look up once
+        self._hits = [0] * len(backends)
+        self._shared = 0
+        self._computed = 0
+
+    def get_or_compute(self, key: str, compute: Callable):
+        """
+        Return the cached value for key, computing and caching it on a miss
+
+        The tiers are asked in order; a value found in a slower tier, or
+        computed, is stored in every faster tier that keeps its namespace.
+        Concurrent misses on the same key wait for the first one and share
+        its value, whether or not a tier keeps the key; an error of that
+        lookup is raised in each of them. Hits (including shared values)
+        and misses are counted per key namespace, and per tier name for the
+        slower tiers, in the metrics.
+
+        Args:
+            key: Cache key from make_key
+            compute: Function without arguments producing the value
+        """
+        namespace = key.split(':', 1)[0]
+
+        value = self._get_first(key)
+        if value is not MISSING:
+            record_cache(namespace, hit=True)
+            return value
+
+        with self._lock:
+            pending = self._pending.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._pending[key] = _Pending()
+
+        if not owner:
+            value = pending.result()
+            with self._lock:
+                self._shared += 1
+            record_cache(namespace, hit=True)
+            return value
+
+        try:
+            # A lookup that finished just before this one registered has
+            # already filled the first tier
+            value = self._get_first(key)
+            if value is not MISSING:
+                record_cache(namespace, hit=True)
+            else:
+                record_cache(namespace, hit=False)
+                value = self._lookup(key, compute)
+            pending.set(value)
+            return value
+        except BaseException as e:
+            pending.fail(e)
+            raise
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def _get_first(self, key: str):
+        """Value of the first tier, MISSING when there is none or it does not keep the key"""
+        if not self.backends or not self.backends[0].accepts(key):
+            return MISSING
+        value = self.backends[0].get(key)
+        if value is not MISSING:
+            self._count_hit(0)
+        return value
+
+    def _lookup(self, key: str, compute: Callable):
+        """Ask the slower tiers, then compute, filling the faster tiers"""
+        start = time.perf_counter()
+        for level, backend in enumerate(self.backends[1:], start=1):
+            if not backend.accepts(key):
+                continue
+            value = backend.get(key)
+            record_cache(backend.name, hit=value is not MISSING)
+            if value is not MISSING:
+                self._count_hit(level)
+                self._fill(key, value, level, time.perf_counter() - start)
+                return value
+
+        value = compute()
+        with self._lock:
+            self._computed += 1
+        self._fill(key, value, len(self.backends), time.perf_counter() - start)
+        return value
+
+    def _count_hit(self, level: int):
+        with self._lock:
+            self._hits[level] += 1
+
+    def _fill(self, key: str, value, level: int, cost: float):
+        """Store a value in the tiers faster than level"""
+        for backend in self.backends[:level]:
+            if backend.accepts(key):
+                backend.put(key, value, cost=cost)
+
+    def clear(self):
+        """Remove all entries from every tier"""
+        for backend in self.backends:
+            backend.clear()
+
+    def stats(self) -> dict:
+        """
+        Sizes and counters of the tiers
+
+        Returns:
+            Dictionary with computed (misses in every tier), shared
+            (values awaited from a concurrent lookup) and per tier its
+            name, hits and stats
+        """
+        with self._lock:
+            hits = list(self._hits)
+            shared = self._shared
+            computed = self._computed
+
+        return {
+            'computed': computed,
+            'shared': shared,
+            'tiers': [
+                dict(name=backend.name, hits=tier_hits, **backend.stats())
+                for backend, tier_hits in zip(self.backends, hits)
+            ],
+        }
+
+
+def _redis_cache() -> Optional[RedisCache]:
+    """Redis tier from REDIS_URL, None when it is not configured or the client is missing"""
+    if not REDIS_URL:
+        return None
+    try:
+        import redis
+    except ImportError as e:
+        print(f"Cache Redis tidak tersedia ({e}), pip install redis")
+        return None
+
+    client = redis.Redis.from_url(
+        REDIS_URL,
+        socket_timeout=REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=REDIS_SOCKET_TIMEOUT
+    )
+    return RedisCache(client, prefix=REDIS_CACHE_PREFIX, ttl=REDIS_CACHE_TTL)
+
+
+# Singleton instance
+_result_cache = None
+
+
+def get_result_cache() -> ResultCache:
+    """
+    Get the result cache of this process
+
+    Memory of RESULT_CACHE_MB when that is not 0, then disk of
+    RESULT_DISK_CACHE_MB when that is enabled and pyarrow is installed,
+    then Redis when REDIS_URL is set.
+    """
+    global _result_cache
+    if _result_cache is None:
+        from utils.diagnostics import register_cache
+
+        backends = []
+        if RESULT_CACHE_MB > 0:
+            backends.append(MemoryCache(RESULT_CACHE_MB * 1024 * 1024, RESULT_CACHE_POLICY))
+        if RESULT_DISK_CACHE_MB > 0:
+            try:
+                backends.append(DiskCache(RESULT_DISK_CACHE_DIR, RESULT_DISK_CACHE_MB * 1024 * 1024))
+            except (ImportError, OSError) as e:
+                print(f"Cache disk tidak tersedia ({e}), tanpa tier disk")
+        redis_cache = _redis_cache()
+        if redis_cache is not None:
+            backends.append(redis_cache)
+
+        _result_cache = ResultCache(backends)
+        register_cache('results', _result_cache.stats)
+    return _result_cache
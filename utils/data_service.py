@@ -2,7 +2,9 @@
 Data Service - Database queries and data processing
 """
 
+import time
 import pandas as pd
+from pandas.api.types import union_categoricals
 from datetime import datetime, timedelta
 from sqlalchemy import func, and_, or_, extract
 from typing import Optional, List, Tuple
@@ -11,110 +13,418 @@ import sys
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from config import PAYMENT_TYPES, MONTH_NAMES, MONTH_NAMES_SHORT
+from config import (
+    PAYMENT_TYPES, MONTH_NAMES, MONTH_NAMES_SHORT, NOMINAL_MINOR_UNITS,
+    DATA_BACKEND, SHARED_SNAPSHOT, METRICS_ENABLED
+)
+from utils.formatters import sen_to_rupiah
+from utils.metrics import record_cache, instrument_service
+from utils.cache import get_result_cache, make_key
+from utils import kalender
+from utils.loader import (
+    INT, FLOAT, DATETIME, CATEGORY, OBJECT,
+    load_typed_frame, apply_dtypes, peak_rss_mb
+)
+
+# Amount column held in memory: int64 sen or float64 Rupiah
+AMOUNT_COLUMN = 'nominal_sen' if NOMINAL_MINOR_UNITS else 'nominal'
+
+# Columns and types of a loaded year partition (order of DASHBOARD_PARTITION):
+# only what filters and aggregates use. Calendar attributes are looked up by
+# hari_key in utils.kalender
+PARTITION_DTYPES = {
+    'id': INT,
+    'kode_billing': OBJECT,
+    'tanggal_terima': DATETIME,
+    AMOUNT_COLUMN: INT if NOMINAL_MINOR_UNITS else FLOAT,
+    'jenis_pembayaran': INT,
+    'nama_opd': CATEGORY,
+    'nama_kasir': CATEGORY,
+    'nip_kasir': CATEGORY,
+    'hari_key': INT,
+    'jenis_pembayaran_nama': CATEGORY,
+}
+PARTITION_COLUMNS = list(PARTITION_DTYPES)
+
+# Display-only columns, fetched by id for the rows shown or exported
+# (order of DASHBOARD_DETAIL)
+DETAIL_DTYPES = {
+    'id': INT,
+    'tanggal_setor': DATETIME,
+    'tanggal_validasi_bank': DATETIME,
+    'keterangan_umum': OBJECT,
+    'keterangan_khusus': OBJECT,
+    'ayat': CATEGORY,
+    'kode_opd': CATEGORY,
+    'kode_rekening': CATEGORY,
+    'nama_rekening': CATEGORY,
+}
+DETAIL_COLUMNS = [column for column in DETAIL_DTYPES if column != 'id']
+
+# Maximum number of ids per IN (...) lookup of detail columns
+DETAIL_BATCH_SIZE = 900
+
+# Filter parameters of get_filtered_data after period_type (order of _filter_conditions)
+FILTER_CRITERIA = (
+    'selected_date', 'start_date', 'end_date', 'selected_week', 'selected_month',
+    'selected_year', 'selected_opd', 'selected_payment',
+)
+# Of these, given as ISO date strings
+FILTER_DATES = ('selected_date', 'start_date', 'end_date')
+
+# Methods get_filtered_summary may apply to the filtered data
+FILTERED_SUMMARIES = (
+    'get_summary_metrics', 'get_opd_summary', 'get_payment_summary', 'get_daily_trend',
+    'get_monthly_summary', 'get_bendahara_summary', 'get_transaction_detail',
+)
+# Of these, answered from the rekap_harian rollup instead of the partitions
+ROLLUP_SUMMARIES = ('get_opd_summary', 'get_payment_summary')
+# Of these, holding detail columns read by id, outside the partition versions
+# in the key; cached as 'detail', kept in this process only
+DETAIL_SUMMARIES = ('get_transaction_detail',)
 
 
 class DataService:
     """Service class for data operations"""
 
     def __init__(self):
-        self._cached_data = None
-        self._cache_time = None
+        # In-memory store partitioned by tahun: {year: DataFrame}
+        self._partitions = {}
+        self._partition_times = {}
+        self._load_stats = {}  # {year: rows, seconds, frame_mb, peak_rss_mb}
+        self._partition_versions = {}  # {year: content hash}, part of result cache keys
+        self._catalog = None
+        self._catalog_time = None
         self._cache_duration = 60  # seconds
 
+        # Partitions and catalog mapped from a snapshot shared across workers
+        self._shared = None
+        if SHARED_SNAPSHOT:
+            from utils.shared_snapshot import SharedSnapshot
+            self._shared = SharedSnapshot()
+        self._shared_version = None
+        self._publishing = False
+
     def _get_session(self):
-        """Get database session"""
-        from database.connection import get_db_session
-        return get_db_session()
+        """Get read-only database session"""
+        from database.connection import get_db_read_session
+        return get_db_read_session()
+
+    def _is_closed_year(self, year: int) -> bool:
+        """Closed years (fiscal year and grace period over) are immutable and never reloaded"""
+        return kalender.is_closed_year(year)
 
-    def _should_refresh_cache(self):
-        """Check if cache should be refreshed"""
-        if self._cached_data is None:
+    def _is_expired(self, loaded_at: Optional[datetime]) -> bool:
+        """Check if a cached entry is older than the cache duration"""
+        if loaded_at is None:
             return True
-        if self._cache_time is None:
+        return (datetime.now() - loaded_at).total_seconds() > self._cache_duration
+
+    def _should_refresh_partition(self, year: int) -> bool:
+        """Check if a year partition should be (re)loaded"""
+        if year not in self._partitions:
             return True
-        return (datetime.now() - self._cache_time).seconds > self._cache_duration
+        if self._is_closed_year(year):
+            return False
+        return self._is_expired(self._partition_times.get(year))
 
-    def get_all_transactions(self, use_cache: bool = True) -> pd.DataFrame:
+    def _get_catalog(self) -> pd.DataFrame:
         """
-        Get all transactions with related data
+        Get per-year row counts and date ranges of the read model
+
+        Returns:
+            DataFrame with columns ['tahun', 'minggu_tahun', 'min_tanggal', 'max_tanggal', 'jumlah']
+        """
+        if self._shared is not None and not self._publishing:
+            self._sync_shared_snapshot()
+            return self._catalog
+
+        if self._catalog is not None and not self._is_expired(self._catalog_time):
+            record_cache('catalog', hit=True)
+            return self._catalog
+
+        record_cache('catalog', hit=False)
+        session = self._get_session()
+
+        try:
+            from database.queries import DASHBOARD_CATALOG
+
+            catalog = pd.read_sql(DASHBOARD_CATALOG, session.bind)
+            catalog['min_tanggal'] = pd.to_datetime(catalog['min_tanggal'])
+            catalog['max_tanggal'] = pd.to_datetime(catalog['max_tanggal'])
+
+            # Archived years only contribute the catalog stored in their footer
+            from database.archive import list_archived_years, read_archive_catalog
+            archived = [read_archive_catalog(year) for year in list_archived_years()]
+            if archived:
+                catalog = pd.concat([catalog] + archived, ignore_index=True)
+
+            self._catalog = catalog
+            self._catalog_time = datetime.now()
+
+            return catalog
+
+        finally:
+            session.close()
+
+    def _sync_shared_snapshot(self, force: bool = False):
+        """Map the latest shared snapshot version, publishing a new one when it is due"""
+        version = self._shared.refresh(self._build_shared_snapshot, self._cache_duration, force=force)
+        record_cache('shared_snapshot', hit=version == self._shared_version)
+        if version == self._shared_version:
+            return
+
+        catalog, partitions = self._shared.open(version)
+        # Closed years keep their content across versions
+        versions = {
+            year: self._partition_versions[year]
+            if self._is_closed_year(year) and year in self._partition_versions
+            else self._partition_version(df)
+            for year, df in partitions.items()
+        }
+        now = datetime.now()
+        self._catalog = catalog
+        self._catalog_time = now
+        self._partitions = partitions
+        self._partition_versions = versions
+        self._partition_times = {year: now for year in partitions}
+        self._shared_version = version
+
+    def _build_shared_snapshot(self, previous: Optional[str]) -> Tuple[pd.DataFrame, dict]:
+        """
+        Load the catalog and all partitions for a new shared snapshot version
+
+        Closed years already in the previous version are returned as None
+        so their files are linked instead of reloaded.
+        """
+        mapped = (self._catalog, self._catalog_time)
+        self._publishing = True
+        try:
+            self._catalog_time = None  # query the catalog from the database
+            catalog = self._get_catalog()
+            reusable = set(self._shared.version_years(previous)) if previous else set()
+
+            partitions = {}
+            for year in self.get_available_years():
+                if year in reusable and self._is_closed_year(year):
+                    partitions[year] = None
+                else:
+                    partitions[year] = self._load_partition(year)
+
+            return catalog, partitions
+        finally:
+            # Keep serving the mapped version until the new one is mapped
+            self._catalog, self._catalog_time = mapped
+            self._publishing = False
+
+    def _load_partition(self, year: int) -> pd.DataFrame:
+        """
+        Load one year of transactions from the read model or its archive
 
         Args:
-            use_cache: Whether to use cached data
+            year: Value of tahun to load
 
         Returns:
-            DataFrame with all transactions
+            DataFrame with the transactions of that year
         """
-        if use_cache and not self._should_refresh_cache():
-            return self._cached_data.copy()
+        from database.archive import list_archived_years
+
+        start = time.perf_counter()
+
+        if year in list_archived_years():
+            df = self._load_archived_partition(year)
+        else:
+            df = self._load_database_partition(year)
+
+        stats = {
+            'rows': len(df),
+            'seconds': time.perf_counter() - start,
+            'frame_mb': df.memory_usage(deep=True).sum() / (1024 * 1024),
+            'peak_rss_mb': peak_rss_mb(),
+        }
+        self._load_stats[year] = stats
+
+        peak = f", peak RSS {stats['peak_rss_mb']:.0f} MB" if stats['peak_rss_mb'] is not None else ""
+        print(
+            f"Partisi {year}: {stats['rows']:,} baris dalam {stats['seconds']:.2f} s, "
+            f"frame {stats['frame_mb']:.1f} MB{peak}"
+        )
+
+        return df
+
+    @staticmethod
+    def _partition_version(df: pd.DataFrame) -> str:
+        """Content hash of a partition, equal in every process holding the same rows"""
+        return format(int(pd.util.hash_pandas_object(df, index=False).sum()), '016x')
+
+    def _load_database_partition(self, year: int) -> pd.DataFrame:
+        """
+        Stream one year of the read model into typed columns
+
+        The row count from the catalog sizes the column arrays up front,
+        so rows are converted chunk by chunk without an intermediate
+        untyped frame.
+        """
+        catalog = self._get_catalog()
+        expected_rows = int(catalog.loc[catalog['tahun'] == year, 'jumlah'].sum())
 
         session = self._get_session()
 
         try:
-            from database.schema import Transaksi, OPD, Bendahara, Rekening
-
-            query = session.query(
-                Transaksi.id,
-                Transaksi.kode_billing,
-                Transaksi.tanggal_terima,
-                Transaksi.tanggal_setor,
-                Transaksi.tanggal_validasi_bank,
-                Transaksi.nominal,
-                Transaksi.jenis_pembayaran,
-                Transaksi.keterangan_umum,
-                Transaksi.keterangan_khusus,
-                Transaksi.ayat,
-                OPD.kode_opd,
-                OPD.nama_opd,
-                Bendahara.nama.label('nama_kasir'),
-                Bendahara.nip.label('nip_kasir'),
-                Rekening.kode_rekening,
-                Rekening.nama_rekening
-            ).outerjoin(
-                OPD, Transaksi.opd_id == OPD.id
-            ).outerjoin(
-                Bendahara, Transaksi.bendahara_id == Bendahara.id
-            ).outerjoin(
-                Rekening, Transaksi.rekening_id == Rekening.id
+            from database.queries import DASHBOARD_PARTITION
+
+            # Read model: joins, calendar columns and BAPENDA flag precomputed at ingest
+            return load_typed_frame(
+                session.connection(),
+                DASHBOARD_PARTITION,
+                PARTITION_DTYPES,
+                params={'tahun': year},
+                expected_rows=expected_rows
             )
 
-            df = pd.read_sql(query.statement, session.bind)
+        finally:
+            session.close()
 
-            # Process data
-            df['tanggal_terima'] = pd.to_datetime(df['tanggal_terima'])
-            df['tanggal_setor'] = pd.to_datetime(df['tanggal_setor'])
-            df['tanggal_validasi_bank'] = pd.to_datetime(df['tanggal_validasi_bank'])
+    def _load_archived_partition(self, year: int) -> pd.DataFrame:
+        """Load one archived year from its memory-mapped Parquet file"""
+        from database.archive import read_archived_year, read_archived_columns
 
-            # Add calculated columns
-            df['tanggal'] = df['tanggal_terima'].dt.date
-            df['tahun'] = df['tanggal_terima'].dt.year
-            df['bulan'] = df['tanggal_terima'].dt.month
-            df['nama_bulan'] = df['bulan'].map(MONTH_NAMES)
-            df['minggu_tahun'] = df['tanggal_terima'].dt.isocalendar().week
-            df['hari'] = df['tanggal_terima'].dt.day_name()
-            df['jenis_pembayaran_nama'] = df['jenis_pembayaran'].map(PAYMENT_TYPES).fillna('Lainnya')
+        # Years archived before hari_key existed get their keys derived here
+        columns = [column for column in PARTITION_COLUMNS if column in read_archived_columns(year)]
+        df = read_archived_year(year, columns=columns + ['is_bapenda'])
+        df = df[~df['is_bapenda']].drop(columns=['is_bapenda']).reset_index(drop=True)
+        if 'hari_key' not in df.columns:
+            df['hari_key'] = kalender.day_keys(df['tanggal_terima'])
+        df = df[PARTITION_COLUMNS]
 
-            # Fill missing OPD names
-            df['nama_opd'] = df['nama_opd'].fillna('OPD Tidak Diketahui')
+        return apply_dtypes(df, PARTITION_DTYPES)
 
-            # Exclude BAPENDA from analysis
-            df = df[~df['nama_opd'].str.contains('Badan Pendapatan Daerah', case=False, na=False)]
+    def get_available_years(self) -> List[int]:
+        """Get list of years that have transactions"""
+        catalog = self._get_catalog()
+        return sorted(int(year) for year in catalog['tahun'].dropna().unique())
 
-            # Update cache
-            self._cached_data = df
-            self._cache_time = datetime.now()
+    def get_available_weeks(self) -> List[int]:
+        """Get list of week numbers that have transactions"""
+        catalog = self._get_catalog()
+        return sorted(int(week) for week in catalog['minggu_tahun'].dropna().unique())
 
-            return df.copy()
+    def years_for_filter(
+        self,
+        period_type: str = "Semua Data",
+        selected_date: Optional[datetime] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        selected_year: Optional[int] = None,
+        selected_week: Optional[int] = None
+    ) -> Optional[List[int]]:
+        """
+        Get the years a period filter can reach
 
-        finally:
-            session.close()
+        Mirrors the period conditions of filter_data.
+
+        Returns:
+            List of years, or None when the filter needs all years
+        """
+        if period_type == "Harian" and selected_date:
+            return [selected_date.year]
+
+        if period_type == "Mingguan" and selected_week and selected_year:
+            # An ISO week can start or end in the neighbouring calendar year
+            week = kalender.week_range(int(selected_year), int(selected_week))
+            return sorted({key // 10000 for key in week}) if week else []
+
+        if period_type in ("Bulanan", "Tahunan") and selected_year:
+            return [int(selected_year)]
+
+        if period_type == "Rentang Tanggal" and start_date and end_date:
+            return list(range(start_date.year, end_date.year + 1))
+
+        return None
+
+    def get_all_transactions(
+        self,
+        use_cache: bool = True,
+        years: Optional[List[int]] = None
+    ) -> pd.DataFrame:
+        """
+        Get all transactions with related data
+
+        Only the requested year partitions are loaded. Closed years stay
+        cached for the lifetime of the process; the current year is
+        reloaded after the cache duration. With SHARED_SNAPSHOT all
+        partitions come from the latest shared snapshot version instead.
+
+        Args:
+            use_cache: Whether to use cached data
+            years: Years to include (default: all years with data)
+
+        Returns:
+            DataFrame with all transactions
+        """
+        frames = list(self._current_partitions(years, use_cache).values())
+        return self._combine_partitions(frames)
+
+    def _current_partitions(self, years: Optional[List[int]] = None, use_cache: bool = True) -> dict:
+        """
+        Bring the requested year partitions up to date
+
+        Returns:
+            {year: DataFrame} of the requested years that have data
+        """
+        if self._shared is not None:
+            self._sync_shared_snapshot(force=not use_cache)
+
+        available = self.get_available_years()
+        if years is None:
+            years = available
+        else:
+            years = [year for year in years if year in available]
+
+        partitions = {}
+        for year in years:
+            if self._shared is None and (not use_cache or self._should_refresh_partition(year)):
+                record_cache('partition', hit=False)
+                df = self._load_partition(year)
+                self._partition_versions[year] = self._partition_version(df)
+                self._partitions[year] = df
+                self._partition_times[year] = datetime.now()
+            else:
+                record_cache('partition', hit=True)
+            partitions[year] = self._partitions[year]
+
+        return partitions
+
+    def _combine_partitions(self, frames: List[pd.DataFrame]) -> pd.DataFrame:
+        """One frame of the given partitions, never the cached frame itself"""
+        if not frames:
+            return self._empty_frame()
+        if len(frames) == 1:
+            return frames[0].copy()
+        return self._concat_partitions(frames)
+
+    def _concat_partitions(self, frames: List[pd.DataFrame]) -> pd.DataFrame:
+        """Concatenate partitions, merging categories instead of falling back to object"""
+        columns = {}
+        for col in frames[0].columns:
+            if isinstance(frames[0][col].dtype, pd.CategoricalDtype):
+                columns[col] = union_categoricals([df[col] for df in frames], ignore_order=True)
+            else:
+                columns[col] = pd.concat([df[col] for df in frames], ignore_index=True)
+        return pd.DataFrame(columns)
+
+    def _empty_frame(self) -> pd.DataFrame:
+        """Empty DataFrame with the columns of a loaded partition"""
+        for df in self._partitions.values():
+            return df.iloc[0:0].copy()
+        return pd.DataFrame(columns=PARTITION_COLUMNS)
 
     def get_date_range(self) -> Tuple[datetime, datetime]:
         """Get min and max dates from transactions"""
-        df = self.get_all_transactions()
-        if df.empty:
+        catalog = self._get_catalog()
+        if catalog.empty:
             return datetime.now(), datetime.now()
-        return df['tanggal_terima'].min(), df['tanggal_terima'].max()
+        return catalog['min_tanggal'].min(), catalog['max_tanggal'].max()
 
     def get_opd_list(self) -> List[str]:
         """Get list of all OPD names"""
@@ -145,49 +455,261 @@ class DataService:
         Returns:
             Tuple of (filtered DataFrame, period label)
         """
-        df_filtered = df.copy()
+        conditions, period_label = self._filter_conditions(
+            period_type, selected_date, start_date, end_date, selected_week,
+            selected_month, selected_year, selected_opd, selected_payment
+        )
+
+        # Conditions are combined first so the rows are copied once; a
+        # hari_key range bound alone keeps most of the frame
+        selected = self._condition_mask(df, conditions)
+        df_filtered = df.copy() if selected is None else df[selected]
+
+        return df_filtered, period_label
+
+    def _condition_mask(self, df: pd.DataFrame, conditions: list) -> Optional[pd.Series]:
+        """Boolean mask of the rows meeting all conditions, None without conditions"""
+        selected = None
+        for column, operator, value in conditions:
+            series = df[column]
+            if operator == 'in':
+                mask = series.isin(value)
+            elif operator == '>=':
+                mask = series >= value
+            elif operator == '<=':
+                mask = series <= value
+            else:
+                mask = series == value
+            selected = mask if selected is None else selected & mask
+        return selected
+
+    def _filter_criteria(self, filters: dict) -> dict:
+        """Parse dashboard filter parameters into filter_data keyword arguments"""
+        criteria = {name: filters[name] for name in FILTER_CRITERIA if filters.get(name) is not None}
+        for name in FILTER_DATES:
+            if criteria.get(name):
+                criteria[name] = pd.to_datetime(criteria[name]).date()
+        criteria['period_type'] = filters.get('period_type') or 'Semua Data'
+        return criteria
+
+    def _resolve_filters(self, filters: dict) -> Tuple[dict, List[pd.DataFrame], str]:
+        """
+        Parse dashboard filter parameters and bring their partitions up to date
+
+        Returns:
+            Tuple of (filter_data keyword arguments, partitions the filter
+            reaches, result cache key of the filtered data)
+        """
+        criteria = self._filter_criteria(filters)
+        partitions = self._current_partitions(self._criteria_years(criteria))
+
+        version = [[year, self._partition_versions.get(year)] for year in partitions]
+        return criteria, list(partitions.values()), self._criteria_key(criteria, version)
+
+    def _criteria_years(self, criteria: dict) -> Optional[List[int]]:
+        """Years parsed filter criteria can reach, None for all years"""
+        return self.years_for_filter(
+            criteria['period_type'],
+            selected_date=criteria.get('selected_date'),
+            start_date=criteria.get('start_date'),
+            end_date=criteria.get('end_date'),
+            selected_year=criteria.get('selected_year'),
+            selected_week=criteria.get('selected_week')
+        )
+
+    def _criteria_key(self, criteria: dict, version: list) -> str:
+        """
+        Result cache key of the data selected by parsed filter criteria
+
+        Keyed by the conditions, so inputs the period type ignores do not
+        matter; same data and conditions give the same key in every process.
+
+        Args:
+            criteria: filter_data keyword arguments from _filter_criteria
+            version: [[year, version of its data]] of the years reached
+        """
+        conditions, period_label = self._filter_conditions(
+            criteria['period_type'], *(criteria.get(name) for name in FILTER_CRITERIA)
+        )
+        conditions = [
+            [column, operator, sorted(value) if operator == 'in' else value]
+            for column, operator, value in conditions
+        ]
+        return make_key('filter', version, conditions, period_label)
+
+    def filter_key(self, filters: dict) -> str:
+        """
+        Result cache key of the data selected by dashboard filter parameters
+
+        Changes whenever a partition the filter reaches is reloaded with
+        different content, so results cached under it are never stale.
+        """
+        return self._resolve_filters(filters)[2]
+
+    def get_period_label(self, filters: dict) -> str:
+        """Period label of dashboard filter parameters, as returned by get_filtered_data"""
+        criteria = self._filter_criteria(filters)
+        return self._filter_conditions(
+            criteria['period_type'], *(criteria.get(name) for name in FILTER_CRITERIA)
+        )[1]
+
+    def get_filtered_data(self, filters: dict) -> Tuple[pd.DataFrame, str]:
+        """
+        Filter the transactions by dashboard filter parameters, cached
+
+        Args:
+            filters: filter_data keyword arguments, with dates as ISO
+                strings (JSON-serializable, as kept in the browser)
+
+        Returns:
+            Tuple of (filtered DataFrame, period label); the DataFrame is
+            shared with other requests and must not be modified
+        """
+        criteria, frames, key = self._resolve_filters(filters)
+
+        return get_result_cache().get_or_compute(
+            key, lambda: self.filter_data(self._combine_partitions(frames), **criteria)
+        )
+
+    def get_filtered_summary(self, filters: dict, summary: str, **kwargs):
+        """
+        Apply a summary method to the filtered data, cached
+
+        Summaries in ROLLUP_SUMMARIES are aggregated from the rekap_harian
+        rows of the filtered days instead, with the same result. The others
+        get the data from _summary_source.
+
+        Args:
+            filters: Filter parameters as for get_filtered_data
+            summary: Name of a method in FILTERED_SUMMARIES
+            **kwargs: Further arguments of the method (e.g. top_n)
+
+        Returns:
+            Result of the method; shared with other requests and must not
+            be modified
+        """
+        if summary not in FILTERED_SUMMARIES:
+            raise ValueError(f"Unknown summary: {summary}")
+
+        namespace = 'detail' if summary in DETAIL_SUMMARIES else 'summary'
+        key = make_key(namespace, self.filter_key(filters), summary, kwargs)
+        if summary in ROLLUP_SUMMARIES:
+            compute = lambda: getattr(self, f'{summary}_from_rollup')(self.get_filtered_rollup(filters), **kwargs)
+        else:
+            compute = lambda: getattr(self, summary)(self._summary_source(filters), **kwargs)
+
+        return get_result_cache().get_or_compute(key, compute)
+
+    def _summary_source(self, filters: dict) -> pd.DataFrame:
+        """Data get_filtered_summary applies a summary method to: the filtered frame"""
+        return self.get_filtered_data(filters)[0]
+
+    def _filter_conditions(
+        self,
+        period_type: str,
+        selected_date,
+        start_date,
+        end_date,
+        selected_week,
+        selected_month,
+        selected_year,
+        selected_opd,
+        selected_payment
+    ) -> Tuple[list, str]:
+        """
+        Translate filter criteria into conditions shared by all backends
+
+        Periods become ranges of hari_key, resolved through the calendar
+        dimension; weeks are ISO weeks of the selected ISO year.
+
+        Returns:
+            Tuple of ([(column, operator, value)], period label) with
+            operators '==', '>=', '<=' and 'in'
+        """
+        conditions = []
         period_label = "Semua Data"
 
         # Period filter
         if period_type == "Harian" and selected_date:
-            df_filtered = df_filtered[df_filtered['tanggal'] == selected_date]
+            conditions.append(('hari_key', '==', kalender.day_key(selected_date)))
             period_label = selected_date.strftime('%d %B %Y') if hasattr(selected_date, 'strftime') else str(selected_date)
 
         elif period_type == "Mingguan" and selected_week and selected_year:
-            df_filtered = df_filtered[
-                (df_filtered['minggu_tahun'] == selected_week) &
-                (df_filtered['tahun'] == selected_year)
-            ]
+            week = kalender.week_range(int(selected_year), int(selected_week))
+            if week:
+                conditions.append(('hari_key', '>=', week[0]))
+                conditions.append(('hari_key', '<=', week[1]))
+            else:
+                # Week 53 of a year with 52 ISO weeks: no day has key 0
+                conditions.append(('hari_key', '==', 0))
             period_label = f"Minggu ke-{selected_week}, {selected_year}"
 
         elif period_type == "Bulanan" and selected_month and selected_year:
-            df_filtered = df_filtered[
-                (df_filtered['bulan'] == selected_month) &
-                (df_filtered['tahun'] == selected_year)
-            ]
+            first, last = kalender.month_range(int(selected_year), int(selected_month))
+            conditions.append(('hari_key', '>=', first))
+            conditions.append(('hari_key', '<=', last))
             month_name = MONTH_NAMES.get(selected_month, str(selected_month))
             period_label = f"{month_name} {selected_year}"
 
         elif period_type == "Tahunan" and selected_year:
-            df_filtered = df_filtered[df_filtered['tahun'] == selected_year]
+            first, last = kalender.year_range(int(selected_year))
+            conditions.append(('hari_key', '>=', first))
+            conditions.append(('hari_key', '<=', last))
             period_label = f"Tahun {selected_year}"
 
         elif period_type == "Rentang Tanggal" and start_date and end_date:
-            df_filtered = df_filtered[
-                (df_filtered['tanggal'] >= start_date) &
-                (df_filtered['tanggal'] <= end_date)
-            ]
+            first, last = kalender.day_range(start_date, end_date)
+            conditions.append(('hari_key', '>=', first))
+            conditions.append(('hari_key', '<=', last))
             period_label = f"{start_date.strftime('%d/%m/%Y')} - {end_date.strftime('%d/%m/%Y')}"
 
         # OPD filter
         if selected_opd and 'Semua OPD' not in selected_opd:
-            df_filtered = df_filtered[df_filtered['nama_opd'].isin(selected_opd)]
+            conditions.append(('nama_opd', 'in', list(selected_opd)))
 
         # Payment type filter
         if selected_payment and selected_payment != 'Semua':
-            df_filtered = df_filtered[df_filtered['jenis_pembayaran_nama'] == selected_payment]
+            conditions.append(('jenis_pembayaran_nama', '==', selected_payment))
 
-        return df_filtered, period_label
+        return conditions, period_label
+
+    def _amount_column(self, df: pd.DataFrame) -> str:
+        """Amount column of a frame: int64 sen when present, else Rupiah"""
+        return 'nominal_sen' if 'nominal_sen' in df.columns else 'nominal'
+
+    def _to_rupiah(self, values, column: str):
+        """Convert amounts aggregated from column to Rupiah"""
+        if column == 'nominal_sen':
+            return sen_to_rupiah(values)
+        return values
+
+    def _aggregate(self, df: pd.DataFrame, keys: List[str], aggregations: dict) -> pd.DataFrame:
+        """
+        Group df by keys and aggregate (the backend extension point)
+
+        Args:
+            df: Source DataFrame
+            keys: Group-by columns; rows with a missing key are dropped.
+                An empty list aggregates the whole frame into one row.
+            aggregations: {output column: (input column, function)} with
+                functions 'sum', 'count', 'min', 'max', 'nunique' and
+                'mode' (most frequent value, 'N/A' if none)
+
+        Returns:
+            DataFrame with the key columns followed by the output columns;
+            only key values present in df, also for categorical keys
+        """
+        named = {
+            name: (column, _mode_or_na if function == 'mode' else function)
+            for name, (column, function) in aggregations.items()
+        }
+
+        if not keys:
+            return pd.DataFrame({
+                name: [df[column].agg(function)] for name, (column, function) in named.items()
+            })
+
+        return df.groupby(keys, observed=True).agg(**named).reset_index()
 
     def get_summary_metrics(self, df: pd.DataFrame) -> dict:
         """
@@ -196,13 +718,32 @@ class DataService:
         Returns:
             Dictionary with metric values
         """
+        if df.empty:
+            return {
+                'total_penerimaan': 0,
+                'jumlah_sts': 0,
+                'rata_rata': 0,
+                'jumlah_opd': 0,
+                'min_nominal': 0,
+                'max_nominal': 0,
+            }
+
+        col = self._amount_column(df)
+        metrics = self._aggregate(df, [], {
+            'total': (col, 'sum'),
+            'jumlah_opd': ('nama_opd', 'nunique'),
+            'minimum': (col, 'min'),
+            'maksimum': (col, 'max'),
+        })
+        total = metrics['total'].iloc[0]
+
         return {
-            'total_penerimaan': df['nominal'].sum() if not df.empty else 0,
+            'total_penerimaan': self._to_rupiah(total, col),
             'jumlah_sts': len(df),
-            'rata_rata': df['nominal'].mean() if not df.empty else 0,
-            'jumlah_opd': df['nama_opd'].nunique(),
-            'min_nominal': df['nominal'].min() if not df.empty else 0,
-            'max_nominal': df['nominal'].max() if not df.empty else 0,
+            'rata_rata': self._to_rupiah(total / len(df), col),
+            'jumlah_opd': metrics['jumlah_opd'].iloc[0],
+            'min_nominal': self._to_rupiah(metrics['minimum'].iloc[0], col),
+            'max_nominal': self._to_rupiah(metrics['maksimum'].iloc[0], col),
         }
 
     def get_opd_summary(self, df: pd.DataFrame, top_n: int = 15) -> pd.DataFrame:
@@ -219,11 +760,19 @@ class DataService:
         if df.empty:
             return pd.DataFrame()
 
-        summary = df.groupby('nama_opd').agg({
-            'nominal': ['sum', 'count', 'mean', 'min', 'max']
-        }).reset_index()
+        col = self._amount_column(df)
+        summary = self._aggregate(df, ['nama_opd'], {
+            'total': (col, 'sum'),
+            'jumlah': (col, 'count'),
+            'minimum': (col, 'min'),
+            'maksimum': (col, 'max'),
+        })
+
+        summary['rata_rata'] = summary['total'] / summary['jumlah']
+        for amount in ['total', 'rata_rata', 'minimum', 'maksimum']:
+            summary[amount] = self._to_rupiah(summary[amount], col)
 
-        summary.columns = ['nama_opd', 'total', 'jumlah', 'rata_rata', 'minimum', 'maksimum']
+        summary = summary[['nama_opd', 'total', 'jumlah', 'rata_rata', 'minimum', 'maksimum']]
         summary = summary.sort_values('total', ascending=False)
 
         if top_n:
@@ -240,11 +789,14 @@ class DataService:
         if df.empty:
             return pd.DataFrame()
 
-        summary = df.groupby('jenis_pembayaran_nama').agg({
-            'nominal': ['sum', 'count']
-        }).reset_index()
+        col = self._amount_column(df)
+        summary = self._aggregate(df, ['jenis_pembayaran_nama'], {
+            'total': (col, 'sum'),
+            'jumlah': (col, 'count'),
+        })
 
         summary.columns = ['jenis_pembayaran', 'total', 'jumlah']
+        summary['total'] = self._to_rupiah(summary['total'], col)
         summary['persentase'] = (summary['total'] / summary['total'].sum() * 100).round(2)
         summary = summary.sort_values('total', ascending=False)
 
@@ -260,12 +812,14 @@ class DataService:
         if df.empty:
             return pd.DataFrame()
 
-        trend = df.groupby('tanggal').agg({
-            'nominal': 'sum',
-            'kode_billing': 'count'
-        }).reset_index()
+        col = self._amount_column(df)
+        trend = self._aggregate(df, ['hari_key'], {
+            'total': (col, 'sum'),
+            'jumlah': ('kode_billing', 'count'),
+        })
 
-        trend.columns = ['tanggal', 'total', 'jumlah']
+        trend.insert(0, 'tanggal', kalender.lookup(trend.pop('hari_key'), ['tanggal'])['tanggal'])
+        trend['total'] = self._to_rupiah(trend['total'], col)
         trend = trend.sort_values('tanggal')
 
         return trend
@@ -280,12 +834,19 @@ class DataService:
         if df.empty:
             return pd.DataFrame()
 
-        summary = df.groupby(['tahun', 'bulan']).agg({
-            'nominal': 'sum',
-            'kode_billing': 'count'
-        }).reset_index()
+        col = self._amount_column(df)
+        daily = self._aggregate(df, ['hari_key'], {
+            'total': (col, 'sum'),
+            'jumlah': ('kode_billing', 'count'),
+        })
 
-        summary.columns = ['tahun', 'bulan', 'total', 'jumlah']
+        # Days roll up into their calendar month
+        months = kalender.lookup(daily['hari_key'], ['tahun', 'bulan'])
+        summary = daily[['total', 'jumlah']].groupby(
+            [months['tahun'].astype('int64'), months['bulan'].astype('int64')]
+        ).sum().reset_index()
+
+        summary['total'] = self._to_rupiah(summary['total'], col)
         summary['nama_bulan'] = summary['bulan'].map(MONTH_NAMES_SHORT)
         summary['periode'] = summary['nama_bulan'] + ' ' + summary['tahun'].astype(str)
         summary = summary.sort_values(['tahun', 'bulan'])
@@ -302,23 +863,27 @@ class DataService:
         if df.empty:
             return pd.DataFrame()
 
-        summary = df.groupby(['nama_kasir', 'nip_kasir']).agg({
-            'nominal': ['sum', 'count'],
-            'nama_opd': lambda x: x.mode().iloc[0] if len(x.mode()) > 0 else 'N/A'
-        }).reset_index()
+        col = self._amount_column(df)
+        summary = self._aggregate(df, ['nama_kasir', 'nip_kasir'], {
+            'total': (col, 'sum'),
+            'jumlah': (col, 'count'),
+            'opd': ('nama_opd', 'mode'),
+        })
 
-        summary.columns = ['nama_kasir', 'nip_kasir', 'total', 'jumlah', 'opd']
+        summary['total'] = self._to_rupiah(summary['total'], col)
         summary = summary.sort_values('total', ascending=False)
 
         return summary
 
-    def get_transaction_detail(self, df: pd.DataFrame, limit: int = 500) -> pd.DataFrame:
+    def get_transaction_detail(self, df: pd.DataFrame, limit: int = 500, newest_first: bool = True) -> pd.DataFrame:
         """
         Get transaction detail for display
 
         Args:
             df: Source DataFrame
             limit: Maximum rows to return
+            newest_first: Sort by tanggal_terima descending; False keeps
+                the order of df
 
         Returns:
             DataFrame with transaction details
@@ -332,27 +897,338 @@ class DataService:
             'jenis_pembayaran_nama', 'nama_kasir', 'keterangan_umum'
         ]
 
-        detail = df[cols].copy()
-        detail = detail.sort_values('tanggal_terima', ascending=False)
-
+        col = self._amount_column(df)
+        detail = df.sort_values('tanggal_terima', ascending=False) if newest_first else df
         if limit:
-            return detail.head(limit)
+            detail = detail.head(limit)
+
+        # Display-only columns are fetched for the selected rows alone
+        details = self.get_transaction_details(detail['id'], [column for column in cols if column in DETAIL_COLUMNS])
+        detail = detail.join(details, on='id')
+
+        # Amounts leave DataService in Rupiah
+        detail = detail.assign(nominal=self._to_rupiah(detail[col], col))[cols]
+
         return detail
 
+    def get_transaction_details(self, ids, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Fetch display-only columns of transactions by id
+
+        These columns are not held in the partitions. Rows are read from
+        the read model, or from the archive file of an archived year.
+
+        Args:
+            ids: Transaction ids
+            columns: Columns of DETAIL_COLUMNS to fetch (default: all)
+
+        Returns:
+            DataFrame with the columns indexed by id; unknown ids are left out
+        """
+        ids = [int(value) for value in pd.unique(pd.Series(ids, dtype='int64'))]
+        dtypes = {column: DETAIL_DTYPES[column] for column in ['id'] + list(columns or DETAIL_COLUMNS)}
+        frames = []
+
+        session = self._get_session()
+        try:
+            from database.queries import DASHBOARD_DETAIL
+
+            statement = DASHBOARD_DETAIL.with_only_columns(
+                *(DASHBOARD_DETAIL.selected_columns[column] for column in dtypes)
+            )
+            connection = session.connection()
+            for i in range(0, len(ids), DETAIL_BATCH_SIZE):
+                batch = ids[i:i + DETAIL_BATCH_SIZE]
+                frames.append(load_typed_frame(
+                    connection, statement, dtypes,
+                    params={'ids': batch}, expected_rows=len(batch)
+                ))
+        finally:
+            session.close()
+
+        found = set().union(*(frame['id'].tolist() for frame in frames))
+        missing = [value for value in ids if value not in found]
+        if missing:
+            from database.archive import list_archived_years, read_archived_year
+
+            for year in list_archived_years():
+                df = read_archived_year(year, columns=list(dtypes), filters=[('id', 'in', missing)])
+                if not df.empty:
+                    frames.append(apply_dtypes(df, dtypes))
+
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return pd.DataFrame(columns=list(dtypes)).set_index('id')
+
+        details = frames[0] if len(frames) == 1 else self._concat_partitions(frames)
+        return details.set_index('id')
+
+    def get_rollup_data(
+        self,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> pd.DataFrame:
+        """
+        Get rekap_harian rows with OPD and payment names
+
+        Args:
+            start_date: First date to include (inclusive)
+            end_date: Last date to include (inclusive)
+
+        Returns:
+            DataFrame with one row per tanggal x OPD x jenis pembayaran x bendahara
+        """
+        from database.queries import REKAP_HARIAN_RANGE
+
+        return self._read_rollup(REKAP_HARIAN_RANGE, start_date, end_date)
+
+    def _read_rollup(self, statement, start_date, end_date) -> pd.DataFrame:
+        """Read rekap_harian rows of a date range, adding names and Rupiah amounts"""
+        session = self._get_session()
+
+        try:
+            from database.queries import MIN_DATE, MAX_DATE
+
+            df = pd.read_sql(statement, session.bind, params={
+                'start_date': start_date or MIN_DATE,
+                'end_date': end_date or MAX_DATE
+            })
+
+            # Rupiah columns derived from the exact sen aggregates
+            for col in ['total', 'minimum', 'maksimum']:
+                df[f'{col}_sen'] = df[f'{col}_sen'].astype('int64')
+                df[col] = sen_to_rupiah(df[f'{col}_sen'])
+            if 'tanggal' in df.columns:
+                df['tanggal'] = pd.to_datetime(df['tanggal']).dt.date
+            df['jenis_pembayaran_nama'] = df['jenis_pembayaran'].map(PAYMENT_TYPES).fillna('Lainnya')
+            df['nama_opd'] = df['nama_opd'].fillna('OPD Tidak Diketahui')
+
+            # Exclude BAPENDA from analysis
+            df = df[~df['nama_opd'].str.contains('Badan Pendapatan Daerah', case=False, na=False)]
+
+            return df
+
+        finally:
+            session.close()
+
+    def get_filtered_rollup(self, filters: dict) -> pd.DataFrame:
+        """
+        Get rekap_harian totals per OPD and payment type selected by
+        dashboard filter parameters
+
+        Periods are whole days, so the totals of the filtered days are
+        the totals of the filtered transactions. The database aggregates
+        the days; OPD and payment filters apply to the few rows returned.
+
+        Args:
+            filters: Filter parameters as for get_filtered_data
+
+        Returns:
+            DataFrame with one row per OPD x jenis pembayaran, with the
+            columns get_opd_summary_from_rollup and
+            get_payment_summary_from_rollup use
+        """
+        from database.queries import REKAP_HARIAN_SUMMARY_RANGE, MIN_DATE, MAX_DATE
+
+        criteria = self._filter_criteria(filters)
+        conditions, _ = self._filter_conditions(
+            criteria['period_type'], *(criteria.get(name) for name in FILTER_CRITERIA)
+        )
+
+        bounds = {operator: value for column, operator, value in conditions if column == 'hari_key'}
+        first = bounds.get('>=', bounds.get('=='))
+        last = bounds.get('<=', bounds.get('=='))
+        if first == 0:
+            # Key 0 stands for a week the ISO year does not have
+            start_date, end_date = MAX_DATE, MIN_DATE
+        else:
+            start_date = kalender.key_date(first) if first else None
+            end_date = kalender.key_date(last) if last else None
+
+        rollup = self._read_rollup(REKAP_HARIAN_SUMMARY_RANGE, start_date, end_date)
+
+        selected = self._condition_mask(rollup, [
+            condition for condition in conditions if condition[0] != 'hari_key'
+        ])
+        return rollup if selected is None else rollup[selected]
+
+    def get_opd_summary_from_rollup(self, rollup: Optional[pd.DataFrame] = None, top_n: int = 15) -> pd.DataFrame:
+        """
+        Get summary by OPD from rekap_harian instead of raw transactions
+
+        Args:
+            rollup: Rows of get_rollup_data or get_filtered_rollup (default: all days)
+            top_n: Number of top OPD to return
+
+        Returns:
+            DataFrame with the same columns as get_opd_summary
+        """
+        if rollup is None:
+            rollup = self.get_rollup_data()
+        if rollup.empty:
+            return pd.DataFrame()
+
+        summary = rollup.groupby('nama_opd').agg(
+            total=('total_sen', 'sum'),
+            jumlah=('jumlah', 'sum'),
+            minimum=('minimum_sen', 'min'),
+            maksimum=('maksimum_sen', 'max')
+        ).reset_index()
+
+        summary['rata_rata'] = summary['total'] / summary['jumlah']
+        for amount in ['total', 'rata_rata', 'minimum', 'maksimum']:
+            summary[amount] = sen_to_rupiah(summary[amount])
+        summary = summary[['nama_opd', 'total', 'jumlah', 'rata_rata', 'minimum', 'maksimum']]
+        summary = summary.sort_values('total', ascending=False)
+
+        if top_n:
+            return summary.head(top_n)
+        return summary
+
+    def get_payment_summary_from_rollup(self, rollup: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """
+        Get summary by payment type from rekap_harian instead of raw transactions
+
+        Args:
+            rollup: Rows of get_rollup_data or get_filtered_rollup (default: all days)
+
+        Returns:
+            DataFrame with the same columns as get_payment_summary
+        """
+        if rollup is None:
+            rollup = self.get_rollup_data()
+        if rollup.empty:
+            return pd.DataFrame()
+
+        summary = rollup.groupby('jenis_pembayaran_nama').agg(
+            total=('total_sen', 'sum'),
+            jumlah=('jumlah', 'sum')
+        ).reset_index()
+
+        summary.columns = ['jenis_pembayaran', 'total', 'jumlah']
+        summary['total'] = sen_to_rupiah(summary['total'])
+        summary['persentase'] = (summary['total'] / summary['total'].sum() * 100).round(2)
+        summary = summary.sort_values('total', ascending=False)
+
+        return summary
+
+    def get_cache_stats(self) -> dict:
+        """
+        Memory accounting of the cached partitions and catalog
+
+        With SHARED_SNAPSHOT the numeric and datetime columns are views of
+        the mapped files, so their bytes are shared page cache rather than
+        private memory of this process.
+
+        Returns:
+            Dictionary with per-year partitions (rows, bytes, load time and
+            stats), per-column totals across partitions, catalog bytes and
+            the mapped and published shared snapshot versions
+        """
+        partitions = {}
+        columns = {}
+        for year, df in sorted(self._partitions.items()):
+            usage = df.memory_usage(deep=True)
+            loaded_at = self._partition_times.get(year)
+            partitions[year] = {
+                'rows': len(df),
+                'bytes': int(usage.sum()),
+                'loaded_at': loaded_at.isoformat(timespec='seconds') if loaded_at else None,
+                'load': self._load_stats.get(year),
+            }
+            for column, size in usage.drop('Index').items():
+                entry = columns.setdefault(column, {'dtype': str(df[column].dtype), 'bytes': 0})
+                entry['bytes'] += int(size)
+
+        shared = None
+        if self._shared is not None:
+            latest = self._shared.latest_version()
+            shared = {
+                'mapped_version': self._shared_version,
+                'latest_version': latest,
+                'latest_age_seconds': self._shared.version_age(latest) if latest else None,
+                'versions_on_disk': self._shared.list_versions(),
+            }
+
+        return {
+            'backend': type(self).__name__,
+            'partitions': partitions,
+            'partition_bytes': sum(entry['bytes'] for entry in partitions.values()),
+            'columns': dict(sorted(columns.items(), key=lambda item: item[1]['bytes'], reverse=True)),
+            'catalog_bytes': int(self._catalog.memory_usage(deep=True).sum()) if self._catalog is not None else 0,
+            'shared_snapshot': shared,
+        }
+
+    def after_fork(self):
+        """Reset per-process resources in a forked worker (cached data stays shared)"""
+
     def refresh_cache(self):
-        """Force refresh the data cache"""
-        self._cached_data = None
-        self._cache_time = None
+        """Force refresh the data cache, including closed years"""
+        self._partitions = {}
+        self._partition_times = {}
+        self._partition_versions = {}
+        self._catalog = None
+        self._catalog_time = None
+        self._shared_version = None
         return self.get_all_transactions(use_cache=False)
 
 
+def _mode_or_na(values: pd.Series):
+    """Most frequent value of a group, 'N/A' if it has none"""
+    mode = values.mode()
+    return mode.iloc[0] if len(mode) > 0 else 'N/A'
+
+
 # Singleton instance
 _data_service = None
+_data_service_warm = False
 
 
 def get_data_service() -> DataService:
-    """Get the singleton data service instance"""
+    """Get the singleton data service instance for the configured DATA_BACKEND"""
     global _data_service
     if _data_service is None:
-        _data_service = DataService()
+        if DATA_BACKEND == 'duckdb':
+            try:
+                from utils.duckdb_service import DuckDBDataService
+                _data_service = DuckDBDataService()
+            except ImportError as e:
+                print(f"DuckDB backend tidak tersedia ({e}), memakai pandas")
+                _data_service = DataService()
+        else:
+            _data_service = DataService()
+        if METRICS_ENABLED:
+            instrument_service(_data_service)
     return _data_service
+
+
+def warm_data_service() -> dict:
+    """
+    Load the catalog, all year partitions and the filter option lists
+
+    Run before the server accepts requests (before forking when workers are
+    preloaded) so no request pays the cold load.
+
+    Returns:
+        Dictionary with rows, years and seconds
+    """
+    global _data_service_warm
+
+    start = time.perf_counter()
+    data_service = get_data_service()
+    df = data_service.get_all_transactions()
+    data_service.get_date_range()
+    data_service.get_opd_list()
+    data_service.get_payment_types()
+    _data_service_warm = True
+
+    return {
+        'rows': len(df),
+        'years': data_service.get_available_years(),
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def is_data_service_warm() -> bool:
+    """Check if warm_data_service has completed in this process"""
+    return _data_service_warm
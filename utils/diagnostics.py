@@ -0,0 +1,211 @@
+"""
+Diagnostics - memory accounting and allocation profiling of a worker
+
+Served to admins at /diagnostics. Reports process memory, the DataService
+cache per year and per column, pandas frames alive outside the cache,
+registered result caches, the SQL profiler report and, on demand, the top
+allocation sites of a tracemalloc snapshot with the growth since the
+previous snapshot, which shows where a worker creeps between two calls.
+Values are per process, like /metrics.
+"""
+
+import gc
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Callable, Optional
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import SQL_PROFILE, TRACEMALLOC_FRAMES
+from utils.loader import peak_rss_mb
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GROUP_BY = ('lineno', 'filename', 'traceback')
+# Largest frames listed outside the cache
+LARGEST_FRAMES = 10
+
+_caches = {}  # {name: callable returning the cache sizes}
+_baseline = None  # Previous tracemalloc snapshot
+_lock = threading.Lock()
+_process_start = time.time()
+
+
+def register_cache(name: str, stats: Callable[[], dict]):
+    """
+    Report a result cache in the diagnostics
+
+    Args:
+        name: Name shown in the report
+        stats: Called per report; returns a dictionary of the cache sizes,
+            e.g. entries and bytes
+    """
+    _caches[name] = stats
+
+
+def current_rss_mb() -> Optional[float]:
+    """Resident set size of this process in MB (None where /proc is unavailable)"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _process_stats() -> dict:
+    return {
+        'pid': os.getpid(),
+        'uptime_seconds': time.time() - _process_start,
+        'rss_mb': current_rss_mb(),
+        'peak_rss_mb': peak_rss_mb(),
+        'threads': threading.active_count(),
+        'gc_counts': gc.get_count(),
+        'gc_frozen': gc.get_freeze_count(),
+    }
+
+
+def live_frames(cached: list) -> dict:
+    """
+    Count the pandas DataFrames alive in this process
+
+    Frames outside the cache are copies and results in flight, or leaks
+    when they keep growing. Sizes are shallow (no string contents) and
+    views share memory with the frame they were taken from.
+
+    Args:
+        cached: Frames held by the cache
+
+    Returns:
+        Dictionary with count and bytes of cached and other frames, and
+        the largest other frames
+    """
+    cached_ids = {id(df) for df in cached}
+    totals = {'cached': {'count': 0, 'bytes': 0}, 'other': {'count': 0, 'bytes': 0}}
+    largest = []
+
+    for obj in gc.get_objects():
+        if not isinstance(obj, pd.DataFrame):
+            continue
+        size = int(obj.memory_usage(deep=False).sum())
+        group = 'cached' if id(obj) in cached_ids else 'other'
+        totals[group]['count'] += 1
+        totals[group]['bytes'] += size
+        if group == 'other':
+            largest.append({'shape': list(obj.shape), 'bytes': size, 'columns': list(obj.columns[:8])})
+
+    largest.sort(key=lambda frame: frame['bytes'], reverse=True)
+    totals['largest_other'] = largest[:LARGEST_FRAMES]
+    return totals
+
+
+def _site(stat, group_by: str):
+    frames = stat.traceback if group_by == 'traceback' else stat.traceback[:1]
+    sites = [
+        f"{os.path.relpath(frame.filename, ROOT_DIR) if frame.filename.startswith(ROOT_DIR) else frame.filename}"
+        + ('' if group_by == 'filename' else f":{frame.lineno}")
+        for frame in frames
+    ]
+    return sites if group_by == 'traceback' else sites[0]
+
+
+def allocation_sites(action: Optional[str] = None, top: int = 25, group_by: str = 'lineno') -> dict:
+    """
+    Top allocation sites from a tracemalloc snapshot
+
+    Tracing is started on demand since it slows allocations down and
+    roughly doubles their memory; stop it when done. Each snapshot is
+    compared with the previous one of this process.
+
+    Args:
+        action: 'start' or 'stop' tracing, 'reset' to take a new baseline
+        top: Number of sites returned
+        group_by: 'lineno', 'filename' or 'traceback'
+
+    Returns:
+        Dictionary with the tracing state and, while tracing, the traced
+        size, the top sites and the top growth since the previous snapshot
+    """
+    global _baseline
+
+    if group_by not in GROUP_BY:
+        group_by = 'lineno'
+
+    with _lock:
+        if action == 'stop':
+            tracemalloc.stop()
+            _baseline = None
+            return {'tracing': False}
+
+        if not tracemalloc.is_tracing():
+            if action != 'start':
+                return {'tracing': False, 'hint': 'Tambahkan ?tracemalloc=start untuk mulai merekam alokasi'}
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            _baseline = None
+
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ])
+        previous = None if action == 'reset' else _baseline
+        _baseline = snapshot
+
+    traced, peak = tracemalloc.get_traced_memory()
+    result = {
+        'tracing': True,
+        'frames': tracemalloc.get_traceback_limit(),
+        'traced_mb': traced / (1024 * 1024),
+        'peak_traced_mb': peak / (1024 * 1024),
+        'top': [
+            {'site': _site(stat, group_by), 'size_kb': stat.size / 1024, 'count': stat.count}
+            for stat in snapshot.statistics(group_by)[:top]
+        ],
+    }
+    if previous is not None:
+        result['growth'] = [
+            {'site': _site(stat, group_by), 'size_diff_kb': stat.size_diff / 1024,
+             'count_diff': stat.count_diff, 'size_kb': stat.size / 1024}
+            for stat in snapshot.compare_to(previous, group_by)[:top]
+        ]
+    return result
+
+
+def collect_diagnostics(tracemalloc_action: Optional[str] = None, top: int = 25,
+                        group_by: str = 'lineno') -> dict:
+    """
+    Memory diagnostics of this process
+
+    Args:
+        tracemalloc_action: Passed to allocation_sites
+        top: Number of allocation sites and SQL statements returned
+        group_by: Grouping of the allocation sites
+
+    Returns:
+        Dictionary with process, data_service, frames, result_caches, sql
+        and tracemalloc sections
+    """
+    from utils.data_service import get_data_service
+
+    data_service = get_data_service()
+    cache = data_service.get_cache_stats()
+
+    sql = None
+    if SQL_PROFILE:
+        from database.profiler import get_query_profiler
+        sql = get_query_profiler().report(limit=top)
+
+    return {
+        'process': _process_stats(),
+        'data_service': cache,
+        # The cache dictionary is swapped on reload, so read it once
+        'frames': live_frames(list(data_service._partitions.values())),
+        'result_caches': {name: stats() for name, stats in _caches.items()},
+        'sql': sql,
+        'tracemalloc': allocation_sites(tracemalloc_action, top, group_by),
+    }
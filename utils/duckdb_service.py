@@ -0,0 +1,402 @@
+"""
+DuckDB Data Service - DataService backend running filters and aggregations in DuckDB
+
+Selected with DATA_BACKEND=duckdb. Dashboard filters and summaries are
+answered from the Parquet files of each year, the snapshots written by
+database.snapshot and the archives of closed years, without loading the
+years into pandas: the filter conditions are pushed down into the
+read_parquet scan and only the grouped result comes back. DuckDB runs the
+scan on all cores and spills to disk beyond DUCKDB_MEMORY_LIMIT.
+
+A year without a current Parquet file (missing, lagging behind the
+catalog, or written before a partition column existed) is loaded into
+memory as by the pandas backend and scanned from there. Results match
+the pandas implementation.
+"""
+
+import os
+import sys
+from typing import Dict, List, Optional, Tuple
+
+import duckdb
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import DUCKDB_THREADS, DUCKDB_MEMORY_LIMIT
+from utils.cache import get_result_cache
+from utils.data_service import DataService, FILTER_CRITERIA, PARTITION_COLUMNS, PARTITION_DTYPES
+from utils.loader import INT, CATEGORY, apply_dtypes
+
+# SQL for the aggregation functions of DataService._aggregate
+SQL_AGGREGATES = {
+    'sum': 'sum({})',
+    'count': 'count({})',
+    'min': 'min({})',
+    'max': 'max({})',
+    'nunique': 'count(DISTINCT {})',
+}
+
+SQL_OPERATORS = {'==': '=', '>=': '>=', '<=': '<='}
+
+
+class ParquetSelection:
+    """
+    Transactions meeting filter conditions, left where they are stored
+
+    Stands in for the filtered DataFrame in the summary methods of
+    DuckDBDataService: they only check emptiness, the amount column and
+    the row count, and aggregate through _aggregate, which runs on the
+    Parquet files with the conditions in the WHERE clause.
+    """
+
+    def __init__(self, service: 'DuckDBDataService', files: List[str], frames: Dict[str, pd.DataFrame],
+                 conditions: list, dtypes: Optional[dict] = None):
+        """
+        Args:
+            service: Service running the queries
+            files: Parquet files of the selected years (BAPENDA rows are skipped)
+            frames: {table name: DataFrame} of years held in memory instead
+            conditions: (column, operator, value) tuples from _filter_conditions
+            dtypes: Column types, as PARTITION_DTYPES or pandas dtypes
+                (default: PARTITION_DTYPES)
+        """
+        self._service = service
+        self.files = files
+        self.frames = frames
+        self.conditions = conditions
+        self.dtypes = dtypes or PARTITION_DTYPES
+        self.columns = list(self.dtypes)
+        self._rows = None
+
+    @classmethod
+    def of_frame(cls, service: 'DuckDBDataService', df: pd.DataFrame) -> 'ParquetSelection':
+        """All rows of an in-memory DataFrame"""
+        return cls(service, [], {'f': df}, [], dict(df.dtypes))
+
+    def sql(self) -> Tuple[str, list]:
+        """Subquery of the selected rows, usable after FROM, and its parameters"""
+        columns = ', '.join(self.columns)
+        sources = []
+        params = []
+        if self.files:
+            sources.append(
+                f"SELECT {columns} FROM read_parquet(?, union_by_name = true) WHERE NOT is_bapenda"
+            )
+            params.append(self.files)
+        sources += [f"SELECT {columns} FROM {name}" for name in self.frames]
+
+        clauses = []
+        for column, operator, value in self.conditions:
+            clauses.append(
+                f"list_contains(?, {column})" if operator == 'in' else f"{column} {SQL_OPERATORS[operator]} ?"
+            )
+            params.append(value)
+
+        where = ' AND '.join(clauses) or 'TRUE'
+        return f"(SELECT * FROM ({' UNION ALL '.join(sources)}) WHERE {where})", params
+
+    def is_integer(self, column: str) -> bool:
+        """Check if a column holds integers"""
+        dtype = self.dtypes[column]
+        return dtype == INT if isinstance(dtype, str) else pd.api.types.is_integer_dtype(dtype)
+
+    def key_dtype(self, column: str):
+        """pandas dtype of a group key in the result, None to keep DuckDB's"""
+        dtype = self.dtypes[column]
+        if isinstance(dtype, str):
+            return 'category' if dtype == CATEGORY else None
+        return dtype if isinstance(dtype, pd.CategoricalDtype) else None
+
+    def __len__(self) -> int:
+        if self._rows is None:
+            source, params = self.sql()
+            self._rows = int(self._service._query(f"SELECT count(*) FROM {source}", params, self.frames).iloc[0, 0])
+        return self._rows
+
+    @property
+    def empty(self) -> bool:
+        return len(self) == 0
+
+
+class DuckDBDataService(DataService):
+    """DataService with filters and aggregations executed by DuckDB"""
+
+    def __init__(self):
+        super().__init__()
+        self._duckdb = self._connect()
+        self._footers = {}  # {path: ((mtime_ns, size), columns, visible rows)}
+
+    @staticmethod
+    def _connect():
+        """Open an in-memory DuckDB connection with the configured limits"""
+        return duckdb.connect(config={
+            'threads': DUCKDB_THREADS,
+            'memory_limit': DUCKDB_MEMORY_LIMIT,
+        })
+
+    def after_fork(self):
+        """Open a new DuckDB connection; the inherited one is not fork-safe"""
+        self._duckdb = self._connect()
+
+    def get_cache_stats(self) -> dict:
+        """Memory accounting of DataService plus the DuckDB buffer manager"""
+        stats = super().get_cache_stats()
+        cursor = self._duckdb.cursor()
+        try:
+            rows = cursor.execute(
+                "SELECT tag, memory_usage_bytes, temporary_storage_bytes FROM duckdb_memory() "
+                "WHERE memory_usage_bytes > 0 OR temporary_storage_bytes > 0"
+            ).fetchall()
+            limit = cursor.execute("SELECT current_setting('memory_limit')").fetchone()[0]
+        finally:
+            cursor.close()
+        stats['duckdb'] = {
+            'memory_limit': limit,
+            'memory': {tag: {'bytes': memory, 'spilled_bytes': spilled} for tag, memory, spilled in rows},
+        }
+        return stats
+
+    def _query(self, sql: str, params: list = None, frames: Optional[Dict[str, pd.DataFrame]] = None) -> pd.DataFrame:
+        """
+        Run a query on its own cursor, with frames visible under their names
+
+        Each call gets a separate cursor so concurrent requests never share
+        registered frames.
+        """
+        cursor = self._duckdb.cursor()
+        try:
+            for name, df in (frames or {}).items():
+                cursor.register(name, df)
+            return cursor.execute(sql, params or []).df()
+        finally:
+            cursor.close()
+
+    def _parquet_file(self, year: int, archived: bool) -> Optional[str]:
+        """
+        Parquet file holding the current rows of a year
+
+        The footer of a file is read again only when the file changes.
+
+        Returns:
+            Path of the archive of an archived year, or of the snapshot when
+            it matches the catalog; None when the year has to be loaded
+        """
+        from database.archive import archive_path, read_archived_columns
+        from database.snapshot import snapshot_path, read_snapshot_columns, read_snapshot_visible_rows
+
+        path = archive_path(year) if archived else snapshot_path(year)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        footer = self._footers.get(path)
+        if footer is None or footer[0] != stamp:
+            if archived:
+                footer = (stamp, set(read_archived_columns(year)), None)
+            else:
+                footer = (stamp, set(read_snapshot_columns(year)), read_snapshot_visible_rows(year))
+            self._footers[path] = footer
+
+        if not set(PARTITION_COLUMNS) | {'is_bapenda'} <= footer[1]:
+            return None
+        if not archived:
+            catalog = self._get_catalog()
+            if footer[2] != int(catalog.loc[catalog['tahun'] == year, 'jumlah'].sum()):
+                return None
+        return path
+
+    def _file_version(self, path: str) -> str:
+        """Version of a Parquet file in result cache keys"""
+        mtime_ns, size = self._footers[path][0]
+        return f"{os.path.basename(path)}:{mtime_ns}:{size}"
+
+    def _load_database_partition(self, year: int) -> pd.DataFrame:
+        """Read one year from its Parquet snapshot when it is current"""
+        path = self._parquet_file(year, archived=False)
+        if path is None:
+            print(f"Snapshot tahun {year} tidak ada atau tertinggal, membaca dari database")
+            return super()._load_database_partition(year)
+
+        df = self._query(
+            f"SELECT {', '.join(PARTITION_COLUMNS)} FROM read_parquet(?) WHERE NOT is_bapenda",
+            [path]
+        )
+
+        return apply_dtypes(df, PARTITION_DTYPES)
+
+    def _select(self, filters: dict) -> Tuple[ParquetSelection, str]:
+        """
+        Parse dashboard filter parameters into a selection of the Parquet files
+
+        Returns:
+            Tuple of (selection, result cache key of the filtered data)
+        """
+        from database.archive import list_archived_years
+
+        criteria = self._filter_criteria(filters)
+        available = self.get_available_years()
+        years = self._criteria_years(criteria)
+        years = available if years is None else [year for year in years if year in available]
+        archived = set(list_archived_years())
+
+        files = []
+        frames = {}
+        version = []
+        for year in years:
+            path = self._parquet_file(year, year in archived)
+            if path is not None:
+                files.append(path)
+                version.append([year, self._file_version(path)])
+            else:
+                frames[f"p{year}"] = self._current_partitions([year])[year]
+                version.append([year, self._partition_versions.get(year)])
+
+        conditions, _ = self._filter_conditions(
+            criteria['period_type'], *(criteria.get(name) for name in FILTER_CRITERIA)
+        )
+        key = self._criteria_key(criteria, version)
+
+        if not files and not frames:
+            return ParquetSelection.of_frame(self, self._empty_frame()), key
+        return ParquetSelection(self, files, frames, conditions), key
+
+    def get_filtered_selection(self, filters: dict) -> ParquetSelection:
+        """
+        Select the transactions of dashboard filter parameters without reading them
+
+        The summary methods accept the selection in place of a DataFrame.
+
+        Args:
+            filters: Filter parameters as for get_filtered_data
+        """
+        return self._select(filters)[0]
+
+    def filter_key(self, filters: dict) -> str:
+        """Result cache key of the data selected by dashboard filter parameters"""
+        return self._select(filters)[1]
+
+    def get_filtered_data(self, filters: dict) -> Tuple[pd.DataFrame, str]:
+        """
+        Read the transactions of dashboard filter parameters, cached
+
+        Only the rows meeting the conditions are read from the files.
+
+        Returns:
+            Tuple of (filtered DataFrame, period label); the DataFrame is
+            shared with other requests and must not be modified
+        """
+        selection, key = self._select(filters)
+        return get_result_cache().get_or_compute(
+            key, lambda: (self._read_rows(selection), self.get_period_label(filters))
+        )
+
+    def _summary_source(self, filters: dict) -> ParquetSelection:
+        """Summaries aggregate the selection in DuckDB instead of the filtered frame"""
+        return self.get_filtered_selection(filters)
+
+    def _read_rows(self, selection: ParquetSelection, order: str = '', limit: Optional[int] = None) -> pd.DataFrame:
+        """Read the rows of a selection into partition columns and types"""
+        source, params = selection.sql()
+        sql = f"SELECT * FROM {source}"
+        if order:
+            sql += f" ORDER BY {order}"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return apply_dtypes(self._query(sql, params, selection.frames), PARTITION_DTYPES)
+
+    def _distinct(self, column: str) -> List[str]:
+        """Sorted distinct values of a column over all years"""
+        selection = self.get_filtered_selection({})
+        if not selection.files and not selection.frames:
+            return []
+        source, params = selection.sql()
+        values = self._query(
+            f"SELECT DISTINCT {column} FROM {source} WHERE {column} IS NOT NULL", params, selection.frames
+        )[column]
+        return sorted(values.tolist())
+
+    def get_opd_list(self) -> List[str]:
+        """Get list of all OPD names"""
+        return self._distinct('nama_opd')
+
+    def get_payment_types(self) -> List[str]:
+        """Get list of all payment types"""
+        return self._distinct('jenis_pembayaran_nama')
+
+    def _aggregate(self, df, keys: List[str], aggregations: dict) -> pd.DataFrame:
+        """
+        Group a selection (or a DataFrame) by keys and aggregate in DuckDB
+
+        Keys are grouped with their own types; categorical keys come back
+        as categories, as in the pandas implementation. Integer sums are
+        cast to BIGINT to stay exact.
+        """
+        selection = df if isinstance(df, ParquetSelection) else ParquetSelection.of_frame(self, df)
+        source, params = selection.sql()
+        key_list = ', '.join(keys)
+        not_null = ' AND '.join(f"{key} IS NOT NULL" for key in keys) or 'TRUE'
+
+        selects = list(keys)
+        for name, (column, function) in aggregations.items():
+            if function == 'mode':
+                continue
+            expression = SQL_AGGREGATES[function].format(column)
+            if function == 'sum' and selection.is_integer(column):
+                expression = f"CAST({expression} AS BIGINT)"
+            selects.append(f"{expression} AS {name}")
+
+        group_by = f"GROUP BY {key_list}" if keys else ""
+        tables = [f"(SELECT {', '.join(selects)} FROM s {group_by}) AS g"]
+        outputs = ['g.*']
+        modes = [(name, column) for name, (column, function) in aggregations.items() if function == 'mode']
+        for i, (name, column) in enumerate(modes):
+            join = f"USING ({key_list})" if keys else "ON TRUE"
+            tables.append(f"LEFT JOIN ({self._mode_sql(keys, column)}) AS m{i} {join}")
+            outputs.append(f"coalesce(m{i}.value, 'N/A') AS {name}")
+
+        order_by = f"ORDER BY {key_list}" if keys else ""
+        result = self._query(
+            f"WITH s AS (SELECT * FROM {source} WHERE {not_null}) "
+            f"SELECT {', '.join(outputs)} FROM {' '.join(tables)} {order_by}",
+            params, selection.frames
+        )
+
+        for key in keys:
+            dtype = selection.key_dtype(key)
+            if dtype is not None:
+                result[key] = result[key].astype(dtype)
+
+        return result[keys + list(aggregations)]
+
+    @staticmethod
+    def _mode_sql(keys: List[str], column: str) -> str:
+        """
+        Most frequent value of column per key group, over the rows in s
+
+        Ties resolve to the first value in the column's order (category
+        order for in-memory categoricals), as pandas' Series.mode does.
+        """
+        partition = f"PARTITION BY {', '.join(keys)} " if keys else ""
+        return f"""
+            SELECT {''.join(key + ', ' for key in keys)}CAST({column} AS VARCHAR) AS value
+            FROM s
+            WHERE {column} IS NOT NULL
+            GROUP BY {''.join(key + ', ' for key in keys)}{column}
+            QUALIFY row_number() OVER ({partition}ORDER BY count(*) DESC, {column}) = 1
+        """
+
+    def get_transaction_detail(self, df, limit: int = 500, newest_first: bool = True) -> pd.DataFrame:
+        """
+        Get transaction detail for display
+
+        From a selection only the rows shown are read, newest first when
+        asked; the rest is as in DataService.
+        """
+        if isinstance(df, ParquetSelection):
+            if df.empty:
+                return pd.DataFrame()
+            df = self._read_rows(df, 'tanggal_terima DESC' if newest_first else '', limit)
+        return super().get_transaction_detail(df, limit, newest_first)
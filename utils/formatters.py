@@ -2,8 +2,43 @@
 Formatting utilities for the dashboard
 """
 
+import numpy as np
 import pandas as pd
-from config import MONTH_NAMES, MONTH_NAMES_SHORT, DAY_NAMES
+from decimal import Decimal, ROUND_HALF_UP, InvalidOperation
+from config import MONTH_NAMES, MONTH_NAMES_SHORT, DAY_NAMES, SEN_PER_RUPIAH
+
+
+def rupiah_to_sen(value) -> int:
+    """
+    Convert a Rupiah amount to integer sen (1/100 Rupiah)
+
+    Args:
+        value: Amount in Rupiah (number, Decimal or numeric string)
+
+    Returns:
+        Amount in sen, rounded half up; 0 for missing values
+    """
+    if value is None or (not isinstance(value, Decimal) and pd.isna(value)):
+        return 0
+
+    try:
+        amount = value if isinstance(value, Decimal) else Decimal(str(value))
+        return int((amount * SEN_PER_RUPIAH).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+    except (InvalidOperation, ValueError, TypeError):
+        return 0
+
+
+def sen_to_rupiah(value):
+    """
+    Convert sen (1/100 Rupiah) to Rupiah
+
+    Args:
+        value: Amount in sen (scalar or Series)
+
+    Returns:
+        Amount in Rupiah as float (or float Series)
+    """
+    return value / SEN_PER_RUPIAH
 
 
 def format_rupiah(value, prefix: str = "Rp ") -> str:
@@ -106,6 +141,154 @@ def format_percentage(value, decimal_places: int = 1) -> str:
         return "0%"
 
 
+# Columns shorter than this are formatted value by value; the array setup
+# costs more than it saves on a handful of rows
+SMALL_COLUMN = 250
+
+def _column_values(values) -> tuple:
+    """Values as a float64 array, non-numeric ones as NaN, plus the Series index"""
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+    numbers = pd.to_numeric(series, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    return numbers, series.index
+
+
+def _group_thousands(magnitudes: np.ndarray, negative: np.ndarray, prefix: str) -> list:
+    """
+    Write integers with '.' thousand separators
+
+    Python's ',' grouping formats the magnitudes, then the separators are
+    swapped for '.' on the whole array at once. The sign is added apart
+    so a value rounded to -0 keeps it, as format() does.
+
+    Args:
+        magnitudes: Non-negative int64 values
+        negative: Whether each value gets a minus sign
+        prefix: Text placed before the sign
+
+    Returns:
+        List of formatted strings
+    """
+    grouped = np.char.replace(np.array([f"{value:,}" for value in magnitudes.tolist()], dtype=str), ',', '.')
+    return np.char.add(np.where(negative, f"{prefix}-", prefix), grouped).tolist()
+
+
+def _format_whole(numbers: np.ndarray, prefix: str, missing: str, fallback) -> np.ndarray:
+    """
+    Format numbers rounded to whole units with '.' thousand separators
+
+    Rounds half to even like format(); values beyond int64 and infinities
+    go through fallback, missing values become missing.
+    """
+    result = np.full(len(numbers), missing, dtype=object)
+    rounded = np.rint(numbers)
+    fast = np.isfinite(rounded) & (np.abs(rounded) < 2.0 ** 63)
+    if fast.any():
+        values = rounded[fast]
+        result[fast] = _group_thousands(np.abs(values).astype(np.int64), np.signbit(values), prefix)
+    other = ~fast & ~np.isnan(numbers)
+    if other.any():
+        result[other] = [fallback(value) for value in numbers[other]]
+    return result
+
+
+def format_rupiah_column(values, prefix: str = "Rp ") -> pd.Series:
+    """
+    Format a whole column as Indonesian Rupiah
+
+    Produces the same strings as format_rupiah applied to each value.
+
+    Args:
+        values: Series or array of numbers
+        prefix: Currency prefix (default: "Rp ")
+
+    Returns:
+        Series of strings with the index of values
+    """
+    numbers, index = _column_values(values)
+    if len(numbers) < SMALL_COLUMN:
+        return pd.Series([format_rupiah(value, prefix) for value in numbers], index=index, dtype=object)
+
+    result = _format_whole(numbers, prefix, f"{prefix}0", lambda value: format_rupiah(value, prefix))
+    return pd.Series(result, index=index)
+
+
+def format_rupiah_short_column(values, prefix: str = "Rp ") -> pd.Series:
+    """
+    Format a whole column as shortened Rupiah
+
+    Produces the same strings as format_rupiah_short applied to each value.
+    Tiers are picked on the array; only the T, M, Jt and Rb labels are
+    formatted one by one, from Python floats which format faster than
+    numpy scalars.
+
+    Args:
+        values: Series or array of numbers
+        prefix: Currency prefix (default: "Rp ")
+
+    Returns:
+        Series of strings with the index of values
+    """
+    numbers, index = _column_values(values)
+    if len(numbers) < SMALL_COLUMN:
+        return pd.Series([format_rupiah_short(value, prefix) for value in numbers], index=index, dtype=object)
+
+    result = np.full(len(numbers), f"{prefix}0", dtype=object)
+    magnitude = np.abs(numbers)
+    tiers = [
+        (magnitude >= 1e12, lambda value: f"{prefix}{value/1e12:.2f} T"),
+        ((magnitude >= 1e9) & (magnitude < 1e12), lambda value: f"{prefix}{value/1e9:.2f} M"),
+        ((magnitude >= 1e6) & (magnitude < 1e9), lambda value: f"{prefix}{value/1e6:.1f} Jt"),
+        ((magnitude >= 1e3) & (magnitude < 1e6), lambda value: f"{prefix}{value/1e3:.1f} Rb"),
+    ]
+    for mask, label in tiers:
+        result[mask] = [label(value) for value in numbers[mask].tolist()]
+
+    # Below a thousand the separator replace also applies to the prefix
+    small = magnitude < 1e3
+    result[small] = _format_whole(numbers[small], prefix.replace(",", "."), f"{prefix}0", None)
+    return pd.Series(result, index=index)
+
+
+def format_number_column(values, decimal_places: int = 0) -> pd.Series:
+    """
+    Format a whole column with thousand separators (Indonesian style)
+
+    Produces the same strings as format_number applied to each value.
+
+    Args:
+        values: Series or array of numbers
+        decimal_places: Number of decimal places
+
+    Returns:
+        Series of strings with the index of values
+    """
+    numbers, index = _column_values(values)
+    if decimal_places > 0 or len(numbers) < SMALL_COLUMN:
+        return pd.Series([format_number(value, decimal_places) for value in numbers], index=index, dtype=object)
+
+    return pd.Series(_format_whole(numbers, "", "0", format_number), index=index)
+
+
+def format_percentage_column(values, decimal_places: int = 1) -> pd.Series:
+    """
+    Format a whole column as percentages
+
+    Produces the same strings as format_percentage applied to each value.
+
+    Args:
+        values: Series or array of numbers (0-100)
+        decimal_places: Number of decimal places
+
+    Returns:
+        Series of strings with the index of values
+    """
+    numbers, index = _column_values(values)
+    result = np.full(len(numbers), "0%", dtype=object)
+    present = ~np.isnan(numbers)
+    result[present] = [f"{value:.{decimal_places}f}%" for value in numbers[present].tolist()]
+    return pd.Series(result, index=index)
+
+
 def format_date(date, format_str: str = "%d/%m/%Y") -> str:
     """
     Format date to Indonesian format
@@ -0,0 +1,226 @@
+"""
+Kalender - calendar dimension keyed by day
+
+Transactions carry only hari_key, their day of tanggal_terima as a YYYYMMDD
+integer. The date, ISO week and ISO year, month and day names and fiscal
+attributes of a day are looked up here instead of being derived per row.
+Keys sort like the dates they stand for, so periods are key ranges.
+
+The dimension is built once per process for the years looked up so far
+and grows when a later lookup reaches outside them.
+"""
+
+import os
+import sys
+import threading
+from calendar import monthrange
+from datetime import date, datetime, timedelta
+from typing import Optional, Tuple
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import (
+    MONTH_NAMES, MONTH_NAMES_SHORT, DAY_NAMES, FISCAL_YEAR_START_MONTH, FISCAL_YEAR_GRACE_DAYS
+)
+
+# Attributes of a day, indexed by hari_key
+KALENDER_COLUMNS = [
+    'tanggal', 'tahun', 'bulan', 'nama_bulan', 'nama_bulan_singkat',
+    'tahun_iso', 'minggu_iso', 'hari_iso', 'hari', 'nama_hari',
+    'tahun_anggaran', 'triwulan', 'semester',
+]
+
+_calendar = None  # DataFrame indexed by hari_key
+_lock = threading.Lock()
+
+
+def day_key(value) -> int:
+    """
+    Day key of a date
+
+    Args:
+        value: date, datetime, Timestamp or ISO date string
+
+    Returns:
+        The day as a YYYYMMDD integer
+    """
+    if isinstance(value, str):
+        value = pd.Timestamp(value)
+    return value.year * 10000 + value.month * 100 + value.day
+
+
+def day_keys(values: pd.Series) -> pd.Series:
+    """
+    Day keys of a datetime Series
+
+    Returns:
+        int64 Series, or nullable Int64 with <NA> where values has NaT
+    """
+    values = pd.to_datetime(values)
+    keys = values.dt.year * 10000 + values.dt.month * 100 + values.dt.day
+    return keys.astype('Int64' if keys.isna().any() else 'int64')
+
+
+def key_date(key: int) -> date:
+    """Date of a day key"""
+    key = int(key)
+    return date(key // 10000, key // 100 % 100, key % 100)
+
+
+def build_calendar(first_year: int, last_year: int) -> pd.DataFrame:
+    """
+    Build the calendar dimension for whole years
+
+    The fiscal year is named after the calendar year it starts in.
+
+    Args:
+        first_year: First year included
+        last_year: Last year included
+
+    Returns:
+        DataFrame with KALENDER_COLUMNS, one row per day, indexed by hari_key
+    """
+    days = pd.date_range(date(first_year, 1, 1), date(last_year, 12, 31), freq='D')
+    iso = days.isocalendar()
+    fiscal_offset = (days.month - FISCAL_YEAR_START_MONTH) % 12
+    day_names = days.day_name()
+
+    calendar = pd.DataFrame({
+        'tanggal': days.date,
+        'tahun': days.year.astype('int16'),
+        'bulan': days.month.astype('int8'),
+        'nama_bulan': pd.Categorical(days.month.map(MONTH_NAMES), categories=list(MONTH_NAMES.values())),
+        'nama_bulan_singkat': pd.Categorical(
+            days.month.map(MONTH_NAMES_SHORT), categories=list(MONTH_NAMES_SHORT.values())
+        ),
+        'tahun_iso': iso['year'].to_numpy().astype('int16'),
+        'minggu_iso': iso['week'].to_numpy().astype('int8'),
+        'hari_iso': iso['day'].to_numpy().astype('int8'),
+        'hari': pd.Categorical(day_names, categories=list(DAY_NAMES)),
+        'nama_hari': pd.Categorical(day_names.map(DAY_NAMES), categories=list(DAY_NAMES.values())),
+        'tahun_anggaran': (days.year - (days.month < FISCAL_YEAR_START_MONTH)).astype('int16'),
+        'triwulan': (fiscal_offset // 3 + 1).astype('int8'),
+        'semester': (fiscal_offset // 6 + 1).astype('int8'),
+    }, index=pd.Index(days.year * 10000 + days.month * 100 + days.day, name='hari_key'))
+
+    return calendar
+
+
+def get_calendar(first_year: Optional[int] = None, last_year: Optional[int] = None) -> pd.DataFrame:
+    """
+    Get the calendar dimension, built once and extended to the given years
+
+    Args:
+        first_year: First year that must be included (default: as built)
+        last_year: Last year that must be included (default: first_year)
+
+    Returns:
+        Calendar DataFrame indexed by hari_key; shared, must not be modified
+    """
+    global _calendar
+
+    if first_year is None:
+        first_year = last_year = datetime.now().year if _calendar is None else int(_calendar['tahun'].iloc[0])
+    last_year = first_year if last_year is None else last_year
+
+    calendar = _calendar
+    if calendar is not None and calendar['tahun'].iloc[0] <= first_year and calendar['tahun'].iloc[-1] >= last_year:
+        return calendar
+
+    with _lock:
+        if _calendar is not None:
+            first_year = min(first_year, int(_calendar['tahun'].iloc[0]))
+            last_year = max(last_year, int(_calendar['tahun'].iloc[-1]))
+        _calendar = build_calendar(first_year, last_year)
+        return _calendar
+
+
+def lookup(keys, columns: Optional[list] = None) -> pd.DataFrame:
+    """
+    Calendar attributes of day keys
+
+    Args:
+        keys: Series or array of hari_key values, may hold missing values
+        columns: Attributes returned (default: all of KALENDER_COLUMNS)
+
+    Returns:
+        DataFrame with one row per key, aligned with the index of keys;
+        attributes of missing keys are missing, integer ones as nullable
+        Int types then
+    """
+    keys = keys if isinstance(keys, pd.Series) else pd.Series(keys)
+    present = keys.dropna()
+    calendar = get_calendar(*(
+        (int(present.min()) // 10000, int(present.max()) // 10000) if len(present) else ()
+    ))
+    calendar = calendar[columns or KALENDER_COLUMNS]
+    result = calendar.reindex(pd.Index(keys))
+    result.index = keys.index
+
+    if len(present) < len(keys):
+        result = result.astype({
+            column: str(calendar[column].dtype).capitalize()
+            for column in calendar.columns if pd.api.types.is_integer_dtype(calendar[column])
+        })
+    return result
+
+
+def day_range(start: date, end: date) -> Tuple[int, int]:
+    """First and last day key of a date range (inclusive)"""
+    return day_key(start), day_key(end)
+
+
+def month_range(year: int, month: int) -> Tuple[int, int]:
+    """First and last day key of a month"""
+    return day_range(date(year, month, 1), date(year, month, monthrange(year, month)[1]))
+
+
+def year_range(year: int) -> Tuple[int, int]:
+    """First and last day key of a calendar year"""
+    return day_range(date(year, 1, 1), date(year, 12, 31))
+
+
+def week_range(iso_year: int, week: int) -> Optional[Tuple[int, int]]:
+    """
+    First and last day key of an ISO week
+
+    The week belongs to its ISO year, so week 1 may start in December of
+    the previous calendar year and week 52 or 53 may end in January.
+
+    Returns:
+        Tuple of (Monday key, Sunday key), or None when the ISO year has
+        no such week
+    """
+    try:
+        return day_range(
+            date.fromisocalendar(iso_year, week, 1),
+            date.fromisocalendar(iso_year, week, 7)
+        )
+    except ValueError:
+        return None
+
+
+def fiscal_year_end(year: int) -> date:
+    """Last day of fiscal year (tahun_anggaran) year"""
+    if FISCAL_YEAR_START_MONTH == 1:
+        return date(year, 12, 31)
+    month = FISCAL_YEAR_START_MONTH - 1
+    return date(year + 1, month, monthrange(year + 1, month)[1])
+
+
+def is_closed_year(year: int, today: Optional[date] = None) -> bool:
+    """
+    Check if the transactions of a calendar year (tahun) can no longer change
+
+    A calendar year is closed once the fiscal year holding its last day
+    has ended and FISCAL_YEAR_GRACE_DAYS have passed, during which late
+    postings of that fiscal year are still accepted.
+
+    Args:
+        year: Calendar year
+        today: Reference day (default: today)
+    """
+    today = today or date.today()
+    return today > fiscal_year_end(year) + timedelta(days=FISCAL_YEAR_GRACE_DAYS)
@@ -0,0 +1,187 @@
+"""
+Typed Loader - stream query results into preallocated typed column arrays
+
+Rows are fetched in chunks from a streaming cursor and written straight
+into numpy arrays of the final dtype, so the full result set is never held
+as Python rows plus an untyped DataFrame at the same time.
+"""
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Rows fetched from the cursor per chunk
+LOAD_CHUNK_SIZE = 5000
+
+# Column kinds understood by the loader
+INT = 'int'            # int64, nullable via mask
+FLOAT = 'float'        # float64 (Decimal is converted)
+DATETIME = 'datetime'  # datetime64[us]
+CATEGORY = 'category'  # pandas Categorical
+OBJECT = 'object'      # Python objects (text, dates)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB (None if unavailable)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KB on Linux and bytes on macOS
+    return peak / (1024 * 1024) if peak > 1 << 32 else peak / 1024
+
+
+class _ColumnBuffer:
+    """Growable typed buffer for one column"""
+
+    def __init__(self, kind: str, capacity: int):
+        self.kind = kind
+        self.mask = None
+        self.categories = None
+
+        if kind == INT:
+            self.values = np.zeros(capacity, dtype=np.int64)
+            self.mask = np.zeros(capacity, dtype=bool)
+        elif kind == FLOAT:
+            self.values = np.empty(capacity, dtype=np.float64)
+        elif kind == DATETIME:
+            self.values = np.empty(capacity, dtype='datetime64[us]')
+        elif kind == CATEGORY:
+            self.values = np.empty(capacity, dtype=np.int32)
+            self.categories = {}
+        else:
+            self.values = np.empty(capacity, dtype=object)
+
+    def grow(self, capacity: int):
+        """Enlarge the buffer to capacity, keeping the filled values"""
+        self.values = np.resize(self.values, capacity)
+        if self.mask is not None:
+            self.mask = np.resize(self.mask, capacity)
+
+    def write(self, start: int, values: tuple):
+        """Convert one chunk of values and store them at start"""
+        end = start + len(values)
+
+        if self.kind == INT:
+            self.mask[start:end] = False
+            if None in values:
+                self.mask[start:end] = [value is None for value in values]
+                values = [0 if value is None else value for value in values]
+            self.values[start:end] = np.fromiter(values, dtype=np.int64, count=len(values))
+
+        elif self.kind == FLOAT:
+            self.values[start:end] = np.array(values, dtype=np.float64)
+
+        elif self.kind == DATETIME:
+            self.values[start:end] = pd.DatetimeIndex(values).as_unit('us').values
+
+        elif self.kind == CATEGORY:
+            # Factorize the chunk in C, then map its few uniques to global codes
+            codes, uniques = pd.factorize(np.array(values, dtype=object))
+            if len(uniques) == 0:
+                self.values[start:end] = -1
+                return
+            categories = self.categories
+            lookup = np.array(
+                [categories.setdefault(value, len(categories)) for value in uniques],
+                dtype=np.int32
+            )
+            self.values[start:end] = np.where(codes >= 0, lookup[codes], -1)
+
+        else:
+            self.values[start:end] = values
+
+    def finish(self, size: int):
+        """Build the final pandas array for the first size values"""
+        values = self.values[:size]
+
+        if self.kind == INT:
+            mask = self.mask[:size]
+            if mask.any():
+                return pd.arrays.IntegerArray(values, mask)
+            return values
+
+        if self.kind == CATEGORY:
+            return pd.Categorical.from_codes(values, categories=list(self.categories))
+
+        return values
+
+
+def load_typed_frame(
+    connection,
+    statement,
+    dtypes: dict,
+    params: Optional[dict] = None,
+    expected_rows: int = 0,
+    chunk_size: int = LOAD_CHUNK_SIZE
+) -> pd.DataFrame:
+    """
+    Stream a query into a DataFrame with explicit column types
+
+    Args:
+        connection: SQLAlchemy connection
+        statement: SELECT whose result columns are the keys of dtypes, in order
+        dtypes: {column: kind} with kinds INT, FLOAT, DATETIME, CATEGORY, OBJECT
+        params: Bound parameter values
+        expected_rows: Row count used to preallocate (buffers grow if exceeded)
+        chunk_size: Rows fetched per chunk
+
+    Returns:
+        DataFrame with the typed columns
+    """
+    columns = list(dtypes)
+    capacity = max(expected_rows, 1)
+    buffers = [_ColumnBuffer(dtypes[col], capacity) for col in columns]
+
+    result = connection.execution_options(stream_results=True).execute(statement, params or {})
+
+    size = 0
+    try:
+        for chunk in result.partitions(chunk_size):
+            end = size + len(chunk)
+            if end > capacity:
+                capacity = max(end, capacity * 2)
+                for buffer in buffers:
+                    buffer.grow(capacity)
+
+            for buffer, values in zip(buffers, zip(*chunk)):
+                buffer.write(size, values)
+            size = end
+    finally:
+        result.close()
+
+    # copy=False keeps the filled buffers instead of copying them into blocks
+    return pd.DataFrame({
+        col: buffer.finish(size) for col, buffer in zip(columns, buffers)
+    }, copy=False)
+
+
+def apply_dtypes(df: pd.DataFrame, dtypes: dict) -> pd.DataFrame:
+    """
+    Convert an already loaded DataFrame to the loader's column types
+
+    Args:
+        df: DataFrame, e.g. read from an archive file
+        dtypes: {column: kind} as for load_typed_frame
+
+    Returns:
+        DataFrame with converted columns
+    """
+    for col, kind in dtypes.items():
+        if col not in df.columns:
+            continue
+        if kind == INT and not pd.api.types.is_integer_dtype(df[col]):
+            df[col] = df[col].astype('Int64')
+        elif kind == FLOAT:
+            df[col] = df[col].astype(np.float64)
+        elif kind == DATETIME:
+            df[col] = pd.to_datetime(df[col])
+        elif kind == CATEGORY:
+            df[col] = df[col].astype('category')
+    return df
+
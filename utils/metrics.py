@@ -0,0 +1,249 @@
+"""
+Metrics - in-process counters and histograms in Prometheus text format
+
+Dash callbacks, DataService methods and the data cache record into the
+registry below; dash_app serves it at /metrics. Values are per process, so
+with several gunicorn workers each scrape sees the worker that answered.
+"""
+
+import functools
+import threading
+import time
+from typing import Callable, Optional
+
+from flask import request
+
+# Seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Bytes: 1 KB to 64 MB in steps of 4
+SIZE_BUCKETS = tuple(1024 * 4 ** i for i in range(9))
+
+# Public DataService methods timed by instrument_service
+TIMED_SERVICE_METHODS = [
+    'get_all_transactions', 'filter_data', 'get_summary_metrics',
+    'get_opd_summary', 'get_payment_summary', 'get_daily_trend',
+    'get_monthly_summary', 'get_bendahara_summary', 'get_transaction_detail',
+    'get_rollup_data', 'get_filtered_rollup', 'get_opd_summary_from_rollup',
+    'get_payment_summary_from_rollup', 'get_opd_list',
+    'get_payment_types', 'refresh_cache', 'get_filtered_data', 'get_filtered_summary',
+]
+
+DASH_UPDATE_PATH = '_dash-update-component'
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with labels"""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, description: str, labels: tuple = ()):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self) -> list:
+        with self._lock:
+            return [
+                f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"
+                for key, value in sorted(self._values.items())
+            ]
+
+
+class Histogram:
+    """Cumulative bucket histogram with labels"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, description: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.buckets = tuple(buckets) + (float('inf'),)
+        self._values = {}  # {label values: [bucket counts, sum, count]}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        with self._lock:
+            entry = self._values.get(label_values)
+            if entry is None:
+                entry = self._values[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    def samples(self) -> list:
+        lines = []
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    le = f'le="{_format_value(bound)}"'
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(total)}")
+                lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {count}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+CALLBACK_SECONDS = REGISTRY.register(Histogram(
+    'sts_dash_callback_seconds', 'Dash callback execution time', ('callback', 'status')
+))
+CALLBACK_REQUEST_BYTES = REGISTRY.register(Histogram(
+    'sts_dash_callback_request_bytes', 'Dash callback request body size (inputs and states)',
+    ('callback',), SIZE_BUCKETS
+))
+CALLBACK_RESPONSE_BYTES = REGISTRY.register(Histogram(
+    'sts_dash_callback_response_bytes', 'Dash callback response size (outputs)',
+    ('callback',), SIZE_BUCKETS
+))
+SERVICE_SECONDS = REGISTRY.register(Histogram(
+    'sts_data_service_seconds', 'DataService method execution time', ('method',)
+))
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    'sts_data_cache_requests_total', 'DataService cache lookups', ('cache', 'result')
+))
+CACHE_EVICTIONS = REGISTRY.register(Counter(
+    'sts_result_cache_evictions_total', 'Result cache entries evicted to stay within the budget', ('cache',)
+))
+
+
+def _timed(function: Callable, histogram: Histogram, label: str, with_status: bool = False) -> Callable:
+    """Wrap function so each call is observed in histogram"""
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        status = 'error'
+        try:
+            result = function(*args, **kwargs)
+            status = 'ok'
+            return result
+        finally:
+            elapsed = time.perf_counter() - start
+            if with_status:
+                histogram.observe(elapsed, label, status)
+            else:
+                histogram.observe(elapsed, label)
+    return wrapper
+
+
+def record_cache(cache: str, hit: bool):
+    """Count one cache lookup"""
+    CACHE_REQUESTS.inc(cache, 'hit' if hit else 'miss')
+
+
+def record_eviction(cache: str):
+    """Count one result cache eviction"""
+    CACHE_EVICTIONS.inc(cache)
+
+
+class _InstrumentedApp:
+    """Dash app proxy whose callback decorator times the registered function"""
+
+    def __init__(self, app, outputs: dict):
+        self._app = app
+        self._outputs = outputs
+
+    def callback(self, *args, **kwargs):
+        # Dash adds the callback_map entry here, before the function is decorated
+        known = set(self._app.callback_map)
+        register = self._app.callback(*args, **kwargs)
+        added = set(self._app.callback_map) - known
+
+        def decorator(function):
+            for output in added:
+                self._outputs[output] = function.__name__
+            return register(_timed(function, CALLBACK_SECONDS, function.__name__, with_status=True))
+
+        return decorator
+
+    def __getattr__(self, name):
+        return getattr(self._app, name)
+
+
+def instrument_app(app):
+    """
+    Serve /metrics and record callback payload sizes on a Dash app
+
+    Returns:
+        Proxy of the app to pass to register_callbacks, so every callback
+        registered through it is timed
+    """
+    outputs = {}  # {callback output id: function name}
+    server = app.server
+
+    @server.after_request
+    def record_callback_payload(response):
+        if request.path.endswith(DASH_UPDATE_PATH) and request.method == 'POST':
+            # Dash already parsed the body; get_json returns the cached result
+            body = request.get_json(silent=True) or {}
+            name = outputs.get(body.get('output'), 'unknown')
+            CALLBACK_REQUEST_BYTES.observe(request.content_length or 0, name)
+            if not response.direct_passthrough:
+                CALLBACK_RESPONSE_BYTES.observe(response.calculate_content_length() or 0, name)
+        return response
+
+    @server.route('/metrics')
+    def metrics():
+        return REGISTRY.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+    return _InstrumentedApp(app, outputs)
+
+
+def instrument_service(service, methods: Optional[list] = None):
+    """
+    Time public methods of a DataService instance
+
+    The timed wrappers are set on the instance, so internal self.method()
+    calls are observed while super() calls in subclasses are not counted twice.
+    """
+    for name in methods or TIMED_SERVICE_METHODS:
+        setattr(service, name, _timed(getattr(service, name), SERVICE_SECONDS, name))
+    return service
@@ -0,0 +1,247 @@
+"""
+Shared Snapshot - year partitions shared by all worker processes
+
+One worker at a time, holding SHARED_SNAPSHOT_DIR/refresh.lock, loads the
+data and publishes it as a new version directory of uncompressed Arrow IPC
+files, then points LATEST at it with an atomic rename. Every worker
+memory-maps the files of the latest version, so the page cache holds one
+copy of the data however many workers run, and the database sees one load
+per refresh instead of one per worker. Requires pyarrow.
+"""
+
+import os
+import re
+import shutil
+import sys
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional, Tuple
+
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import SHARED_SNAPSHOT_DIR, SHARED_SNAPSHOT_KEEP
+
+LATEST_FILE = 'LATEST'
+LOCK_FILE = 'refresh.lock'
+CATALOG_FILE = 'catalog.arrow'
+
+# Version directories are named after their publish time in nanoseconds
+VERSION_PATTERN = re.compile(r'^v(\d+)$')
+PARTITION_PATTERN = re.compile(r'^transaksi_(\d{4})\.arrow$')
+
+
+def _require_pyarrow():
+    """Import pyarrow or fail with an actionable message"""
+    try:
+        import pyarrow
+        import pyarrow.ipc
+    except ImportError as e:
+        raise RuntimeError("Shared snapshot membutuhkan pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+
+def _lock_file(f, blocking: bool) -> bool:
+    """Take an exclusive lock on an open file, returning False if it is held"""
+    if fcntl is not None:
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            return True
+        except BlockingIOError:
+            return False
+
+    while True:
+        try:
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            if not blocking:
+                return False
+            time.sleep(0.1)
+
+
+def _unlock_file(f):
+    """Release a lock taken by _lock_file"""
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class SharedSnapshot:
+    """Versioned Arrow IPC snapshot in a directory shared by worker processes"""
+
+    def __init__(self, directory: str = SHARED_SNAPSHOT_DIR, keep: int = SHARED_SNAPSHOT_KEEP):
+        self.directory = directory
+        self.keep = max(keep, 1)
+
+    def latest_version(self) -> Optional[str]:
+        """Get the name of the latest published version (None if none yet)"""
+        try:
+            with open(os.path.join(self.directory, LATEST_FILE)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def list_versions(self) -> list:
+        """Get the published versions on disk, oldest first"""
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(
+            (name for name in names if VERSION_PATTERN.match(name)),
+            key=lambda name: int(VERSION_PATTERN.match(name).group(1))
+        )
+
+    def version_age(self, version: str) -> float:
+        """Seconds since a version was published"""
+        published_ns = int(VERSION_PATTERN.match(version).group(1))
+        return (time.time_ns() - published_ns) / 1e9
+
+    def version_years(self, version: str) -> list:
+        """Get sorted list of years stored in a version"""
+        years = []
+        for name in os.listdir(os.path.join(self.directory, version)):
+            match = PARTITION_PATTERN.match(name)
+            if match:
+                years.append(int(match.group(1)))
+        return sorted(years)
+
+    def _partition_path(self, version: str, year: int) -> str:
+        return os.path.join(self.directory, version, f"transaksi_{year}.arrow")
+
+    @contextmanager
+    def _refresh_lock(self, blocking: bool):
+        """Hold the refresher lock; yields False if another worker holds it"""
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, LOCK_FILE), 'a+') as f:
+            acquired = _lock_file(f, blocking)
+            try:
+                yield acquired
+            finally:
+                if acquired:
+                    _unlock_file(f)
+
+    def refresh(
+        self,
+        build: Callable[[Optional[str]], Tuple[pd.DataFrame, dict]],
+        max_age: float,
+        force: bool = False
+    ) -> str:
+        """
+        Get the latest version, publishing a new one when it is older than max_age
+
+        Only the worker holding the refresher lock calls build. Other workers
+        keep serving the current version meanwhile, and only wait for the
+        lock when there is no version to serve at all.
+
+        Args:
+            build: Called with the version to reuse closed years from (None
+                to reload everything); returns (catalog, {year: DataFrame or
+                None}) where None keeps that year's file from the reused version
+            max_age: Seconds after which a version is refreshed
+            force: Publish a new version regardless of age
+
+        Returns:
+            Name of the version to map
+        """
+        version = self.latest_version()
+        if version is not None and not force and self.version_age(version) <= max_age:
+            return version
+
+        with self._refresh_lock(blocking=version is None or force) as acquired:
+            if not acquired:
+                return version
+
+            # Another worker may have published while this one waited
+            current = self.latest_version()
+            if current is not None and current != version and self.version_age(current) <= max_age:
+                return current
+
+            catalog, partitions = build(None if force else current)
+            return self.publish(catalog, partitions, reuse_from=current)
+
+    def publish(self, catalog: pd.DataFrame, partitions: dict, reuse_from: Optional[str] = None) -> str:
+        """
+        Write a new version and atomically make it the latest
+
+        Args:
+            catalog: Per-week catalog of the data
+            partitions: {year: DataFrame}; None links the file of reuse_from
+            reuse_from: Version whose unchanged files are hard-linked
+
+        Returns:
+            Name of the published version
+        """
+        pa = _require_pyarrow()
+
+        version = f"v{time.time_ns()}"
+        tmp_dir = os.path.join(self.directory, f".{version}.tmp")
+        os.makedirs(tmp_dir)
+
+        self._write_table(pa, catalog, os.path.join(tmp_dir, CATALOG_FILE))
+        for year, df in partitions.items():
+            path = os.path.join(tmp_dir, os.path.basename(self._partition_path(version, year)))
+            if df is None:
+                source = self._partition_path(reuse_from, year)
+                try:
+                    os.link(source, path)
+                except OSError:
+                    shutil.copyfile(source, path)
+            else:
+                self._write_table(pa, df, path)
+
+        os.replace(tmp_dir, os.path.join(self.directory, version))
+
+        latest_tmp = os.path.join(self.directory, f"{LATEST_FILE}.tmp")
+        with open(latest_tmp, 'w') as f:
+            f.write(version)
+        os.replace(latest_tmp, os.path.join(self.directory, LATEST_FILE))
+
+        self._prune(version)
+        return version
+
+    def _write_table(self, pa, df: pd.DataFrame, path: str):
+        """Write a DataFrame as an uncompressed Arrow IPC file, which can be mapped as is"""
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        with pa.OSFile(path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+    def _prune(self, current: str):
+        """Remove all but the newest versions; mapped files stay readable until unmapped"""
+        for name in self.list_versions()[:-self.keep]:
+            if name != current:
+                shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+
+    def open(self, version: str) -> Tuple[pd.DataFrame, dict]:
+        """
+        Memory-map a version
+
+        Numeric and datetime columns are views of the mapped files; text
+        and categorical columns are decoded into process memory.
+
+        Returns:
+            Tuple of (catalog, {year: DataFrame})
+        """
+        catalog = self._read_table(os.path.join(self.directory, version, CATALOG_FILE))
+        partitions = {
+            year: self._read_table(self._partition_path(version, year))
+            for year in self.version_years(version)
+        }
+        return catalog, partitions
+
+    def _read_table(self, path: str) -> pd.DataFrame:
+        pa = _require_pyarrow()
+        # The mapping stays open as long as the DataFrame references its buffers
+        table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+        return table.to_pandas(split_blocks=True)